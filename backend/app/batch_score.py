@@ -0,0 +1,258 @@
+"""Offline batch scorer for large JSONL/CSV dumps (no HTTP involved).
+
+Usage::
+
+    python -m app.batch_score articles.jsonl scored.jsonl --workers 8
+    python -m app.batch_score dump.csv scored.csv --text-field body --resume
+
+The input is streamed in chunks of `--chunk-size` rows, and each chunk is
+scored in a process pool (NewsModel.predict_batch, analyze_sentiment,
+highlight_keywords and summarize_text). Results are written in input order,
+one chunk at a time. After every chunk the output is flushed and a checkpoint
+file (`<output>.ckpt` by default) records how many rows and bytes are safely on
+disk. `--resume` truncates the output to that point and skips the rows already
+scored, so a crashed run continues where it stopped.
+
+Rows are scored with the model `/analyze` serves: `--model` defaults to
+NEWS_MODEL, and every output row records the model name and version.
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+CSV_FIELDS = ["row", "id", "label", "confidence", "polarity", "tone", "keywords", "summary", "model",
+              "model_version", "error"]
+
+_model = None
+
+
+def _init_worker(model_name: Optional[str] = None) -> None:
+    global _model
+    from app.model import NewsModel
+
+    _model = NewsModel(model_name)
+
+
+def score_chunk(rows: List[Tuple[int, Dict[str, Any]]], text_field: str, id_field: str,
+                highlight: bool = True, summary_sentences: int = 3,
+                model_name: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Score one chunk of (row_number, record) pairs; runs inside a worker process."""
+    from app.document import Document
+    from app.explain import highlight_keywords
+    from app.sentiment import analyze_sentiment_batch
+    from app.summarizer import summarize_text
+
+    if _model is None:
+        _init_worker(model_name)
+    # one Document per record, shared by every analyzer below
+    docs = [Document(str(rec.get(text_field) or "").strip()) for _, rec in rows]
+    predictions = _model.predict_batch(docs)
+    sentiments = analyze_sentiment_batch(docs)
+    out = []
+    for (row, rec), doc, pred, sentiment in zip(rows, docs, predictions, sentiments):
+        item: Dict[str, Any] = {"row": row, "id": rec.get(id_field), "model": _model.name,
+                                "model_version": getattr(_model, "version", "")}
+        if not doc.text:
+            item["error"] = f"empty '{text_field}'"
+            out.append(item)
+            continue
+        try:
+            highlighted, keywords = highlight_keywords(doc)
+            item.update({
+                "label": pred["label"],
+                "confidence": pred["confidence"],
+                "probabilities": pred["probabilities"],
+                "sentiment": sentiment,
+                "keywords": keywords,
+            })
+            if highlight:
+                item["highlighted"] = highlighted
+            if summary_sentences > 0:
+                item["summary"] = summarize_text(doc, sentences_k=summary_sentences)
+        except Exception as e:
+            item["error"] = str(e) or e.__class__.__name__
+        out.append(item)
+    return out
+
+
+def _is_csv(path: str) -> bool:
+    return path.lower().endswith((".csv", ".tsv"))
+
+
+def read_records(path: str, skip: int = 0) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """Yield (row_number, record) from a JSONL or CSV file, starting after `skip` rows."""
+    with open(path, newline="" if _is_csv(path) else None, encoding="utf-8") as fh:
+        if _is_csv(path):
+            reader = csv.DictReader(fh, delimiter="\t" if path.lower().endswith(".tsv") else ",")
+            source = ((i, rec) for i, rec in enumerate(reader))
+        else:
+            source = ((i, line) for i, line in enumerate(l for l in fh if l.strip()))
+        for i, rec in source:
+            if i < skip:
+                continue
+            if isinstance(rec, str):
+                try:
+                    rec = json.loads(rec)
+                except ValueError:
+                    rec = {}
+                if not isinstance(rec, dict):
+                    rec = {}
+            yield i, rec
+
+
+def chunked(records: Iterator, size: int) -> Iterator[List]:
+    chunk = []
+    for rec in records:
+        chunk.append(rec)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _format(results: List[Dict[str, Any]], as_csv: bool) -> str:
+    if not as_csv:
+        return "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in results)
+    import io
+
+    buf = io.StringIO()
+    writer = csv.DictWriter(buf, fieldnames=CSV_FIELDS, extrasaction="ignore")
+    for r in results:
+        flat = dict(r)
+        sentiment = r.get("sentiment") or {}
+        flat["polarity"] = sentiment.get("polarity")
+        flat["tone"] = sentiment.get("tone")
+        flat["keywords"] = " ".join(r.get("keywords") or [])
+        writer.writerow(flat)
+    return buf.getvalue()
+
+
+def load_checkpoint(path: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(path, encoding="utf-8") as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return None
+
+
+def save_checkpoint(path: str, state: Dict[str, Any]) -> None:
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump(state, fh)
+        fh.flush()
+        os.fsync(fh.fileno())
+    os.replace(tmp, path)
+
+
+def _resolve_model(model_name: Optional[str]) -> Tuple[Optional[str], str]:
+    """(name, version) of the model to score with; exits if it can't be loaded."""
+    from app.model import NewsModel
+
+    model = NewsModel(model_name)
+    if model_name and model.name != model_name:
+        # NewsModel falls back to the placeholder; a batch run must not
+        raise SystemExit(f"model {model_name!r} not found")
+    return model_name, str(getattr(model, "version", ""))
+
+
+def run(args: argparse.Namespace) -> int:
+    checkpoint = args.checkpoint or args.output + ".ckpt"
+    model_name, model_version = _resolve_model(args.model)
+    as_csv = _is_csv(args.output)
+    skip = 0
+    offset = 0
+    state = load_checkpoint(checkpoint) if args.resume else None
+    if state:
+        if state.get("input") != os.path.abspath(args.input):
+            # starting over would truncate the rows already scored
+            raise SystemExit(f"{checkpoint} belongs to input {state.get('input')}, not "
+                             f"{os.path.abspath(args.input)}; check the path or rerun without --resume")
+        if state.get("model_version", model_version) != model_version:
+            raise SystemExit(f"{checkpoint} was written by model version {state['model_version']}, "
+                             f"not {model_version}; rerun without --resume")
+        skip = int(state["rows_done"])
+        offset = int(state["output_bytes"])
+        print(f"Resuming after {skip} rows", file=sys.stderr)
+
+    mode = "r+b" if offset and os.path.exists(args.output) else "wb"
+    out = open(args.output, mode)
+    out.seek(offset)
+    out.truncate()
+    if as_csv and offset == 0:
+        out.write((",".join(CSV_FIELDS) + "\r\n").encode("utf-8"))
+
+    started = time.perf_counter()
+    done = 0
+    window = max(1, args.workers) * 2
+    chunks = chunked(read_records(args.input, skip=skip), args.chunk_size)
+    try:
+        with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker,
+                                 initargs=(model_name,)) as pool:
+            in_flight = []
+            exhausted = False
+            while in_flight or not exhausted:
+                # keep a bounded number of chunks queued so memory stays flat
+                while not exhausted and len(in_flight) < window:
+                    chunk = next(chunks, None)
+                    if chunk is None:
+                        exhausted = True
+                        break
+                    in_flight.append(pool.submit(score_chunk, chunk, args.text_field, args.id_field,
+                                                 not args.no_highlight, args.summary_sentences, model_name))
+                if not in_flight:
+                    break
+                # write strictly in input order so the checkpoint is a clean prefix
+                results = in_flight.pop(0).result()
+                out.write(_format(results, as_csv).encode("utf-8"))
+                out.flush()
+                os.fsync(out.fileno())
+                done += len(results)
+                save_checkpoint(checkpoint, {
+                    "input": os.path.abspath(args.input),
+                    "rows_done": skip + done,
+                    "output_bytes": out.tell(),
+                    "model_version": model_version,
+                })
+                elapsed = time.perf_counter() - started
+                print(f"\r{skip + done} rows scored ({done / elapsed:.0f} rows/s, {elapsed:.1f}s)",
+                      end="", file=sys.stderr, flush=True)
+    finally:
+        out.close()
+    print(file=sys.stderr)
+    return done
+
+
+def build_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(prog="python -m app.batch_score", description=__doc__.splitlines()[0])
+    p.add_argument("input", help="input .jsonl/.ndjson or .csv/.tsv file")
+    p.add_argument("output", help="output file (.csv writes flat rows, anything else JSONL)")
+    p.add_argument("--text-field", default="text")
+    p.add_argument("--id-field", default="id")
+    p.add_argument("--model", default=os.environ.get("NEWS_MODEL") or None,
+                   help="trained model under MODEL_DIR or a path (default: NEWS_MODEL, else the placeholder)")
+    p.add_argument("--chunk-size", type=int, default=500)
+    p.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    p.add_argument("--summary-sentences", type=int, default=3, help="0 disables summaries")
+    p.add_argument("--no-highlight", action="store_true", help="omit highlighted HTML from the output")
+    p.add_argument("--checkpoint", help="checkpoint path (default: <output>.ckpt)")
+    p.add_argument("--resume", action="store_true", help="continue from the checkpoint")
+    return p
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    started = time.perf_counter()
+    n = run(args)
+    elapsed = time.perf_counter() - started
+    print(f"Scored {n} rows in {elapsed:.1f}s ({n / elapsed if elapsed else 0:.0f} rows/s)", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
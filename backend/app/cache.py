@@ -0,0 +1,240 @@
+"""Content-addressed result cache for /analyze, /summarize and /bias.
+
+Keys are the endpoint namespace plus a SHA-256 over the namespace, the
+version of what that namespace's results depend on and the normalized input
+(text and/or URL), so resubmitting the same story skips the fetch, parse and
+every analysis stage. Versions are tracked per namespace: a new version
+drops that namespace's entries and leaves the others alone. Entries live in an in-process LRU tier
+with a TTL and a size budget; an optional SQLite tier next to `demo.db` keeps
+them across restarts. With that tier on, `get` / `set` block on disk, so
+async callers run them in the threadpool (see `persistent`); `key` never
+touches the disk, old versions are deleted there by the next `get` / `set`.
+
+Environment settings:
+
+- RESULT_CACHE: set to 0 to disable caching (default 1)
+- RESULT_CACHE_TTL: entry lifetime in seconds (default 3600)
+- RESULT_CACHE_MAX_ENTRIES / RESULT_CACHE_MAX_MB: memory tier bounds (default 2048 / 64)
+- RESULT_CACHE_DB: 1 to enable the SQLite tier at backend/cache.db, or a file path
+"""
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger("fakenews")
+
+DEFAULT_CACHE_DB = Path(__file__).resolve().parents[1] / "cache.db"
+
+
+def normalize_text(text: Optional[str]) -> str:
+    """Canonical form used for hashing: NFC, LF line endings, no outer whitespace."""
+    if not text:
+        return ""
+    text = unicodedata.normalize("NFC", text)
+    return text.replace("\r\n", "\n").replace("\r", "\n").strip()
+
+
+def normalize_url(url: Optional[str]) -> str:
+    return (url or "").strip()
+
+
+class ResultCache:
+    def __init__(
+        self,
+        ttl: float = 3600.0,
+        max_entries: int = 2048,
+        max_bytes: int = 64 * 1024 * 1024,
+        db_path: Optional[str] = None,
+        enabled: bool = True,
+    ) -> None:
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self.versions: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        # key -> (expires_at, serialized value); values are stored as JSON so
+        # callers always get a private copy and sizes are easy to account for.
+        # Keys start with "<namespace>:".
+        self._mem: "OrderedDict[str, tuple]" = OrderedDict()
+        self._bytes = 0
+        self._db: Optional[sqlite3.Connection] = None
+        # namespaces whose old-version rows are still to be deleted from disk
+        self._purge: Dict[str, str] = {}
+        self.stats_counters = {"hits": 0, "misses": 0, "disk_hits": 0, "sets": 0, "evictions": 0, "invalidations": 0}
+        if db_path:
+            self._open_db(db_path)
+
+    def _open_db(self, db_path: str) -> None:
+        try:
+            conn = sqlite3.connect(str(db_path), check_same_thread=False)
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "key TEXT PRIMARY KEY, version TEXT NOT NULL, expires_at REAL NOT NULL, value TEXT NOT NULL, "
+                "namespace TEXT NOT NULL DEFAULT '')"
+            )
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(results)")}
+            if "namespace" not in columns:
+                # written before versions were per namespace; none of those keys match any more
+                conn.execute("DELETE FROM results")
+                conn.execute("ALTER TABLE results ADD COLUMN namespace TEXT NOT NULL DEFAULT ''")
+            conn.execute("DELETE FROM results WHERE expires_at < ?", (time.time(),))
+            conn.commit()
+            self._db = conn
+        except Exception:
+            logger.exception("Result cache database %s unavailable; using memory only", db_path)
+            self._db = None
+
+    @property
+    def persistent(self) -> bool:
+        """Whether `get` / `set` may do blocking disk I/O."""
+        return self._db is not None and self.enabled
+
+    def key(self, namespace: str, version: str, text: Optional[str] = None, url: Optional[str] = None) -> str:
+        """Build a cache key; a new `version` invalidates everything cached
+        under the old one in the same `namespace`."""
+        if self.versions.get(namespace) != version:
+            self.set_version(namespace, version)
+        h = hashlib.sha256()
+        for part in (namespace, version, normalize_text(text), normalize_url(url)):
+            h.update(part.encode("utf-8"))
+            h.update(b"\0")
+        return f"{namespace}:{h.hexdigest()}"
+
+    @staticmethod
+    def _namespace(key: str) -> str:
+        return key.rpartition(":")[0]
+
+    def set_version(self, namespace: str, version: str) -> None:
+        with self._lock:
+            old = self.versions.get(namespace)
+            if version == old:
+                return
+            if old is not None:
+                logger.info("Result cache invalidated for %s (version %s -> %s)", namespace, old, version)
+                self.stats_counters["invalidations"] += 1
+                for key in [k for k in self._mem if self._namespace(k) == namespace]:
+                    self._drop(key)
+            self.versions[namespace] = version
+            if self._db is not None:
+                self._purge[namespace] = version
+
+    def _purge_old_versions(self) -> None:
+        # caller holds self._lock
+        if not self._purge:
+            return
+        try:
+            for namespace, version in self._purge.items():
+                self._db.execute("DELETE FROM results WHERE namespace = ? AND version != ?", (namespace, version))
+            self._db.commit()
+        except sqlite3.Error:
+            logger.exception("Failed to purge old cache versions")
+        self._purge.clear()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        if not self.enabled:
+            return None
+        now = time.time()
+        with self._lock:
+            item = self._mem.get(key)
+            if item is not None:
+                if item[0] >= now:
+                    self._mem.move_to_end(key)
+                    self.stats_counters["hits"] += 1
+                    return json.loads(item[1])
+                self._drop(key)
+            if self._db is not None:
+                self._purge_old_versions()
+                row = self._db.execute(
+                    "SELECT expires_at, value FROM results WHERE key = ? AND version = ?",
+                    (key, self.versions.get(self._namespace(key), "")),
+                ).fetchone()
+                if row is not None and row[0] >= now:
+                    self._put_mem(key, row[0], row[1])
+                    self.stats_counters["hits"] += 1
+                    self.stats_counters["disk_hits"] += 1
+                    return json.loads(row[1])
+            self.stats_counters["misses"] += 1
+            return None
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        if not self.enabled:
+            return
+        payload = json.dumps(value, separators=(",", ":"))
+        expires_at = time.time() + self.ttl
+        with self._lock:
+            self._put_mem(key, expires_at, payload)
+            self.stats_counters["sets"] += 1
+            if self._db is not None:
+                self._purge_old_versions()
+                try:
+                    namespace = self._namespace(key)
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO results (key, version, expires_at, value, namespace) VALUES (?,?,?,?,?)",
+                        (key, self.versions.get(namespace, ""), expires_at, payload, namespace),
+                    )
+                    self._db.commit()
+                except sqlite3.Error:
+                    logger.exception("Failed to persist cache entry")
+
+    def _put_mem(self, key: str, expires_at: float, payload: str) -> None:
+        if len(payload) > self.max_bytes:
+            return
+        self._drop(key)
+        self._mem[key] = (expires_at, payload)
+        self._bytes += len(payload)
+        while self._mem and (len(self._mem) > self.max_entries or self._bytes > self.max_bytes):
+            old_key, _ = next(iter(self._mem.items()))
+            self._drop(old_key)
+            self.stats_counters["evictions"] += 1
+
+    def _drop(self, key: str) -> None:
+        item = self._mem.pop(key, None)
+        if item is not None:
+            self._bytes -= len(item[1])
+
+    def clear(self) -> None:
+        with self._lock:
+            self._mem.clear()
+            self._bytes = 0
+            if self._db is not None:
+                self._purge.clear()
+                self._db.execute("DELETE FROM results")
+                self._db.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            out = dict(self.stats_counters)
+            out.update({
+                "entries": len(self._mem),
+                "bytes": self._bytes,
+                "persistent": self._db is not None,
+                "versions": dict(self.versions),
+            })
+            return out
+
+
+def _db_path_from_env() -> Optional[str]:
+    value = os.environ.get("RESULT_CACHE_DB", "")
+    if value in ("", "0", "false", "False"):
+        return None
+    if value in ("1", "true", "True"):
+        return str(DEFAULT_CACHE_DB)
+    return value
+
+
+RESULT_CACHE = ResultCache(
+    ttl=float(os.environ.get("RESULT_CACHE_TTL", "3600")),
+    max_entries=int(os.environ.get("RESULT_CACHE_MAX_ENTRIES", "2048")),
+    max_bytes=int(float(os.environ.get("RESULT_CACHE_MAX_MB", "64")) * 1024 * 1024),
+    db_path=_db_path_from_env(),
+    enabled=os.environ.get("RESULT_CACHE", "1") not in ("0", "false", "False"),
+)
@@ -0,0 +1,230 @@
+# backend/app/classifier.py
+"""Trainable linear news classifier over hashed TF-IDF features.
+
+Text is turned into token and bigram counts with scikit-learn's
+HashingVectorizer (no vocabulary to store), weighted by IDF and
+L2-normalised, then scored by a logistic-regression weight vector. A model
+is a directory of artifacts::
+
+    meta.json   vectorizer settings, intercept, training report, checksum
+    coef.npy    float32 weight per hashed feature
+    idf.npy     float32 IDF per hashed feature
+
+The two arrays are opened with `numpy.load(mmap_mode="r")`, so every worker
+process maps the same file pages instead of holding its own copy. Inference
+is one sparse matrix for the whole batch and one sparse-dense product.
+
+Train offline from a labeled CSV (labels: real/fake, true/false or 1/0)::
+
+    python -m app.classifier train data/news.csv --out models/news-linear
+    python -m app.classifier evaluate data/holdout.csv --model news-linear
+
+then select the artifact with NEWS_MODEL=news-linear (a directory under
+MODEL_DIR, or a path).
+"""
+import argparse
+import csv
+import hashlib
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.startup import lazy_import
+
+MODEL_DIR = os.environ.get("MODEL_DIR") or str(Path(__file__).resolve().parent.parent / "models")
+FORMAT_VERSION = 1
+
+_LABELS = {"real": 1, "true": 1, "1": 1, "fake": 0, "false": 0, "0": 0}
+
+
+def resolve_artifact(model_name: str) -> Optional[Path]:
+    """Directory holding the artifacts for `model_name` (a path, or a name
+    under MODEL_DIR), or None if there is no such model."""
+    for candidate in (Path(model_name), Path(MODEL_DIR) / model_name):
+        if (candidate / "meta.json").is_file():
+            return candidate
+    return None
+
+
+def _vectorizer(n_features: int, ngram_max: int):
+    text = lazy_import("sklearn.feature_extraction.text")
+    if text is None:
+        raise RuntimeError("scikit-learn is required for the linear classifier")
+    # raw counts; IDF weighting and normalisation are applied by `_tfidf`
+    return text.HashingVectorizer(
+        n_features=n_features, ngram_range=(1, ngram_max), alternate_sign=False, norm=None, dtype=np.float32,
+    )
+
+
+def _tfidf(counts, idf: np.ndarray):
+    """Scale a CSR count matrix by `idf` and L2-normalise its rows, in place."""
+    counts.data *= idf[counts.indices]
+    rows = np.repeat(np.arange(counts.shape[0]), np.diff(counts.indptr))
+    norms = np.sqrt(np.bincount(rows, weights=counts.data ** 2, minlength=counts.shape[0]))
+    norms[norms == 0] = 1.0
+    counts.data /= norms[rows].astype(counts.data.dtype)
+    return counts
+
+
+class LinearTextClassifier:
+    """A trained artifact: hashed TF-IDF features and a logistic weight vector."""
+
+    def __init__(self, meta: Dict[str, Any], coef: np.ndarray, idf: np.ndarray, path: Optional[str] = None):
+        self.meta = meta
+        self.coef = coef
+        self.idf = idf
+        self.intercept = float(meta["intercept"])
+        self.path = path
+        self.version = meta["checksum"][:12]
+        self._vec = _vectorizer(meta["n_features"], meta["ngram_max"])
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> "LinearTextClassifier":
+        path = Path(path)
+        with open(path / "meta.json", encoding="utf-8") as fh:
+            meta = json.load(fh)
+        if meta.get("format") != FORMAT_VERSION:
+            raise ValueError(f"{path}: unsupported model format {meta.get('format')!r}")
+        mode = "r" if mmap else None
+        coef = np.load(path / "coef.npy", mmap_mode=mode)
+        idf = np.load(path / "idf.npy", mmap_mode=mode)
+        if coef.shape != (meta["n_features"],) or idf.shape != coef.shape:
+            raise ValueError(f"{path}: artifact arrays do not match n_features={meta['n_features']}")
+        return cls(meta, coef, idf, path=str(path))
+
+    def features(self, texts: List[str]):
+        return _tfidf(self._vec.transform([t or "" for t in texts]).tocsr(), self.idf)
+
+    def predict_proba(self, texts: List[str]) -> np.ndarray:
+        """P(Real) for each text."""
+        if not texts:
+            return np.zeros(0)
+        margin = self.features(texts) @ self.coef + self.intercept
+        return 1.0 / (1.0 + np.exp(-np.asarray(margin, dtype=np.float64)))
+
+
+def read_labeled_csv(path: str, text_column: str = "text", label_column: str = "label") -> Tuple[List[str], np.ndarray]:
+    """Texts and 0/1 labels (1 = Real) from a CSV; raises ValueError on a bad row."""
+    texts: List[str] = []
+    labels: List[int] = []
+    with open(path, encoding="utf-8", newline="") as f:
+        reader = csv.DictReader(f)
+        missing = {text_column, label_column} - set(reader.fieldnames or [])
+        if missing:
+            raise ValueError(f"{path}: missing column(s) {', '.join(sorted(missing))}")
+        for lineno, row in enumerate(reader, 2):
+            raw = (row[label_column] or "").strip().lower()
+            if raw not in _LABELS:
+                raise ValueError(f"{path}:{lineno}: unknown label {row[label_column]!r}")
+            texts.append(row[text_column] or "")
+            labels.append(_LABELS[raw])
+    return texts, np.array(labels, dtype=np.int8)
+
+
+def train(
+    texts: List[str],
+    labels: np.ndarray,
+    out_dir: str,
+    n_features: int = 2 ** 20,
+    ngram_max: int = 2,
+    C: float = 4.0,
+    test_size: float = 0.2,
+    seed: int = 13,
+) -> Dict[str, Any]:
+    """Fit the classifier and write its artifacts to `out_dir`; returns meta."""
+    linear_model = lazy_import("sklearn.linear_model")
+    if linear_model is None:
+        raise RuntimeError("scikit-learn is required to train the linear classifier")
+    if len(set(labels.tolist())) < 2:
+        raise ValueError("training data needs both real and fake examples")
+
+    rng = np.random.default_rng(seed)
+    order = rng.permutation(len(texts))
+    n_test = int(len(texts) * test_size) if len(texts) >= 10 else 0
+    test_idx, train_idx = order[:n_test], order[n_test:]
+
+    started = time.perf_counter()
+    vec = _vectorizer(n_features, ngram_max)
+    counts = vec.transform([texts[i] for i in train_idx]).tocsr()
+    df = np.bincount(counts.indices, minlength=n_features)
+    idf = (np.log((1 + len(train_idx)) / (1 + df)) + 1).astype(np.float32)
+    clf = linear_model.LogisticRegression(C=C, solver="liblinear", max_iter=1000)
+    clf.fit(_tfidf(counts, idf), labels[train_idx])
+    # liblinear orders classes ascending, so coef_ points towards label 1 (Real)
+    coef = clf.coef_.ravel().astype(np.float32)
+    intercept = float(clf.intercept_[0])
+
+    report: Dict[str, Any] = {"examples": int(len(train_idx)), "seconds": round(time.perf_counter() - started, 3)}
+    if n_test:
+        probs = 1 / (1 + np.exp(-(_tfidf(vec.transform([texts[i] for i in test_idx]).tocsr(), idf) @ coef + intercept)))
+        report["holdout_examples"] = int(n_test)
+        report["holdout_accuracy"] = round(float(np.mean((probs >= 0.5) == (labels[test_idx] == 1))), 4)
+
+    out = Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    np.save(out / "coef.npy", coef)
+    np.save(out / "idf.npy", idf)
+    meta = {
+        "format": FORMAT_VERSION,
+        "n_features": n_features,
+        "ngram_max": ngram_max,
+        "intercept": intercept,
+        "C": C,
+        "trained_at": int(time.time()),
+        "report": report,
+        "checksum": hashlib.sha1(coef.tobytes() + idf.tobytes() + repr(intercept).encode()).hexdigest(),
+    }
+    # meta.json is what marks the directory as a model, so it goes last
+    tmp = out / "meta.json.tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump(meta, fh, indent=2)
+    os.replace(tmp, out / "meta.json")
+    return meta
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    p = argparse.ArgumentParser(description="Train or evaluate the linear news classifier")
+    sub = p.add_subparsers(dest="command", required=True)
+    t = sub.add_parser("train", help="train from a labeled CSV")
+    t.add_argument("csv")
+    t.add_argument("--out", required=True, help="artifact directory to write")
+    t.add_argument("--n-features", type=int, default=2 ** 20)
+    t.add_argument("--ngram-max", type=int, default=2)
+    t.add_argument("--C", type=float, default=4.0, help="inverse regularisation strength")
+    t.add_argument("--test-size", type=float, default=0.2, help="fraction held out for accuracy")
+    e = sub.add_parser("evaluate", help="accuracy of a trained model on a labeled CSV")
+    e.add_argument("csv")
+    e.add_argument("--model", required=True, help="name under MODEL_DIR or a path")
+    for sp in (t, e):
+        sp.add_argument("--text-column", default="text")
+        sp.add_argument("--label-column", default="label")
+    args = p.parse_args(argv)
+
+    texts, labels = read_labeled_csv(args.csv, args.text_column, args.label_column)
+    if args.command == "train":
+        meta = train(texts, labels, args.out, n_features=args.n_features, ngram_max=args.ngram_max,
+                     C=args.C, test_size=args.test_size)
+        print(f"wrote {args.out} (version {meta['checksum'][:12]})")
+        for key, value in meta["report"].items():
+            print(f"{key:>18}: {value}")
+        return 0
+
+    path = resolve_artifact(args.model)
+    if path is None:
+        print(f"no model named {args.model!r}", file=sys.stderr)
+        return 1
+    started = time.perf_counter()
+    probs = LinearTextClassifier.load(str(path)).predict_proba(texts)
+    seconds = time.perf_counter() - started
+    print(f"          accuracy: {np.mean((probs >= 0.5) == (labels == 1)):.4f}")
+    print(f"             texts: {len(texts)} in {seconds:.3f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,47 +1,281 @@
 # backend/app/credibility.py
-from typing import Optional, Dict, Any
+"""Source credibility from a domain reputation list.
 
-try:
-    import tldextract
-    _HAS_TLDEXTRACT = True
-except Exception:
-    tldextract = None
-    _HAS_TLDEXTRACT = False
+Reputation rules live in a local file (REPUTATION_FILE, default
+`app/data/domains.tsv`), one `domain<TAB>score` per line with scores in
+[0, 1]. A rule covers the domain and all of its subdomains unless the domain
+is prefixed with `=`, which matches that exact host only. The most specific
+rule wins, so `=news.example.com 0.8` can override `example.com 0.3`.
 
+Rules are held in a hash index keyed by domain suffix, so a lookup costs one
+dict probe per label of the host no matter how many rules are loaded. The
+file is re-checked at most every REPUTATION_RELOAD_INTERVAL seconds; when its
+mtime or size changes a new index is built off to the side and swapped in
+with a single assignment, so readers always see either the old or the new
+list, never a half-loaded one. A broken file keeps the previous index.
 
+Registered domains are extracted with tldextract against the public suffix
+snapshot bundled in `app/data/public_suffix_list.dat` (override with
+PUBLIC_SUFFIX_LIST), so it never goes to the network.
+"""
+import hashlib
+import logging
+import os
+import threading
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+from urllib.parse import urlparse
+
+from app.startup import has_module, lazy_import
+
+# imported (with requests) on first lookup rather than at startup
+_HAS_TLDEXTRACT = has_module("tldextract")
+
+logger = logging.getLogger("fakenews")
+
+DATA_DIR = Path(__file__).resolve().parent / "data"
+REPUTATION_FILE = os.environ.get("REPUTATION_FILE") or str(DATA_DIR / "domains.tsv")
+REPUTATION_RELOAD_INTERVAL = float(os.environ.get("REPUTATION_RELOAD_INTERVAL", "5"))
+PUBLIC_SUFFIX_LIST = os.environ.get("PUBLIC_SUFFIX_LIST") or str(DATA_DIR / "public_suffix_list.dat")
+
+# used when the reputation file is missing
 TRUSTED_DOMAINS = ["bbc.com", "reuters.com", "thehindu.com", "ndtv.com"]
 BLACKLIST_DOMAINS = ["fake-news.net", "gossipbuzz.com"]
 
+TRUSTED_SCORE = 0.7
+UNRELIABLE_SCORE = 0.3
+UNKNOWN_SCORE = 0.5
+
+
+class Rule(NamedTuple):
+    domain: str
+    score: float
+    exact: bool
+
+
+def status_for(score: float) -> str:
+    if score >= TRUSTED_SCORE:
+        return "Trusted"
+    if score <= UNRELIABLE_SCORE:
+        return "Unreliable"
+    return "Mixed"
+
+
+def parse_rules(lines: Iterable[str]) -> Dict[str, Rule]:
+    """Parse `domain score` lines (tab or space separated, `#` comments).
+
+    Raises ValueError on a malformed line so a bad edit never half-applies.
+    """
+    rules: Dict[str, Rule] = {}
+    for lineno, line in enumerate(lines, 1):
+        line = line.split("#", 1)[0].strip()
+        if not line:
+            continue
+        parts = line.split()
+        if len(parts) != 2:
+            raise ValueError(f"line {lineno}: expected 'domain score', got {line!r}")
+        domain, raw_score = parts
+        exact = domain.startswith("=")
+        domain = domain.lstrip("=").lstrip("*.").strip(".").lower()
+        score = float(raw_score)
+        if not domain or not 0.0 <= score <= 1.0:
+            raise ValueError(f"line {lineno}: bad rule {line!r}")
+        rules[("=" if exact else "") + domain] = Rule(domain, score, exact)
+    return rules
+
+
+class ReputationIndex:
+    """Immutable suffix -> rule index for one version of the reputation list."""
+
+    def __init__(self, rules: Dict[str, Rule]):
+        self._rules = rules
+        self.version = hashlib.sha1(
+            "\n".join(f"{k}\t{r.score}" for k, r in sorted(rules.items())).encode("utf-8")
+        ).hexdigest()[:12]
+
+    @classmethod
+    def from_file(cls, path: str) -> "ReputationIndex":
+        with open(path, encoding="utf-8") as fh:
+            return cls(parse_rules(fh))
+
+    @classmethod
+    def from_lists(cls, trusted: Iterable[str], blacklist: Iterable[str]) -> "ReputationIndex":
+        rules = {d: Rule(d, 0.9, False) for d in trusted}
+        rules.update({d: Rule(d, 0.2, False) for d in blacklist})
+        return cls(rules)
+
+    def __len__(self) -> int:
+        return len(self._rules)
+
+    def lookup(self, host: str) -> Optional[Rule]:
+        """Most specific rule covering `host`, or None."""
+        host = host.strip(".").lower()
+        if not host:
+            return None
+        rules = self._rules
+        exact = rules.get("=" + host)
+        if exact is not None:
+            return exact
+        labels = host.split(".")
+        for i in range(len(labels)):
+            rule = rules.get(".".join(labels[i:]))
+            if rule is not None:
+                return rule
+        return None
+
+
+class DomainReputation:
+    """Reputation index that follows changes to its backing file."""
+
+    def __init__(self, path: Optional[str], reload_interval: float = REPUTATION_RELOAD_INTERVAL):
+        self.path = path
+        self.reload_interval = reload_interval
+        self._lock = threading.Lock()
+        self._signature: Optional[Tuple[int, int]] = None
+        self._next_check = 0.0
+        self.reloads = 0
+        self.reload_errors = 0
+        self._index = ReputationIndex.from_lists(TRUSTED_DOMAINS, BLACKLIST_DOMAINS)
+        self.reload()
+
+    @property
+    def index(self) -> ReputationIndex:
+        if self.path and time.monotonic() >= self._next_check:
+            self.reload()
+        return self._index
+
+    @property
+    def version(self) -> str:
+        return self.index.version
+
+    def _file_signature(self) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def reload(self, force: bool = False) -> bool:
+        """Rebuild the index if the file changed; returns True if swapped."""
+        if not self.path:
+            return False
+        # only one thread reloads; the others keep reading the current index
+        if not self._lock.acquire(blocking=False):
+            return False
+        try:
+            self._next_check = time.monotonic() + self.reload_interval
+            signature = self._file_signature()
+            if signature is None or (signature == self._signature and not force):
+                return False
+            try:
+                index = ReputationIndex.from_file(self.path)
+            except (OSError, ValueError) as e:
+                self.reload_errors += 1
+                logger.error("Keeping previous reputation list; could not load %s: %s", self.path, e)
+                return False
+            self._index = index
+            self._signature = signature
+            self.reloads += 1
+            logger.info("Loaded %d reputation rules from %s", len(index), self.path)
+            return True
+        finally:
+            self._lock.release()
+
+    def lookup(self, host: str) -> Optional[Rule]:
+        return self.index.lookup(host)
+
+    def lookup_many(self, hosts: Iterable[str]) -> List[Optional[Rule]]:
+        index = self.index  # one snapshot for the whole batch
+        return [index.lookup(h) if h else None for h in hosts]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "rules": len(self._index),
+            "version": self._index.version,
+            "reloads": self.reloads,
+            "reload_errors": self.reload_errors,
+        }
+
+
+def _make_extractor():
+    tldextract = lazy_import("tldextract") if _HAS_TLDEXTRACT else None
+    if tldextract is None:
+        return None
+    urls = (Path(PUBLIC_SUFFIX_LIST).as_uri(),) if os.path.exists(PUBLIC_SUFFIX_LIST) else ()
+    # no cache_dir and only local suffix lists: never touches the network or disk cache
+    return tldextract.TLDExtract(cache_dir=None, suffix_list_urls=urls, fallback_to_snapshot=True)
+
+
+_extractor = None
+_extractor_lock = threading.Lock()
+
+
+def _get_extractor():
+    global _extractor
+    if _extractor is None:
+        with _extractor_lock:
+            if _extractor is None:
+                _extractor = _make_extractor() or False
+    return _extractor or None
+
+
+REPUTATION = DomainReputation(REPUTATION_FILE)
 
-def _extract_domain(url: str) -> Optional[str]:
+
+def _hostname(url: str) -> str:
+    try:
+        p = urlparse(url if "://" in url else "http://" + url)
+        return (p.hostname or "").strip(".")
+    except Exception:
+        return ""
+
+
+@lru_cache(maxsize=65536)
+def _registered_domain(host: str) -> str:
+    e = _get_extractor()(host)
+    return ".".join(part for part in [e.domain, e.suffix] if part)
+
+
+def _extract_domain(url: str, host: Optional[str] = None) -> Optional[str]:
     if not url:
         return None
-    if _HAS_TLDEXTRACT:
+    if host is None:
+        host = _hostname(url)
+    if _get_extractor() is not None:
         try:
-            e = tldextract.extract(url)
-            return ".".join(part for part in [e.domain, e.suffix] if part)
+            # bulk URL lists repeat hosts a lot; the registered domain only depends on the host
+            return _registered_domain(host or url)
         except Exception:
             return url
     # fallback: crude parse
-    try:
-        from urllib.parse import urlparse
-
-        p = urlparse(url if url.startswith("http") else "http://" + url)
-        host = p.hostname or url
-        # strip www.
-        if host.startswith("www."):
-            host = host[4:]
-        return host
-    except Exception:
-        return url
+    host = host or url
+    # strip www.
+    if host.startswith("www."):
+        host = host[4:]
+    return host
+
+
+def _result(url: str, host: str, rule: Optional[Rule]) -> Dict[str, Any]:
+    domain = _extract_domain(url, host)
+    if rule is None:
+        return {"domain": domain, "score": UNKNOWN_SCORE, "status": "Unknown"}
+    out = {"domain": domain, "score": rule.score, "status": status_for(rule.score)}
+    if rule.domain != domain:
+        out["matched"] = ("=" if rule.exact else "") + rule.domain
+    return out
 
 
 def check_source_credibility(url: str) -> Optional[Dict[str, Any]]:
     if not url:
         return None
-    domain = _extract_domain(url)
-    if domain in TRUSTED_DOMAINS:
-        return {"domain": domain, "score": 0.9, "status": "Trusted"}
-    if domain in BLACKLIST_DOMAINS:
-        return {"domain": domain, "score": 0.2, "status": "Unreliable"}
-    return {"domain": domain, "score": 0.5, "status": "Unknown"}
+    host = _hostname(url)
+    return _result(url, host, REPUTATION.lookup(host))
+
+
+def check_source_credibility_batch(urls: List[str]) -> List[Optional[Dict[str, Any]]]:
+    """`check_source_credibility` for many URLs against one consistent list."""
+    hosts = [_hostname(u) if u else "" for u in urls]
+    rules = REPUTATION.lookup_many(hosts)
+    return [_result(u, h, rule) if u else None for u, h, rule in zip(urls, hosts, rules)]
@@ -1,18 +1,154 @@
+import base64
+import binascii
+import itertools
+import json
+import logging
+import os
+import queue
 import sqlite3
+import threading
+import time
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Optional
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from app.metrics import timed
+
+logger = logging.getLogger("fakenews")
 
 DB_PATH = Path(__file__).resolve().parents[1] / "demo.db"
+DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", "8"))
+# votes are also summed per time bucket of this many seconds (for windowed leaderboards)
+VOTE_BUCKET_SECONDS = int(os.environ.get("VOTE_BUCKET_SECONDS", "300"))
 
+# WAL lets readers proceed while a writer commits; NORMAL sync is safe with WAL
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-8000",
+)
 
-def get_conn():
-    conn = sqlite3.connect(str(DB_PATH))
+
+def _connect(path) -> sqlite3.Connection:
+    conn = sqlite3.connect(str(path), timeout=5, check_same_thread=False)
     conn.row_factory = sqlite3.Row
+    for pragma in PRAGMAS:
+        conn.execute(pragma)
     return conn
 
 
+def get_conn():
+    """Open a standalone connection (prefer `connection()` which uses the pool)."""
+    return _connect(DB_PATH)
+
+
+class ConnectionPool:
+    """Small thread-safe pool of SQLite connections to one database file."""
+
+    def __init__(self, path, size: int = DB_POOL_SIZE) -> None:
+        self.path = Path(path)
+        self.size = max(1, size)
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._lock = threading.Lock()
+        self.created = 0
+        self.in_use = 0
+        self.waits = 0
+        # set once the schema has been created in this database file
+        self.schema_ready = False
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.waits += 1
+            self._slots.acquire()
+        try:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                conn = _connect(self.path)
+                with self._lock:
+                    self.created += 1
+            with self._lock:
+                self.in_use += 1
+            try:
+                yield conn
+            except BaseException:
+                conn.rollback()
+                raise
+            finally:
+                with self._lock:
+                    self.in_use -= 1
+                self._idle.put(conn)
+        finally:
+            self._slots.release()
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": self.size,
+                "created": self.created,
+                "in_use": self.in_use,
+                "idle": self._idle.qsize(),
+                "waits": self.waits,
+            }
+
+
+_pool: Optional[ConnectionPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ConnectionPool:
+    """Return the pool for the current DB_PATH (recreated if DB_PATH changes)."""
+    global _pool
+    with _pool_lock:
+        if _pool is None or _pool.path != Path(DB_PATH):
+            if _pool is not None:
+                _pool.close()
+            _pool = ConnectionPool(DB_PATH)
+        return _pool
+
+
+@contextmanager
+def connection() -> Iterator[sqlite3.Connection]:
+    pool = get_pool()
+    if not pool.schema_ready:
+        # the app creates the schema during warmup; this covers scripts,
+        # tests and requests that arrive first
+        _init_schema(pool)
+    with pool.connection() as conn:
+        yield conn
+
+
+_schema_lock = threading.Lock()
+
+
+def _init_schema(pool: ConnectionPool) -> None:
+    with _schema_lock:
+        if pool.schema_ready:
+            return
+        with pool.connection() as conn:
+            _create_tables(conn)
+        pool.schema_ready = True
+
+
 def init_db():
-    conn = get_conn()
+    pool = get_pool()
+    pool.schema_ready = False
+    _init_schema(pool)
+
+
+def _create_tables(conn: sqlite3.Connection) -> None:
     cur = conn.cursor()
     cur.execute(
         """
@@ -32,58 +168,301 @@ def init_db():
         )
         """
     )
+    # keyset pagination (newest subscriptions, highest scores first) walks these
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_subscriptions_created_at ON subscriptions (created_at, id)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_votes_score ON votes (score, item_id)")
+    # per-bucket vote sums; the primary key serves "buckets since" range reads
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS vote_buckets (
+            bucket INTEGER NOT NULL,
+            item_id TEXT NOT NULL,
+            score INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (bucket, item_id)
+        )
+        """
+    )
+    # analyzed texts for the near-duplicate index (app/neardup.py)
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS analyses (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            signature BLOB NOT NULL,
+            version TEXT NOT NULL,
+            result TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """
+    )
     conn.commit()
-    conn.close()
 
 
+@timed("db.add_subscription")
 def add_subscription(channel: str, address: str):
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute("INSERT INTO subscriptions (channel, address) VALUES (?,?)", (channel, address))
-    conn.commit()
-    conn.close()
+    with connection() as conn:
+        conn.execute("INSERT INTO subscriptions (channel, address) VALUES (?,?)", (channel, address))
+        conn.commit()
+
+
+VoteListener = Callable[[Dict[str, int], Dict[str, int], int, int], None]
+_vote_listeners: List[VoteListener] = []
+# taken while a vote transaction holds the write lock, so it grows in commit order
+_vote_seq = itertools.count(1)
+
+
+def add_vote_listener(listener: VoteListener) -> None:
+    """Call `listener(deltas, scores, bucket, seq)` after every committed vote
+    write: the deltas applied, the resulting scores, the start of their time
+    bucket and the write's sequence number.
+
+    Listeners run after the commit and outside any pooled connection, so
+    writes that commit close together may be reported out of order: a score
+    with a lower `seq` than one already seen for the same item is stale.
+    """
+    _vote_listeners.append(listener)
+
+
+def _notify_votes(deltas: Dict[str, int], scores: Dict[str, int], bucket: int, seq: int) -> None:
+    for listener in _vote_listeners:
+        try:
+            listener(deltas, scores, bucket, seq)
+        except Exception:
+            logger.exception("Vote listener failed")
+
+
+def vote_bucket(now: Optional[float] = None) -> int:
+    """Start (epoch seconds) of the time bucket `now` falls into."""
+    now = time.time() if now is None else now
+    return int(now) // VOTE_BUCKET_SECONDS * VOTE_BUCKET_SECONDS
+
 
+_UPSERT_VOTE = """
+    INSERT INTO votes (item_id, score) VALUES (?, ?)
+    ON CONFLICT(item_id) DO UPDATE SET score = score + excluded.score
+    RETURNING score
+"""
+_UPSERT_BUCKET = """
+    INSERT INTO vote_buckets (bucket, item_id, score) VALUES (?, ?, ?)
+    ON CONFLICT(bucket, item_id) DO UPDATE SET score = score + excluded.score
+"""
 
+
+@timed("db.add_vote")
 def add_vote(item_id: str, delta: int) -> int:
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute("SELECT score FROM votes WHERE item_id = ?", (item_id,))
-    row = cur.fetchone()
-    if row is None:
-        cur.execute("INSERT INTO votes (item_id, score) VALUES (?,?)", (item_id, delta))
-        score = delta
-    else:
-        score = row["score"] + delta
-        cur.execute("UPDATE votes SET score = ? WHERE item_id = ?", (score, item_id))
-    conn.commit()
-    conn.close()
+    # single atomic upsert: no read-modify-write race between concurrent voters
+    bucket = vote_bucket()
+    with connection() as conn:
+        row = conn.execute(_UPSERT_VOTE, (item_id, delta)).fetchone()
+        conn.execute(_UPSERT_BUCKET, (bucket, item_id, delta))
+        seq = next(_vote_seq)
+        conn.commit()
+    score = int(row["score"])
+    _notify_votes({item_id: delta}, {item_id: score}, bucket, seq)
     return score
 
 
+@timed("db.add_votes")
+def add_votes(deltas: Dict[str, int]) -> None:
+    """Apply many vote deltas in one transaction (used by the write-behind aggregator)."""
+    if not deltas:
+        return
+    bucket = vote_bucket()
+    with connection() as conn:
+        scores = {
+            item_id: int(conn.execute(_UPSERT_VOTE, (item_id, delta)).fetchone()["score"])
+            for item_id, delta in deltas.items()
+        }
+        conn.executemany(_UPSERT_BUCKET, [(bucket, item_id, delta) for item_id, delta in deltas.items()])
+        seq = next(_vote_seq)
+        conn.commit()
+    _notify_votes(dict(deltas), scores, bucket, seq)
+
+
+def iter_vote_buckets(since: int) -> Iterator[Tuple[int, str, int]]:
+    """(bucket, item_id, score) for every bucket starting at or after `since`, oldest first."""
+    with connection() as conn:
+        for r in conn.execute(
+            "SELECT bucket, item_id, score FROM vote_buckets WHERE bucket >= ? ORDER BY bucket", (since,)
+        ):
+            yield r["bucket"], r["item_id"], r["score"]
+
+
+@timed("db.prune_vote_buckets")
+def prune_vote_buckets(before: int) -> int:
+    """Delete buckets that start before `before`; returns the number removed."""
+    with connection() as conn:
+        cur = conn.execute("DELETE FROM vote_buckets WHERE bucket < ?", (before,))
+        conn.commit()
+    return cur.rowcount
+
+
+@timed("db.get_score")
 def get_score(item_id: str) -> Optional[int]:
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute("SELECT score FROM votes WHERE item_id = ?", (item_id,))
-    row = cur.fetchone()
-    conn.close()
+    with connection() as conn:
+        row = conn.execute("SELECT score FROM votes WHERE item_id = ?", (item_id,)).fetchone()
     if row is None:
         return 0
     return int(row["score"])
 
 
-def get_subscriptions():
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute("SELECT id, channel, address, created_at FROM subscriptions ORDER BY created_at DESC")
-    rows = cur.fetchall()
-    conn.close()
-    return [dict(r) for r in rows]
+def encode_cursor(key: Tuple[Any, ...]) -> str:
+    """Opaque page cursor for the sort key of the last row on a page."""
+    return base64.urlsafe_b64encode(json.dumps(list(key)).encode()).decode().rstrip("=")
 
 
-def get_all_votes():
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute("SELECT item_id, score FROM votes")
-    rows = cur.fetchall()
-    conn.close()
-    return {r['item_id']: r['score'] for r in rows}
+def _valid_key_value(value: Any, kind: type) -> bool:
+    if kind is int:
+        # bool is an int subclass; SQLite integers are 64-bit
+        return type(value) is int and -(2 ** 63) <= value < 2 ** 63
+    return type(value) is kind
+
+
+def decode_cursor(cursor: str, types: Tuple[type, ...]) -> Tuple[Any, ...]:
+    """Inverse of `encode_cursor` for a sort key of the given element `types`;
+    raises ValueError for a malformed cursor."""
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError):
+        raise ValueError("Invalid cursor") from None
+    if not isinstance(key, list) or len(key) != len(types):
+        raise ValueError("Invalid cursor")
+    if not all(_valid_key_value(value, kind) for value, kind in zip(key, types)):
+        raise ValueError("Invalid cursor")
+    return tuple(key)
+
+
+def _page(sql: str, after_sql: str, key: Tuple[Tuple[str, type], ...], limit: int, cursor: Optional[str]):
+    """One keyset page: (rows, cursor for the next page or None).
+
+    `sql` is the SELECT up to its WHERE position, `after_sql` the condition
+    that keeps rows after the cursor key, `key` its (field, type) pairs; one
+    extra row is read to tell whether another page follows.
+    """
+    key_fields = tuple(field for field, _ in key)
+    params: List[Any] = []
+    if cursor:
+        params.extend(decode_cursor(cursor, tuple(kind for _, kind in key)))
+        sql = sql.format(where=f"WHERE {after_sql}")
+    else:
+        sql = sql.format(where="")
+    with connection() as conn:
+        rows = [dict(r) for r in conn.execute(sql, (*params, limit + 1)).fetchall()]
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(tuple(rows[-1][f] for f in key_fields))
+
+
+def _iter_pages(page: Callable[[int, Optional[str]], Tuple[List[dict], Optional[str]]], batch_size: int) -> Iterator[dict]:
+    """Every row of a keyset-paginated query, one batch (and one short-lived
+    pooled connection) at a time."""
+    cursor = None
+    while True:
+        rows, cursor = page(batch_size, cursor)
+        yield from rows
+        if cursor is None:
+            return
+
+
+_SUBSCRIPTIONS_PAGE = (
+    "SELECT id, channel, address, created_at FROM subscriptions {where} "
+    "ORDER BY created_at DESC, id DESC LIMIT ?"
+)
+_SUBSCRIPTIONS_KEY = (("created_at", str), ("id", int))
+_VOTES_PAGE = "SELECT item_id, score FROM votes {where} ORDER BY score DESC, item_id DESC LIMIT ?"
+_VOTES_PAGE_LOWEST = "SELECT item_id, score FROM votes {where} ORDER BY score, item_id LIMIT ?"
+_VOTES_KEY = (("score", int), ("item_id", str))
+
+
+@timed("db.get_subscriptions")
+def get_subscriptions(limit: int = 100, cursor: Optional[str] = None) -> Tuple[List[dict], Optional[str]]:
+    """A page of subscriptions, newest first, and the cursor of the next page."""
+    return _page(_SUBSCRIPTIONS_PAGE, "(created_at, id) < (?, ?)", _SUBSCRIPTIONS_KEY, limit, cursor)
+
+
+def iter_subscriptions(batch_size: int = 1000) -> Iterator[dict]:
+    """All subscriptions, newest first, read in keyset batches (for exports)."""
+    return _iter_pages(get_subscriptions, batch_size)
+
+
+@timed("db.count_subscriptions")
+def count_subscriptions() -> int:
+    with connection() as conn:
+        return int(conn.execute("SELECT COUNT(*) FROM subscriptions").fetchone()[0])
+
+
+@timed("db.get_votes")
+def get_votes(limit: int = 100, cursor: Optional[str] = None, lowest: bool = False) -> Tuple[List[dict], Optional[str]]:
+    """A page of vote scores, highest (or lowest) first, and the cursor of the next page."""
+    if lowest:
+        return _page(_VOTES_PAGE_LOWEST, "(score, item_id) > (?, ?)", _VOTES_KEY, limit, cursor)
+    return _page(_VOTES_PAGE, "(score, item_id) < (?, ?)", _VOTES_KEY, limit, cursor)
+
+
+def iter_votes(batch_size: int = 1000) -> Iterator[dict]:
+    """All vote scores, highest first, read in keyset batches (for exports)."""
+    return _iter_pages(get_votes, batch_size)
+
+
+@timed("db.count_votes")
+def count_votes() -> int:
+    with connection() as conn:
+        return int(conn.execute("SELECT COUNT(*) FROM votes").fetchone()[0])
+
+
+@timed("db.add_analysis")
+def add_analysis(signature: bytes, version: str, result: str) -> int:
+    with connection() as conn:
+        cur = conn.execute(
+            "INSERT INTO analyses (signature, version, result) VALUES (?,?,?)", (signature, version, result)
+        )
+        conn.commit()
+    return int(cur.lastrowid)
+
+
+@timed("db.replace_analysis")
+def replace_analysis(analysis_id: int, signature: bytes, version: str, result: str) -> bool:
+    """Overwrite a stored analysis in place (its id stays valid); False if it is gone."""
+    with connection() as conn:
+        cur = conn.execute(
+            "UPDATE analyses SET signature = ?, version = ?, result = ? WHERE id = ?",
+            (signature, version, result, analysis_id),
+        )
+        conn.commit()
+    return cur.rowcount > 0
+
+
+@timed("db.get_analysis")
+def get_analysis(analysis_id: int) -> Optional[dict]:
+    with connection() as conn:
+        row = conn.execute(
+            "SELECT id, version, result, created_at FROM analyses WHERE id = ?", (analysis_id,)
+        ).fetchone()
+    return dict(row) if row is not None else None
+
+
+@timed("db.prune_analyses")
+def prune_analyses(keep: int) -> int:
+    """Delete all but the `keep` most recently added analyses; returns the number removed."""
+    with connection() as conn:
+        cur = conn.execute(
+            "DELETE FROM analyses WHERE id <= (SELECT id FROM analyses ORDER BY id DESC LIMIT 1 OFFSET ?)", (keep,)
+        )
+        conn.commit()
+    return cur.rowcount
+
+
+def iter_analysis_signatures(batch_size: int = 10000) -> Iterator[Tuple[int, str, bytes]]:
+    """(id, version, signature) for every stored analysis, in id order."""
+    last_id = 0
+    while True:
+        with connection() as conn:
+            rows = conn.execute(
+                "SELECT id, version, signature FROM analyses WHERE id > ? ORDER BY id LIMIT ?",
+                (last_id, batch_size),
+            ).fetchall()
+        if not rows:
+            return
+        for r in rows:
+            yield r["id"], r["version"], r["signature"]
+        last_id = rows[-1]["id"]
@@ -0,0 +1,134 @@
+# backend/app/document.py
+"""One tokenized view of a text, shared by every analyzer in a request.
+
+The model, highlighter, keyword extraction, summarizer, sentiment and bias
+check all need some mix of the lowercased text, its word tokens, its
+sentences and term counts. A `Document` computes each of those at most once,
+on first use, and `/analyze`, `/summarize`, `/bias` and the batch paths build
+one per text and hand it to every stage instead of the raw string.
+
+Offsets index into the original text: `lower` is lowercased without changing
+length (see `app.lexicon`), so a token or sentence span from it can be used
+to slice `text` directly.
+"""
+import re
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from app.lexicon import LEXICON, LexiconScan, _lower_same_length
+
+_WORD_RE = re.compile(r"\w+")
+# same boundaries as the summarizer has always used
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?])\s+")
+
+
+class Document:
+    """Normalized text with lazily computed tokens, sentences and counts."""
+
+    __slots__ = ("text", "lower", "_tokens", "_offsets", "_sentences", "_sentence_tokens",
+                 "_counts", "_scan", "_sentiment_tokens", "_n_words")
+
+    def __init__(self, text: Optional[str]) -> None:
+        self.text = text or ""
+        self.lower = _lower_same_length(self.text)
+        self._tokens: Optional[List[str]] = None
+        self._offsets: Optional[np.ndarray] = None
+        self._sentences: Optional[List[Tuple[int, int]]] = None
+        self._sentence_tokens: Optional[List[List[str]]] = None
+        self._counts: Optional[Dict[str, int]] = None
+        self._scan: Optional[LexiconScan] = None
+        self._sentiment_tokens: Optional[List[str]] = None
+        self._n_words: Optional[int] = None
+
+    def __len__(self) -> int:
+        return len(self.text)
+
+    @property
+    def tokens(self) -> List[str]:
+        """Lowercase `\\w+` tokens, in order."""
+        if self._tokens is None:
+            self._tokens = _WORD_RE.findall(self.lower)
+        return self._tokens
+
+    @property
+    def offsets(self) -> np.ndarray:
+        """(n_tokens, 2) start/end offset of each token in `text`."""
+        if self._offsets is None:
+            spans = [span for m in _WORD_RE.finditer(self.lower) for span in m.span()]
+            self._offsets = np.array(spans, dtype=np.int64).reshape(-1, 2)
+        return self._offsets
+
+    @property
+    def n_words(self) -> int:
+        """Whitespace-separated word count (what the model's length rule uses)."""
+        if self._n_words is None:
+            self._n_words = len(self.lower.split())
+        return self._n_words
+
+    @property
+    def sentences(self) -> List[Tuple[int, int]]:
+        """(start, end) spans of the non-empty, stripped sentences."""
+        if self._sentences is None:
+            spans = []
+            pos = 0
+            text = self.text
+            for m in _SENTENCE_END_RE.finditer(text):
+                spans.append((pos, m.start()))
+                pos = m.end()
+            spans.append((pos, len(text)))
+            out = []
+            for start, end in spans:
+                piece = text[start:end]
+                stripped = piece.strip()
+                if stripped:
+                    start += len(piece) - len(piece.lstrip())
+                    out.append((start, start + len(stripped)))
+            self._sentences = out
+        return self._sentences
+
+    @property
+    def sentence_texts(self) -> List[str]:
+        return [self.text[s:e] for s, e in self.sentences]
+
+    @property
+    def sentence_tokens(self) -> List[List[str]]:
+        """Tokens of each sentence, sliced from `tokens` (sentences split at
+        whitespace, so no token crosses a boundary)."""
+        if self._sentence_tokens is None:
+            tokens = self.tokens
+            starts = self.offsets[:, 0]
+            bounds = np.searchsorted(starts, np.array(self.sentences, dtype=np.int64).reshape(-1, 2))
+            self._sentence_tokens = [tokens[lo:hi] for lo, hi in bounds.tolist()]
+        return self._sentence_tokens
+
+    @property
+    def term_counts(self) -> Dict[str, int]:
+        """Occurrences per token, in order of first occurrence."""
+        if self._counts is None:
+            counts: Dict[str, int] = {}
+            for t in self.tokens:
+                counts[t] = counts.get(t, 0) + 1
+            self._counts = counts
+        return self._counts
+
+    @property
+    def scan(self) -> LexiconScan:
+        """`LEXICON.scan(text)`, shared by the model and the highlighter."""
+        if self._scan is None:
+            self._scan = LEXICON.scan(self.text, lowered=self.lower)
+        return self._scan
+
+    @property
+    def sentiment_tokens(self) -> List[str]:
+        """Tokens for the built-in sentiment engine ("n't" split off, "!" kept)."""
+        if self._sentiment_tokens is None:
+            from app.sentiment_engine import tokenize_lowered
+
+            self._sentiment_tokens = tokenize_lowered(self.lower)
+        return self._sentiment_tokens
+
+
+def as_document(text: Union[str, Document, None]) -> Document:
+    """`text` itself if it already is a Document, else a new one."""
+    return text if isinstance(text, Document) else Document(text)
@@ -1,44 +1,49 @@
 # backend/app/explain.py
-import re
 import html
-from typing import List, Tuple
+from typing import Dict, List, Optional, Tuple, Union
 
-HIGHLIGHT_WORDS = [
-    "shocking",
-    "miracle",
-    "secret",
-    "exposed",
-    "cure",
-    "unbelievable",
-    "exclusive",
-    "claims",
-]
+from app.document import Document, as_document
+from app.lexicon import LEXICON, LexiconScan
 
+HIGHLIGHT_WORDS = LEXICON.terms("highlight")
 
-def highlight_keywords(text: str) -> Tuple[str, List[str]]:
+MARK_OPEN = "<mark class='bg-yellow-200 text-red-700 font-semibold'>"
+MARK_CLOSE = "</mark>"
+
+
+def highlight_keywords(text: Union[str, Document], scan: Optional[LexiconScan] = None) -> Tuple[str, List[str]]:
     """Escape incoming text to avoid XSS then highlight known sensational words.
 
+    `text` may be a `Document` (its lexicon scan and term counts are shared
+    with the other analyzers), or `scan` a precomputed `LEXICON.scan(text)`.
     Returns (highlighted_html, keywords_list).
     """
+    doc = as_document(text)
+    text = doc.text
     if not text:
         return ("", [])
 
-    # Escape HTML to avoid XSS, then perform case-insensitive replacement
-    escaped = html.escape(text)
-    highlighted = escaped
-    for w in HIGHLIGHT_WORDS:
-        # use a word-boundary aware regex to avoid partial matches
-        highlighted = re.sub(rf"(?i)\b({re.escape(w)})\b",
-                             r"<mark class='bg-yellow-200 text-red-700 font-semibold'>\1</mark>",
-                             highlighted)
+    if scan is None:
+        scan = doc.scan
+    # Escape HTML to avoid XSS between and inside the whole-word matches
+    parts = []
+    pos = 0
+    for start, end, _ in scan.word_matches("highlight"):
+        parts.append(html.escape(text[pos:start]))
+        parts.append(MARK_OPEN + html.escape(text[start:end]) + MARK_CLOSE)
+        pos = end
+    parts.append(html.escape(text[pos:]))
+    highlighted = "".join(parts)
+
+    return (highlighted, top_keywords(keyword_counts(doc)))
+
+
+def keyword_counts(text: Union[str, Document]) -> Dict[str, int]:
+    """Count candidate keywords (words longer than 3 chars) in `text`."""
+    return {t: n for t, n in as_document(text).term_counts.items() if len(t) > 3}
+
 
+def top_keywords(freq: Dict[str, int], k: int = 12) -> List[str]:
     # return top simple keywords (first 12 words frequency)
-    words = re.findall(r"\w+", text.lower())
-    freq = {}
-    for t in words:
-        if len(t) <= 3:
-            continue
-        freq[t] = freq.get(t, 0) + 1
     sorted_kw = sorted(freq.items(), key=lambda x: x[1], reverse=True)
-    top = [k for k, _ in sorted_kw[:12]]
-    return (highlighted, top)
+    return [w for w, _ in sorted_kw[:k]]
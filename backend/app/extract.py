@@ -0,0 +1,436 @@
+# backend/app/extract.py
+"""Main-content text extraction for URL inputs.
+
+Pages are fetched with a byte cap (EXTRACT_MAX_BYTES, default 2 MiB; longer
+pages are cut there rather than rejected) and fed to a streaming parser in
+chunks. The parser never builds a DOM: it keeps only text blocks (paragraphs,
+headings, list items, ...) with a little context about each, so memory stays
+proportional to the visible text rather than to the markup. lxml's parser is
+used when it is installed, the standard library's `html.parser` otherwise.
+
+Boilerplate is dropped in two passes:
+
+* while parsing, whole subtrees are skipped for non-content tags (script,
+  style, nav, header, footer, aside, form, ...), and text inside elements
+  whose class or id looks like navigation, menus, cookie banners, share bars
+  and so on is marked as boilerplate. The marker is only a hint: it is never
+  taken from <html>, <body>, <main> or <article> (CMS themes put classes like
+  "has-sidebar" or "tag-social" on those), and an <article> or <main> nested
+  inside a marked wrapper is content again;
+* afterwards, unmarked blocks are filtered: if the page has an <article> or
+  <main> element holding enough text, only blocks inside it are kept;
+  otherwise blocks that are mostly link text or too short to be prose are
+  dropped. If the class/id markers left (almost) nothing, the same filter
+  runs over all blocks instead, and if that leaves nothing too, all remaining
+  text is returned so short pages still produce something.
+
+`fetch_article(url)` caches the extracted text per URL. Within
+EXTRACT_CACHE_TTL seconds it is returned as is; after that the page is
+revalidated with If-None-Match / If-Modified-Since and a 304 reuses the cached
+text without downloading or parsing anything.
+"""
+import codecs
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from html.parser import HTMLParser
+from typing import Any, Dict, Iterable, List, Optional
+
+from fastapi.concurrency import run_in_threadpool
+
+from app.fetch import fetch_url
+from app.metrics import span
+from app.startup import has_module, lazy_import
+
+EXTRACT_MAX_BYTES = int(os.environ.get("EXTRACT_MAX_BYTES", str(2 * 1024 * 1024)))
+EXTRACT_CACHE_TTL = float(os.environ.get("EXTRACT_CACHE_TTL", "300"))
+EXTRACT_CACHE_MAX_ENTRIES = int(os.environ.get("EXTRACT_CACHE_MAX_ENTRIES", "512"))
+CHUNK_SIZE = 64 * 1024
+
+# fast C parser, optional
+_HAS_LXML = has_module("lxml")
+
+SKIP_TAGS = frozenset({
+    "script", "style", "noscript", "template", "svg", "canvas", "iframe", "object",
+    "nav", "header", "footer", "aside", "form", "button", "select", "textarea", "menu", "dialog",
+})
+BLOCK_TAGS = frozenset({
+    "p", "div", "section", "article", "main", "li", "ul", "ol", "dl", "dt", "dd", "blockquote",
+    "pre", "h1", "h2", "h3", "h4", "h5", "h6", "table", "tr", "td", "th", "figure", "figcaption",
+    "br", "hr", "body", "html",
+})
+HEADING_TAGS = frozenset({"h1", "h2", "h3", "h4", "h5", "h6"})
+CONTENT_TAGS = frozenset({"article", "main"})
+# never marked as boilerplate from their class/id: they wrap the whole page or the article
+STRUCTURAL_TAGS = frozenset({"html", "body"}) | CONTENT_TAGS
+VOID_TAGS = frozenset({
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "param",
+    "source", "track", "wbr",
+})
+BOILERPLATE_RE = re.compile(
+    r"(?:^|[\s_-])(?:nav|navbar|menu|footer|sidebar|side-bar|breadcrumbs?|comments?|share|"
+    r"social|cookie|consent|banner|promo|advert|ads?|sponsor|newsletter|subscribe|related|"
+    r"popup|modal|masthead|toolbar|pagination|widget)(?:$|[\s_-])",
+    re.IGNORECASE,
+)
+_CHARSET_RE = re.compile(rb"""<meta[^>]+charset=["']?([\w-]+)""", re.IGNORECASE)
+_SPACE_RE = re.compile(r"\s+")
+
+MIN_BLOCK_WORDS = 8
+MAX_LINK_DENSITY = 0.5
+MIN_CONTENT_WORDS = 40
+
+
+@dataclass
+class Block:
+    text: str
+    tag: str
+    words: int
+    link_chars: int
+    in_content: bool
+    boilerplate: bool = False
+
+
+@dataclass
+class Article:
+    url: str
+    text: str
+    title: str = ""
+    truncated: bool = False
+    parser: str = "html.parser"
+    source_bytes: int = 0
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    fetched_at: float = field(default_factory=time.time)
+
+
+class _BlockCollector:
+    """Parser target: turns start/end/data events into text blocks."""
+
+    def __init__(self) -> None:
+        self.blocks: List[Block] = []
+        self.title = ""
+        self._stack: List[str] = []
+        # per open element: whether it pushed onto `_marks`
+        self._marked: List[bool] = []
+        # innermost boilerplate (True) / content (False) ancestors
+        self._marks: List[bool] = []
+        self._skip_depth = 0  # > 0 while inside a skipped subtree
+        self._content_depth = 0
+        self._link_depth = 0
+        self._in_title = False
+        self._parts: List[str] = []
+        self._link_chars = 0
+        self._block_tag = "p"
+
+    # parser target interface (lxml calls these directly)
+    def start(self, tag: str, attrs: Dict[str, Any]) -> None:
+        tag = tag.lower()
+        if tag in VOID_TAGS:
+            if tag in BLOCK_TAGS and not self._skip_depth:
+                self._flush()
+            return
+        skip = (
+            self._skip_depth > 0
+            # an article's own <header> usually holds its headline
+            or (tag in SKIP_TAGS and not (tag == "header" and self._content_depth))
+            or _is_hidden(attrs)
+        )
+        self._stack.append(tag)
+        if skip:
+            self._marked.append(False)
+            self._skip_depth += 1
+            return
+        if tag in BLOCK_TAGS:
+            self._flush()
+            self._block_tag = tag
+        if tag in CONTENT_TAGS:
+            mark: Optional[bool] = False
+        elif tag not in STRUCTURAL_TAGS and _looks_like_boilerplate(attrs):
+            mark = True
+        else:
+            mark = None
+        if mark is not None and tag not in BLOCK_TAGS:
+            self._flush()  # inline boilerplate (a share <span>) starts a block of its own
+        self._marked.append(mark is not None)
+        if mark is not None:
+            self._marks.append(mark)
+        if tag in CONTENT_TAGS:
+            self._content_depth += 1
+        elif tag == "a":
+            self._link_depth += 1
+        elif tag == "title":
+            self._in_title = True
+
+    def end(self, tag: str) -> None:
+        tag = tag.lower()
+        if tag in VOID_TAGS or tag not in self._stack:
+            return  # stray end tag
+        # close anything left open inside this element
+        while self._stack:
+            open_tag = self._stack.pop()
+            self._close(open_tag, self._marked.pop())
+            if open_tag == tag:
+                break
+
+    def _close(self, tag: str, marked: bool = False) -> None:
+        if self._skip_depth:
+            self._skip_depth -= 1
+            return
+        if tag in BLOCK_TAGS or marked:
+            self._flush()
+        if marked:
+            self._marks.pop()
+        if tag in CONTENT_TAGS:
+            self._content_depth -= 1
+        elif tag == "a":
+            self._link_depth -= 1
+        elif tag == "title":
+            self._in_title = False
+
+    def data(self, text: str) -> None:
+        if self._skip_depth or not text:
+            return
+        if self._in_title:
+            self.title += text
+            return
+        self._parts.append(text)
+        if self._link_depth:
+            self._link_chars += len(text.strip())
+
+    def close(self) -> "_BlockCollector":
+        while self._stack:
+            self._close(self._stack.pop(), self._marked.pop())
+        self._flush()
+        return self
+
+    def _flush(self) -> None:
+        if self._parts:
+            text = _SPACE_RE.sub(" ", "".join(self._parts)).strip()
+            if text:
+                self.blocks.append(Block(
+                    text=text,
+                    tag=self._block_tag,
+                    words=len(text.split()),
+                    link_chars=self._link_chars,
+                    in_content=self._content_depth > 0,
+                    boilerplate=bool(self._marks) and self._marks[-1],
+                ))
+        self._parts = []
+        self._link_chars = 0
+
+
+def _is_hidden(attrs: Dict[str, Any]) -> bool:
+    """Not rendered, or an ARIA landmark that is never the article."""
+    if not attrs:
+        return False
+    if "hidden" in attrs or attrs.get("aria-hidden") == "true":
+        return True
+    role = attrs.get("role") or ""
+    return role in ("navigation", "banner", "contentinfo", "complementary", "menu", "dialog")
+
+
+def _looks_like_boilerplate(attrs: Dict[str, Any]) -> bool:
+    if not attrs:
+        return False
+    marker = f"{attrs.get('class') or ''} {attrs.get('id') or ''}"
+    return bool(marker.strip()) and BOILERPLATE_RE.search(marker) is not None
+
+
+class _StdlibParser(HTMLParser):
+    def __init__(self, target: _BlockCollector) -> None:
+        super().__init__(convert_charrefs=True)
+        self.target = target
+
+    def handle_starttag(self, tag, attrs):
+        self.target.start(tag, dict(attrs))
+
+    def handle_startendtag(self, tag, attrs):
+        self.target.start(tag, dict(attrs))
+        if tag not in VOID_TAGS:
+            self.target.end(tag)
+
+    def handle_endtag(self, tag):
+        self.target.end(tag)
+
+    def handle_data(self, data):
+        self.target.data(data)
+
+
+def _make_parser(target: _BlockCollector):
+    """(feed, close, name) for the fastest available incremental parser."""
+    lxml_etree = lazy_import("lxml.etree") if _HAS_LXML else None
+    if lxml_etree is not None:
+        parser = lxml_etree.HTMLParser(target=target, recover=True, no_network=True)
+        return parser.feed, parser.close, "lxml"
+    parser = _StdlibParser(target)
+    return parser.feed, parser.close, "html.parser"
+
+
+def sniff_charset(head: bytes, declared: Optional[str] = None) -> str:
+    for candidate in (declared, _meta_charset(head), "utf-8"):
+        if candidate:
+            try:
+                return codecs.lookup(candidate).name
+            except LookupError:
+                continue
+    return "utf-8"
+
+
+def _meta_charset(head: bytes) -> Optional[str]:
+    m = _CHARSET_RE.search(head[:4096])
+    return m.group(1).decode("ascii", "ignore") if m else None
+
+
+def select_blocks(blocks: List[Block]) -> List[Block]:
+    """Keep the article body, dropping boilerplate, navigation-like and too-short blocks."""
+    kept = _filter_blocks([b for b in blocks if not b.boilerplate])
+    if sum(b.words for b in kept) < MIN_BLOCK_WORDS:
+        # the class/id markers can misfire on a whole page; never return nothing for that
+        kept = _filter_blocks(blocks)
+    return kept
+
+
+def _filter_blocks(blocks: List[Block]) -> List[Block]:
+    content = [b for b in blocks if b.in_content]
+    if sum(b.words for b in content) >= MIN_CONTENT_WORDS:
+        blocks = content
+    kept = [
+        b for b in blocks
+        if b.link_chars <= MAX_LINK_DENSITY * len(b.text)
+        and (b.words >= MIN_BLOCK_WORDS or b.tag in HEADING_TAGS or b.in_content)
+    ]
+    # drop headings that aren't followed by any kept prose
+    while kept and kept[-1].tag in HEADING_TAGS:
+        kept.pop()
+    return kept or blocks
+
+
+def extract_text(
+    chunks: Iterable[bytes],
+    charset: Optional[str] = None,
+    max_bytes: int = EXTRACT_MAX_BYTES,
+    url: str = "",
+) -> Article:
+    """Extract the main text from HTML given as byte chunks (or one bytes)."""
+    if isinstance(chunks, (bytes, bytearray)):
+        body = bytes(chunks)
+        chunks = (body[i:i + CHUNK_SIZE] for i in range(0, len(body), CHUNK_SIZE))
+    collector = _BlockCollector()
+    feed, close, parser_name = _make_parser(collector)
+    decoder = None
+    seen = 0
+    truncated = False
+    for chunk in chunks:
+        if not chunk:
+            continue
+        if decoder is None:
+            decoder = codecs.getincrementaldecoder(sniff_charset(chunk, charset))(errors="replace")
+        if seen + len(chunk) > max_bytes:
+            chunk = chunk[:max_bytes - seen]
+            truncated = True
+        seen += len(chunk)
+        feed(decoder.decode(chunk))
+        if truncated:
+            break
+    if decoder is not None:
+        feed(decoder.decode(b"", final=True))
+    close()
+    collector.close()
+    blocks = select_blocks(collector.blocks)
+    return Article(
+        url=url,
+        text="\n".join(b.text for b in blocks),
+        title=_SPACE_RE.sub(" ", collector.title).strip(),
+        truncated=truncated,
+        parser=parser_name,
+        source_bytes=seen,
+    )
+
+
+def html_to_text(html: str) -> str:
+    """Main text of an HTML string (convenience wrapper for tests and scripts)."""
+    return extract_text(html.encode("utf-8"), charset="utf-8").text
+
+
+class ArticleCache:
+    """Per-URL LRU of extracted articles, kept past their TTL for revalidation."""
+
+    def __init__(self, ttl: float = EXTRACT_CACHE_TTL, max_entries: int = EXTRACT_CACHE_MAX_ENTRIES) -> None:
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._items: "OrderedDict[str, Article]" = OrderedDict()
+        self.stats_counters = {"hits": 0, "misses": 0, "revalidated": 0, "refetched": 0}
+
+    def get(self, url: str) -> Optional[Article]:
+        with self._lock:
+            article = self._items.get(url)
+            if article is not None:
+                self._items.move_to_end(url)
+            return article
+
+    def set(self, article: Article) -> None:
+        with self._lock:
+            self._items[article.url] = article
+            self._items.move_to_end(article.url)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+
+    def fresh(self, article: Article) -> bool:
+        return time.time() - article.fetched_at < self.ttl
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"entries": len(self._items), **self.stats_counters}
+
+
+ARTICLE_CACHE = ArticleCache()
+
+
+def _header(headers: Dict[str, str], name: str) -> Optional[str]:
+    for key, value in headers.items():
+        if key.lower() == name:
+            return value
+    return None
+
+
+async def fetch_article(url: str, cache: Optional[ArticleCache] = None) -> Article:
+    """Fetch `url` and return its main text, using the per-URL cache.
+
+    Raises FetchError when the page can't be fetched.
+    """
+    cache = ARTICLE_CACHE if cache is None else cache
+    cached = cache.get(url)
+    if cached is not None and cache.fresh(cached):
+        cache.stats_counters["hits"] += 1
+        return cached
+
+    headers = {}
+    if cached is not None:
+        if cached.etag:
+            headers["If-None-Match"] = cached.etag
+        if cached.last_modified:
+            headers["If-Modified-Since"] = cached.last_modified
+    resp = await fetch_url(url, headers=headers or None, max_bytes=EXTRACT_MAX_BYTES, truncate=True)
+    if resp.status == 304 and cached is not None:
+        cache.stats_counters["revalidated"] += 1
+        cached.fetched_at = time.time()
+        return cached
+
+    cache.stats_counters["refetched" if cached is not None else "misses"] += 1
+    # parsing is CPU-bound; keep it off the event loop
+    with span("parse"):
+        article = await run_in_threadpool(extract_text, resp.body, resp.charset, EXTRACT_MAX_BYTES, url)
+    article.truncated = article.truncated or resp.truncated
+    article.etag = _header(resp.headers, "etag")
+    article.last_modified = _header(resp.headers, "last-modified")
+    cache.set(article)
+    return article
@@ -3,39 +3,194 @@
 This module wraps NewsAPI (https://newsapi.org) for demo use. It expects
 an environment variable NEWSAPI_KEY. If not present, callers should fallback
 to demo results.
+
+Lookups go through a pluggable `SearchBackend` (NewsAPI by default; set
+NEWSAPI_URL to point it at a local stand-in service, or FACTCHECK_BACKEND=demo
+to answer from built-in demo data offline). `search()` wraps the backend with a
+TTL cache (FACTCHECK_CACHE_TTL seconds, default 600) and single-flight
+coalescing, so concurrent identical queries share one upstream call.
+`search_newsapi()` is the old synchronous entry point, kept (deprecated) for
+callers outside the app's event loop.
 """
+import abc
+import asyncio
+import json
 import os
-import requests
-from typing import List, Dict
+import time
+import warnings
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlencode
+
+from app.fetch import Fetcher, fetch_url
 
 NEWSAPI_KEY = os.environ.get("NEWSAPI_KEY")
-NEWSAPI_URL = "https://newsapi.org/v2/everything"
+NEWSAPI_URL = os.environ.get("NEWSAPI_URL") or "https://newsapi.org/v2/everything"
+FACTCHECK_CACHE_TTL = float(os.environ.get("FACTCHECK_CACHE_TTL", "600"))
+FACTCHECK_CACHE_MAX = int(os.environ.get("FACTCHECK_CACHE_MAX", "1024"))
+
+DEMO_RESULTS = [
+    {
+        "title": "Fact Check: Viral 'miracle cure' claim debunked",
+        "source": "ExampleFactCheck",
+        "url": "https://example.com/fact-check-miracle-cure",
+        "summary": "Independent health reporters found no evidence for the claimed cure."
+    },
+    {
+        "title": "Related: Misleading 'big pharma secret' narrative",
+        "source": "TrustedNews",
+        "url": "https://trustednews.example/article/123",
+        "summary": "Context and quotes from experts explaining why the narrative is misleading."
+    }
+]
+
+
+class SearchBackend(abc.ABC):
+    """Interface for fact-check search providers."""
+
+    name = "base"
+
+    @abc.abstractmethod
+    async def search(self, query: str, limit: int = 5) -> List[Dict]:
+        """Up to `limit` articles ({title, source, url, summary}) for `query`."""
+
+
+class NewsAPIBackend(SearchBackend):
+    """NewsAPI `everything` search (or any service speaking the same JSON)."""
+
+    name = "newsapi"
+
+    def __init__(
+        self,
+        url: str = NEWSAPI_URL,
+        api_key: Optional[str] = NEWSAPI_KEY,
+        timeout: float = 6.0,
+        fetcher: Optional[Fetcher] = None,
+    ) -> None:
+        self.url = url
+        self.api_key = api_key
+        self.timeout = timeout
+        self.fetcher = fetcher  # None: the app's shared FETCHER
+
+    async def search(self, query: str, limit: int = 5) -> List[Dict]:
+        """Return simplified list of articles from NewsAPI matching query.
+
+        If NEWSAPI_KEY not set, raise RuntimeError so callers can fallback.
+        """
+        if not self.api_key:
+            raise RuntimeError("NEWSAPI_KEY not set")
+
+        params = {
+            "q": query,
+            "pageSize": limit,
+            "language": "en",
+            "sortBy": "relevancy",
+        }
+        headers = {"Authorization": self.api_key}
+        fetch = self.fetcher.fetch if self.fetcher is not None else fetch_url
+        resp = await fetch(f"{self.url}?{urlencode(params)}", headers=headers, timeout=self.timeout)
+        data = json.loads(resp.text)
+        out = []
+        for a in data.get("articles", [])[:limit]:
+            out.append({
+                "title": a.get("title"),
+                "source": (a.get("source") or {}).get("name"),
+                "url": a.get("url"),
+                "summary": a.get("description") or "",
+            })
+        return out
+
+
+class StaticBackend(SearchBackend):
+    """Offline backend that always answers with a fixed list of articles."""
+
+    name = "static"
+
+    def __init__(self, articles: Optional[List[Dict]] = None) -> None:
+        self.articles = list(DEMO_RESULTS if articles is None else articles)
+
+    async def search(self, query: str, limit: int = 5) -> List[Dict]:
+        return [dict(a) for a in self.articles[:limit]]
 
 
 def search_newsapi(query: str, limit: int = 5) -> List[Dict]:
-    """Return simplified list of articles from NewsAPI matching query.
+    """Deprecated synchronous NewsAPI lookup; use `await search(query, limit)`.
 
-    If NEWSAPI_KEY not set, raise RuntimeError so callers can fallback.
+    Runs one uncached request on a private event loop, so it must not be
+    called from a coroutine. Raises RuntimeError if NEWSAPI_KEY is not set.
     """
-    if not NEWSAPI_KEY:
-        raise RuntimeError("NEWSAPI_KEY not set")
-
-    params = {
-        "q": query,
-        "pageSize": limit,
-        "language": "en",
-        "sortBy": "relevancy",
-    }
-    headers = {"Authorization": NEWSAPI_KEY}
-    resp = requests.get(NEWSAPI_URL, params=params, headers=headers, timeout=6)
-    resp.raise_for_status()
-    data = resp.json()
-    out = []
-    for a in data.get("articles", [])[:limit]:
-        out.append({
-            "title": a.get("title"),
-            "source": a.get("source", {}).get("name"),
-            "url": a.get("url"),
-            "summary": a.get("description") or "",
-        })
-    return out
+    warnings.warn(
+        "fact_api.search_newsapi() is deprecated; use `await fact_api.search()` instead",
+        DeprecationWarning,
+        stacklevel=2,
+    )
+    # its own Fetcher: the shared session belongs to the app's event loop
+    backend = NewsAPIBackend(NEWSAPI_URL, NEWSAPI_KEY, fetcher=Fetcher())
+    return asyncio.run(backend.search(query, limit))
+
+
+def _default_backend() -> SearchBackend:
+    if os.environ.get("FACTCHECK_BACKEND", "newsapi") == "demo":
+        return StaticBackend()
+    return NewsAPIBackend()
+
+
+_backend: SearchBackend = _default_backend()
+_cache: "OrderedDict[Tuple[str, str, int], Tuple[float, List[Dict]]]" = OrderedDict()
+_inflight: Dict[Tuple[str, str, int], "asyncio.Future"] = {}
+stats = {"hits": 0, "misses": 0, "coalesced": 0, "errors": 0}
+
+
+def get_backend() -> SearchBackend:
+    return _backend
+
+
+def set_backend(backend: SearchBackend) -> None:
+    """Swap the search provider (e.g. a local stand-in in tests); clears the cache."""
+    global _backend
+    _backend = backend
+    clear_cache()
+
+
+def clear_cache() -> None:
+    _cache.clear()
+
+
+async def search(query: str, limit: int = 5) -> List[Dict]:
+    """Cached, coalesced lookup through the configured backend.
+
+    Errors propagate to every waiter and are not cached.
+    """
+    backend = _backend
+    key = (backend.name, query, limit)
+    hit = _cache.get(key)
+    if hit is not None:
+        if hit[0] >= time.monotonic():
+            _cache.move_to_end(key)
+            stats["hits"] += 1
+            return [dict(a) for a in hit[1]]
+        del _cache[key]
+
+    task = _inflight.get(key)
+    if task is not None:
+        stats["coalesced"] += 1
+    else:
+        stats["misses"] += 1
+        task = asyncio.ensure_future(backend.search(query, limit))
+        _inflight[key] = task
+        task.add_done_callback(lambda t, key=key: _finish(key, t))
+    # shield so one caller going away doesn't cancel the shared upstream call
+    results = await asyncio.shield(task)
+    return [dict(a) for a in results]
+
+
+def _finish(key: Tuple[str, str, int], task: "asyncio.Future") -> None:
+    _inflight.pop(key, None)
+    if task.cancelled():
+        return
+    if task.exception() is not None:
+        stats["errors"] += 1
+        return
+    _cache[key] = (time.monotonic() + FACTCHECK_CACHE_TTL, task.result())
+    while len(_cache) > FACTCHECK_CACHE_MAX:
+        _cache.popitem(last=False)
@@ -0,0 +1,80 @@
+"""Run independent pipeline stages concurrently with per-stage deadlines.
+
+`run_stages` submits each stage to a bounded thread pool at once and waits
+for each under its own timeout, so the overall latency is set by the slowest
+stage rather than the sum. A stage that misses its deadline or raises is
+reported back instead of failing the call, so callers can still return
+partial results. Threads can't be interrupted, so a timed-out stage keeps its
+worker until it finishes; the pool size (ANALYZE_FANOUT_WORKERS) bounds how
+much of that can pile up.
+
+Timeouts default to ANALYZE_STAGE_TIMEOUT seconds and can be set per stage
+with ANALYZE_TIMEOUT_<STAGE> (e.g. ANALYZE_TIMEOUT_SENTIMENT=5).
+"""
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.metrics import span
+
+ANALYZE_FANOUT = os.environ.get("ANALYZE_FANOUT", "0") in ("1", "true", "True")
+FANOUT_WORKERS = int(os.environ.get("ANALYZE_FANOUT_WORKERS", str(min(32, (os.cpu_count() or 1) * 4))))
+DEFAULT_STAGE_TIMEOUT = float(os.environ.get("ANALYZE_STAGE_TIMEOUT", "3.0"))
+
+_pool: Optional[ThreadPoolExecutor] = None
+
+
+def get_pool() -> ThreadPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ThreadPoolExecutor(max_workers=FANOUT_WORKERS, thread_name_prefix="analyze-stage")
+    return _pool
+
+
+def stage_timeout(stage: str, default: Optional[float] = None) -> float:
+    value = os.environ.get(f"ANALYZE_TIMEOUT_{stage.upper().replace('.', '_')}")
+    if value:
+        return float(value)
+    return DEFAULT_STAGE_TIMEOUT if default is None else default
+
+
+async def run_stages(
+    stages: Dict[str, Callable[[], Any]],
+    timeouts: Optional[Dict[str, float]] = None,
+    executor: Optional[ThreadPoolExecutor] = None,
+) -> Tuple[Dict[str, Any], List[str], List[str]]:
+    """Run every stage concurrently; return (results, timed_out, failed).
+
+    A stage is a plain callable (run in the thread pool) or an async
+    function (awaited on the event loop, e.g. an upstream HTTP lookup).
+    """
+    loop = asyncio.get_running_loop()
+    executor = executor or get_pool()
+    timeouts = timeouts or {}
+
+    async def run(name: str, fn: Callable[[], Any]):
+        work = fn() if asyncio.iscoroutinefunction(fn) else loop.run_in_executor(executor, fn)
+        with span(name):
+            return await asyncio.wait_for(work, timeouts.get(name, stage_timeout(name)))
+
+    names = list(stages)
+    outcomes = await asyncio.gather(*(run(n, stages[n]) for n in names), return_exceptions=True)
+    results: Dict[str, Any] = {}
+    timed_out: List[str] = []
+    failed: List[str] = []
+    for name, outcome in zip(names, outcomes):
+        if isinstance(outcome, asyncio.TimeoutError):
+            timed_out.append(name)
+        elif isinstance(outcome, BaseException):
+            failed.append(name)
+        else:
+            results[name] = outcome
+    return results, timed_out, failed
+
+
+def shutdown() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
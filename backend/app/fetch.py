@@ -0,0 +1,164 @@
+"""Non-blocking URL fetching for the API handlers.
+
+One pooled `aiohttp.ClientSession` is opened in the app lifespan and shared by
+every request. The pool caps connections in total and per host, response bodies
+are read in chunks and abandoned once they exceed a byte cap, and the whole
+fetch (connect, headers and body) runs under a single deadline.
+
+Settings come from the environment:
+
+- FETCH_TIMEOUT: total deadline per fetch in seconds (default 5)
+- FETCH_MAX_BYTES: maximum response body size (default 5 MiB)
+- FETCH_POOL_SIZE / FETCH_POOL_PER_HOST: connection limits (default 100 / 8)
+
+When no session has been started (scripts, tests without a lifespan) each
+fetch uses a short-lived session instead, so callers never need to care.
+"""
+import asyncio
+import os
+from typing import Dict, Optional
+
+import aiohttp
+
+FETCH_TIMEOUT = float(os.environ.get("FETCH_TIMEOUT", "5"))
+FETCH_MAX_BYTES = int(os.environ.get("FETCH_MAX_BYTES", str(5 * 1024 * 1024)))
+FETCH_POOL_SIZE = int(os.environ.get("FETCH_POOL_SIZE", "100"))
+FETCH_POOL_PER_HOST = int(os.environ.get("FETCH_POOL_PER_HOST", "8"))
+CHUNK_SIZE = 64 * 1024
+
+USER_AGENT = "FakeNewsDetector/1.0 (+https://github.com/veerakumar-a)"
+
+
+class FetchError(Exception):
+    """Raised when a URL can't be fetched within the configured limits."""
+
+
+class FetchResult:
+    def __init__(
+        self,
+        url: str,
+        status: int,
+        headers: Dict[str, str],
+        body: bytes,
+        charset: Optional[str],
+        truncated: bool = False,
+    ) -> None:
+        self.url = url
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.charset = charset
+        # True when the body was cut at max_bytes (only with truncate=True)
+        self.truncated = truncated
+
+    @property
+    def text(self) -> str:
+        return self.body.decode(self.charset or "utf-8", errors="replace")
+
+
+class Fetcher:
+    def __init__(
+        self,
+        timeout: float = FETCH_TIMEOUT,
+        max_bytes: int = FETCH_MAX_BYTES,
+        pool_size: int = FETCH_POOL_SIZE,
+        per_host: int = FETCH_POOL_PER_HOST,
+    ) -> None:
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        self.pool_size = pool_size
+        self.per_host = per_host
+        self._session: Optional[aiohttp.ClientSession] = None
+        self.requests = 0
+        self.errors = 0
+        self.bytes = 0
+
+    def _new_session(self) -> aiohttp.ClientSession:
+        connector = aiohttp.TCPConnector(limit=self.pool_size, limit_per_host=self.per_host, ttl_dns_cache=300)
+        return aiohttp.ClientSession(connector=connector, headers={"User-Agent": USER_AGENT})
+
+    async def start(self) -> None:
+        if self._session is None or self._session.closed:
+            self._session = self._new_session()
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    @property
+    def started(self) -> bool:
+        return self._session is not None and not self._session.closed
+
+    async def fetch(
+        self,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+        max_bytes: Optional[int] = None,
+        timeout: Optional[float] = None,
+        truncate: bool = False,
+    ) -> FetchResult:
+        """GET `url` and return its body, raising FetchError on any failure.
+
+        With `truncate=True` a body over `max_bytes` is cut off there (and the
+        rest never downloaded) instead of failing the fetch.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        self.requests += 1
+        try:
+            if self.started:
+                result = await asyncio.wait_for(self._get(self._session, url, headers, max_bytes, truncate), timeout)
+            else:
+                async with self._new_session() as session:
+                    result = await asyncio.wait_for(self._get(session, url, headers, max_bytes, truncate), timeout)
+        except asyncio.TimeoutError:
+            self.errors += 1
+            raise FetchError(f"timed out after {timeout:g}s") from None
+        except aiohttp.ClientError as e:
+            self.errors += 1
+            raise FetchError(str(e) or e.__class__.__name__) from e
+        except FetchError:
+            self.errors += 1
+            raise
+        self.bytes += len(result.body)
+        return result
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "bytes": self.bytes,
+            "pool_size": self.pool_size,
+            "pool_per_host": self.per_host,
+            "session_open": self.started,
+        }
+
+    async def _get(self, session, url, headers, max_bytes, truncate=False) -> FetchResult:
+        async with session.get(url, headers=headers, allow_redirects=True) as resp:
+            if resp.status >= 400:
+                raise FetchError(f"HTTP {resp.status} for url {url}")
+            if not truncate and resp.content_length is not None and resp.content_length > max_bytes:
+                raise FetchError(f"response larger than {max_bytes} bytes")
+            chunks = []
+            size = 0
+            truncated = False
+            async for chunk in resp.content.iter_chunked(CHUNK_SIZE):
+                size += len(chunk)
+                if size > max_bytes:
+                    if not truncate:
+                        raise FetchError(f"response larger than {max_bytes} bytes")
+                    chunks.append(chunk[:len(chunk) - (size - max_bytes)])
+                    truncated = True
+                    break
+                chunks.append(chunk)
+            return FetchResult(
+                str(resp.url), resp.status, dict(resp.headers), b"".join(chunks), resp.charset, truncated
+            )
+
+
+FETCHER = Fetcher()
+
+
+async def fetch_url(url: str, **kwargs) -> FetchResult:
+    return await FETCHER.fetch(url, **kwargs)
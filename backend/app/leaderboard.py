@@ -0,0 +1,356 @@
+# backend/app/leaderboard.py
+"""Top-N / bottom-N community leaderboards, all-time and per time window.
+
+Every committed vote write in `app.db` (direct or a write-behind flush)
+reports its deltas and resulting scores to `LEADERBOARD`, which keeps a materialized
+slice of the best LEADERBOARD_CAPACITY items at each end of every board:
+a sorted list updated with bisect in O(capacity) per vote. A read copies
+the first `n` entries, so it costs O(n) whatever the number of items.
+
+A slice only ever holds the true best items of its board. When a member
+falls out of it the slice shrinks, and once it is shorter than a read needs
+it is refilled: from the `votes.score` index for the all-time board, from
+the in-memory window sums for a windowed one. The index is read without
+holding the leaderboard lock; votes reported meanwhile are replayed onto the
+fresh slice before it is installed.
+
+Reports of writes that commit close together can arrive out of order, so
+each all-time score carries its write's sequence number and one older than
+the last applied for that item is dropped. Window deltas add up in any order.
+
+Windows are built from the per-bucket vote sums in `vote_buckets`
+(VOTE_BUCKET_SECONDS each, so "1h" covers the current bucket and the ones
+before it within the hour). Buckets that leave a window are subtracted from
+it as time moves on. Everything is loaded from the database on first use,
+so it survives restarts; with VOTE_WRITE_BEHIND, votes show up once they
+are flushed.
+"""
+import bisect
+import heapq
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app import db
+
+logger = logging.getLogger("fakenews")
+
+LEADERBOARD_SIZE = int(os.environ.get("LEADERBOARD_SIZE", "100"))
+# extra room so members dropping out rarely force a refill
+LEADERBOARD_CAPACITY = int(os.environ.get("LEADERBOARD_CAPACITY", str(2 * LEADERBOARD_SIZE)))
+# items whose last applied write sequence is remembered; reordering only
+# spans writes that commit at nearly the same time
+LEADERBOARD_SEQ_CACHE = int(os.environ.get("LEADERBOARD_SEQ_CACHE", "100000"))
+WINDOWS = {"1h": 3600, "24h": 24 * 3600, "7d": 7 * 24 * 3600}
+
+
+class RankedSlice:
+    """The best `capacity` (score, item_id) pairs of a larger set, sorted.
+
+    Best means highest score, ties broken by item_id descending (or the
+    reverse with `highest=False`), the same order as `db.get_votes`.
+    `exhaustive` is True while no item of the set is outside the slice.
+    """
+
+    def __init__(self, capacity: int, highest: bool = True) -> None:
+        self.capacity = capacity
+        self.highest = highest
+        self._keys: List[Tuple[int, str]] = []  # ascending
+        self._scores: Dict[str, int] = {}
+        self.exhaustive = True
+        self.generation = 0  # bumped by every reset
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def _beats_worst(self, key: Tuple[int, str]) -> bool:
+        if not self._keys:
+            return False
+        return key > self._keys[0] if self.highest else key < self._keys[-1]
+
+    def discard(self, item_id: str) -> None:
+        score = self._scores.pop(item_id, None)
+        if score is not None:
+            del self._keys[bisect.bisect_left(self._keys, (score, item_id))]
+
+    def update(self, item_id: str, score: int) -> None:
+        self.discard(item_id)
+        key = (score, item_id)
+        if not (self.exhaustive or self._beats_worst(key)):
+            return  # ranks below every member, and so possibly below an outsider
+        bisect.insort(self._keys, key)
+        self._scores[item_id] = score
+        if len(self._keys) > self.capacity:
+            _, dropped = self._keys.pop(0) if self.highest else self._keys.pop()
+            del self._scores[dropped]
+            self.exhaustive = False
+
+    def reset(self, pairs: List[Tuple[str, int]], exhaustive: bool) -> None:
+        self._keys = sorted((score, item_id) for item_id, score in pairs)
+        self._scores = dict(pairs)
+        self.exhaustive = exhaustive
+        self.generation += 1
+
+    def best(self, n: int) -> Optional[List[Tuple[str, int]]]:
+        """The best `n` (item_id, score), best first, or None if the slice
+        has to be refilled before it can answer."""
+        if n > len(self._keys) and not self.exhaustive:
+            return None
+        keys = self._keys[::-1][:n] if self.highest else self._keys[:n]
+        return [(item_id, score) for score, item_id in keys]
+
+
+class _Board:
+    """Both ends of one ranking, plus where to refill them from."""
+
+    def __init__(self, capacity: int, source: Callable[[int, bool], List[Tuple[str, int]]]) -> None:
+        self.capacity = capacity
+        self.source = source
+        self.top = RankedSlice(capacity, highest=True)
+        self.bottom = RankedSlice(capacity, highest=False)
+        self.refills = 0
+
+    def update(self, item_id: str, score: int) -> None:
+        self.top.update(item_id, score)
+        self.bottom.update(item_id, score)
+
+    def discard(self, item_id: str) -> None:
+        self.top.discard(item_id)
+        self.bottom.discard(item_id)
+
+    def refill(self, end: RankedSlice) -> None:
+        self.install(end, self.source(self.capacity, end.highest))
+
+    def install(self, end: RankedSlice, pairs: List[Tuple[str, int]], replay: List[Tuple[str, int]] = ()) -> None:
+        """Reset `end` to `pairs` read from the source, then apply the
+        (item_id, score) updates in `replay` that arrived during the read."""
+        end.reset(pairs, exhaustive=len(pairs) < self.capacity)
+        for item_id, score in replay:
+            end.update(item_id, score)
+        self.refills += 1
+
+    def best(self, n: int, highest: bool) -> List[Tuple[str, int]]:
+        end = self.top if highest else self.bottom
+        out = end.best(n)
+        if out is None:
+            self.refill(end)
+            out = end.best(n)
+        return out
+
+
+def _from_votes_table(n: int, highest: bool) -> List[Tuple[str, int]]:
+    rows, _ = db.get_votes(n, lowest=not highest)
+    return [(r["item_id"], r["score"]) for r in rows]
+
+
+class _Window:
+    def __init__(self, buckets: int, capacity: int) -> None:
+        self.buckets = buckets
+        self.scores: Dict[str, int] = {}
+        # item_id -> how many buckets inside the window hold a vote for it; an
+        # item stays ranked (possibly at 0) until the last of them expires
+        self.counts: Dict[str, int] = {}
+        self.start: Optional[int] = None  # first bucket id the sums include
+        self.board = _Board(capacity, self._from_scores)
+
+    def _from_scores(self, n: int, highest: bool) -> List[Tuple[str, int]]:
+        pairs = ((score, item_id) for item_id, score in self.scores.items())
+        best = heapq.nlargest(n, pairs) if highest else heapq.nsmallest(n, pairs)
+        return [(item_id, score) for score, item_id in best]
+
+    def add(self, item_id: str, delta: int, new_bucket: bool) -> None:
+        score = self.scores.get(item_id, 0) + delta
+        self.scores[item_id] = score
+        if new_bucket:
+            self.counts[item_id] = self.counts.get(item_id, 0) + 1
+        self.board.update(item_id, score)
+
+    def expire(self, item_id: str, delta: int) -> None:
+        left = self.counts.get(item_id, 0) - 1
+        if left > 0:
+            self.counts[item_id] = left
+            score = self.scores.get(item_id, 0) - delta
+            self.scores[item_id] = score
+            self.board.update(item_id, score)
+        else:
+            # no vote for it left inside the window
+            self.counts.pop(item_id, None)
+            self.scores.pop(item_id, None)
+            self.board.discard(item_id)
+
+
+class Leaderboard:
+    """All-time and windowed rankings kept current from `app.db` vote writes."""
+
+    def __init__(
+        self,
+        capacity: int = LEADERBOARD_CAPACITY,
+        windows: Dict[str, int] = WINDOWS,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.capacity = capacity
+        self.window_seconds = dict(windows)
+        self._clock = clock
+        self._lock = threading.RLock()
+        self._db_path = None
+        self._all: Optional[_Board] = None
+        self._windows: Dict[str, _Window] = {}
+        # bucket id -> {item_id: delta}, for every bucket inside the longest window
+        self._buckets: "OrderedDict[int, Dict[str, int]]" = OrderedDict()
+        # item_id -> sequence of the last write applied to its all-time score
+        self._seqs: "OrderedDict[str, int]" = OrderedDict()
+        # all-time (item_id, score) updates seen by each refill read in flight
+        self._journals: List[List[Tuple[str, int]]] = []
+
+    @staticmethod
+    def _bucket_id(bucket_start: float) -> int:
+        return int(bucket_start) // db.VOTE_BUCKET_SECONDS
+
+    def _ensure_loaded(self) -> None:
+        # a different app database (tests, benchmarks) means different boards
+        if self._db_path != db.DB_PATH:
+            self._prune()
+            # vote writes report to `record` after releasing their pooled
+            # connection, so these reads cannot wait on a writer that waits
+            # on `self._lock`
+            with self._lock:
+                if self._db_path != db.DB_PATH:
+                    self._load()
+
+    def _oldest_bucket(self, current: int) -> int:
+        longest = max(self.window_seconds.values(), default=0)
+        return current - max(1, -(-longest // db.VOTE_BUCKET_SECONDS)) + 1
+
+    def _prune(self) -> None:
+        oldest = self._oldest_bucket(self._bucket_id(self._clock()))
+        removed = db.prune_vote_buckets(oldest * db.VOTE_BUCKET_SECONDS)
+        if removed:
+            logger.info("Pruned %d expired vote buckets", removed)
+
+    def _load(self) -> None:
+        bucket_seconds = db.VOTE_BUCKET_SECONDS
+        current = self._bucket_id(self._clock())
+        windows = {
+            name: _Window(-(-seconds // bucket_seconds), self.capacity)
+            for name, seconds in self.window_seconds.items()
+        }
+        oldest = self._oldest_bucket(current)
+        buckets: "OrderedDict[int, Dict[str, int]]" = OrderedDict()
+        for bucket_start, item_id, delta in db.iter_vote_buckets(oldest * bucket_seconds):
+            bucket = buckets.setdefault(self._bucket_id(bucket_start), {})
+            bucket[item_id] = bucket.get(item_id, 0) + delta
+        for window in windows.values():
+            window.start = current - window.buckets + 1
+            for bucket_id, deltas in buckets.items():
+                if bucket_id >= window.start:
+                    for item_id, delta in deltas.items():
+                        window.scores[item_id] = window.scores.get(item_id, 0) + delta
+                        window.counts[item_id] = window.counts.get(item_id, 0) + 1
+            window.board.refill(window.board.top)
+            window.board.refill(window.board.bottom)
+        self._all = _Board(self.capacity, _from_votes_table)
+        self._all.refill(self._all.top)
+        self._all.refill(self._all.bottom)
+        self._windows, self._buckets, self._db_path = windows, buckets, db.DB_PATH
+        self._seqs = OrderedDict()
+
+    def load(self) -> None:
+        self._ensure_loaded()
+
+    def _advance(self, current: int) -> None:
+        """Subtract buckets that have left each window by bucket `current`."""
+        for window in self._windows.values():
+            start = current - window.buckets + 1
+            if window.start is not None and start > window.start:
+                for bucket_id, deltas in self._buckets.items():
+                    if bucket_id >= start:
+                        break
+                    if bucket_id >= window.start:
+                        for item_id, delta in deltas.items():
+                            window.expire(item_id, delta)
+                window.start = start
+        oldest = min((w.start for w in self._windows.values()), default=current)
+        while self._buckets and next(iter(self._buckets)) < oldest:
+            self._buckets.popitem(last=False)
+
+    def _newer(self, item_id: str, seq: int) -> bool:
+        """Whether write `seq` is the latest seen for `item_id` (and note it)."""
+        last = self._seqs.get(item_id)
+        if last is not None and last > seq:
+            return False
+        self._seqs[item_id] = seq
+        self._seqs.move_to_end(item_id)
+        if len(self._seqs) > LEADERBOARD_SEQ_CACHE:
+            self._seqs.popitem(last=False)
+        return True
+
+    def record(self, deltas: Dict[str, int], scores: Dict[str, int], bucket_start: int, seq: int) -> None:
+        """Apply one committed vote write (the `db.add_vote_listener` callback)."""
+        with self._lock:
+            if self._db_path != db.DB_PATH:
+                # not loaded yet: the load reads this write from the table (the
+                # app loads at startup, so this only races in scripts and tests)
+                return
+            bucket_id = self._bucket_id(bucket_start)
+            self._advance(max(bucket_id, self._bucket_id(self._clock())))
+            for item_id, score in scores.items():
+                if not self._newer(item_id, seq):
+                    continue  # a later write of this item is already applied
+                self._all.update(item_id, score)
+                for journal in self._journals:
+                    journal.append((item_id, score))
+            bucket = self._buckets.setdefault(bucket_id, {})
+            for item_id, delta in deltas.items():
+                new_bucket = item_id not in bucket
+                bucket[item_id] = bucket.get(item_id, 0) + delta
+                for window in self._windows.values():
+                    if bucket_id >= window.start:
+                        window.add(item_id, delta, new_bucket)
+
+    def ranking(self, n: int, highest: bool = True, window: Optional[str] = None) -> List[Dict[str, Any]]:
+        """The `n` highest (or lowest) scored items, all-time or within `window`."""
+        if window is not None and window not in self.window_seconds:
+            raise KeyError(window)
+        self._ensure_loaded()
+        while True:
+            with self._lock:
+                self._advance(self._bucket_id(self._clock()))
+                if window is not None:
+                    # windowed boards refill from memory, under the lock
+                    pairs = self._windows[window].board.best(n, highest)
+                    break
+                board = self._all
+                end = board.top if highest else board.bottom
+                pairs = end.best(n)
+                if pairs is not None:
+                    break
+                generation, journal = end.generation, []
+                self._journals.append(journal)
+            try:
+                fresh = board.source(board.capacity, highest)
+            except Exception:
+                with self._lock:
+                    self._journals.remove(journal)
+                raise
+            with self._lock:
+                self._journals.remove(journal)
+                # another refill (or a reload) got there first: look again
+                if end.generation == generation:
+                    board.install(end, fresh, journal)
+        return [{"rank": i, "item_id": item_id, "score": score} for i, (item_id, score) in enumerate(pairs, 1)]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            boards = {"all": self._all} if self._all is not None else {}
+            boards.update({name: w.board for name, w in self._windows.items()})
+            out: Dict[str, Any] = {f"refills_{name}": b.refills for name, b in boards.items()}
+            out.update({f"items_{name}": len(w.scores) for name, w in self._windows.items()})
+            out["buckets"] = len(self._buckets)
+        return out
+
+
+LEADERBOARD = Leaderboard()
+db.add_vote_listener(LEADERBOARD.record)
@@ -0,0 +1,195 @@
+"""Compiled multi-pattern lexicon matcher.
+
+Lexicons are plain text files (one term per line, `#` comments) stored in
+`app/lexicons/`. All lexicons are merged into a single Aho-Corasick automaton
+when this module is imported, so `LEXICON.scan(text)` finds every occurrence of
+every term, with its offsets, in one linear pass over the text no matter how
+many terms the lexicons hold. The model penalty (`model.py`) and the HTML
+highlighting (`explain.py`) both read from the same scan.
+
+Paths can be overridden with the SENSATIONAL_LEXICON / HIGHLIGHT_LEXICON
+environment variables.
+"""
+import hashlib
+import os
+from collections import deque
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+LEXICON_DIR = Path(__file__).resolve().parent / "lexicons"
+
+DEFAULT_LEXICON_FILES = {
+    "sensational": os.environ.get("SENSATIONAL_LEXICON") or str(LEXICON_DIR / "sensational.txt"),
+    "highlight": os.environ.get("HIGHLIGHT_LEXICON") or str(LEXICON_DIR / "highlight.txt"),
+}
+
+
+def read_terms(path: str) -> List[str]:
+    """Read a lexicon file, returning lowercased terms in file order (deduplicated)."""
+    terms: List[str] = []
+    seen = set()
+    with open(path, encoding="utf-8") as fh:
+        for line in fh:
+            term = line.strip().lower()
+            if not term or term.startswith("#") or term in seen:
+                continue
+            seen.add(term)
+            terms.append(term)
+    return terms
+
+
+def _is_word_char(c: str) -> bool:
+    # same definition of a word character as `\w` in Python's re module
+    return c.isalnum() or c == "_"
+
+
+def _lower_same_length(text: str) -> str:
+    """Lowercase `text` without changing its length so offsets stay valid."""
+    low = text.lower()
+    if len(low) == len(text):
+        return low
+    # a few characters (e.g. 'İ') expand when lowercased; keep those as-is
+    return "".join(c if len(c.lower()) != 1 else c.lower() for c in text)
+
+
+class LexiconScan:
+    """Result of scanning one text: every (start, end, term_id) occurrence."""
+
+    def __init__(self, lexicon: "Lexicon", text: str, matches: List[Tuple[int, int, int]]) -> None:
+        self.lexicon = lexicon
+        self.text = text
+        # ordered by end offset, then by term length (longest first)
+        self.matches = matches
+
+    def counts(self, tag: str) -> Dict[str, int]:
+        """Non-overlapping occurrence count per term, like `str.count`."""
+        terms = self.lexicon.terms_list
+        wanted = self.lexicon.tag_ids(tag)
+        last_end: Dict[int, int] = {}
+        out: Dict[str, int] = {}
+        for start, end, tid in self.matches:
+            if tid not in wanted or start < last_end.get(tid, 0):
+                continue
+            last_end[tid] = end
+            out[terms[tid]] = out.get(terms[tid], 0) + 1
+        return out
+
+    def word_matches(self, tag: str) -> List[Tuple[int, int, int]]:
+        """Whole-word, non-overlapping matches (leftmost, then longest) sorted by start."""
+        wanted = self.lexicon.tag_ids(tag)
+        text = self.text
+        n = len(text)
+        candidates = []
+        for start, end, tid in self.matches:
+            if tid not in wanted:
+                continue
+            before = _is_word_char(text[start - 1]) if start > 0 else False
+            after = _is_word_char(text[end]) if end < n else False
+            if before == _is_word_char(text[start]) or after == _is_word_char(text[end - 1]):
+                continue
+            candidates.append((start, end, tid))
+        candidates.sort(key=lambda m: (m[0], -m[1]))
+        out = []
+        pos = 0
+        for start, end, tid in candidates:
+            if start >= pos:
+                out.append((start, end, tid))
+                pos = end
+        return out
+
+
+class Lexicon:
+    """Aho-Corasick automaton over the union of several tagged term lists."""
+
+    def __init__(self, lexicons: Dict[str, Iterable[str]]) -> None:
+        self.terms_list: List[str] = []
+        self._term_index: Dict[str, int] = {}
+        self._tags: Dict[str, List[int]] = {}
+        for tag, terms in lexicons.items():
+            ids = []
+            for term in terms:
+                term = term.lower()
+                if not term:
+                    continue
+                tid = self._term_index.get(term)
+                if tid is None:
+                    tid = len(self.terms_list)
+                    self._term_index[term] = tid
+                    self.terms_list.append(term)
+                if tid not in ids:
+                    ids.append(tid)
+            self._tags[tag] = ids
+        self._tag_sets = {tag: frozenset(ids) for tag, ids in self._tags.items()}
+        self._build()
+        digest = hashlib.sha1()
+        for tag in sorted(self._tags):
+            digest.update(tag.encode("utf-8") + b"\0")
+            for tid in self._tags[tag]:
+                digest.update(self.terms_list[tid].encode("utf-8") + b"\n")
+        self.version = digest.hexdigest()[:12]
+
+    @classmethod
+    def from_files(cls, paths: Dict[str, str]) -> "Lexicon":
+        return cls({tag: read_terms(path) for tag, path in paths.items()})
+
+    def _build(self) -> None:
+        goto: List[Dict[str, int]] = [{}]
+        out: List[Tuple[int, ...]] = [()]
+        for tid, term in enumerate(self.terms_list):
+            state = 0
+            for c in term:
+                nxt = goto[state].get(c)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][c] = nxt
+                    goto.append({})
+                    out.append(())
+                state = nxt
+            out[state] = out[state] + (tid,)
+
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for c, nxt in goto[state].items():
+                queue.append(nxt)
+                f = fail[state]
+                while f and c not in goto[f]:
+                    f = fail[f]
+                fail[nxt] = goto[f][c] if state and c in goto[f] else 0
+                # own (longer) terms before the inherited suffix terms
+                out[nxt] = out[nxt] + out[fail[nxt]]
+
+        self._goto = goto
+        self._fail = fail
+        self._out = out
+        self._lengths = [len(t) for t in self.terms_list]
+
+    def terms(self, tag: str) -> List[str]:
+        return [self.terms_list[tid] for tid in self._tags.get(tag, [])]
+
+    def tag_ids(self, tag: str) -> frozenset:
+        return self._tag_sets.get(tag, frozenset())
+
+    def scan(self, text: Optional[str], lowered: Optional[str] = None) -> LexiconScan:
+        """Find all term occurrences (case-insensitive) in a single pass.
+
+        `lowered` may be a precomputed `_lower_same_length(text)`.
+        """
+        text = text or ""
+        goto, fail, out, lengths = self._goto, self._fail, self._out, self._lengths
+        matches: List[Tuple[int, int, int]] = []
+        state = 0
+        for i, c in enumerate(lowered if lowered is not None else _lower_same_length(text)):
+            while state and c not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(c, 0)
+            if out[state]:
+                end = i + 1
+                for tid in out[state]:
+                    matches.append((end - lengths[tid], end, tid))
+        return LexiconScan(self, text, matches)
+
+
+# compiled once at import so request handlers only pay for the scan itself
+LEXICON = Lexicon.from_files(DEFAULT_LEXICON_FILES)
@@ -0,0 +1,164 @@
+# backend/app/longdoc.py
+"""Long-document mode: analysis over overlapping windows.
+
+A book-length text is never scanned, scored or escaped in one piece. It is cut
+at whitespace into consecutive *owned* regions of about LONG_DOC_WINDOW chars;
+each window is its owned region padded by LONG_DOC_OVERLAP/2 chars of context
+on either side. The model and sentiment score every window and the scores are
+combined as a mean weighted by owned length. Keyword counts and highlight
+marks come only from each window's owned region, so nothing in an overlap is
+counted or emitted twice, while the padding keeps terms that straddle a cut
+whole-word matched exactly as in a single pass.
+
+Working memory is one window at a time on top of the input text itself.
+`iter_highlighted` yields the highlighted HTML window by window, so it can be
+streamed instead of built as a second copy of the document.
+"""
+import html
+import os
+import re
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional
+
+import numpy as np
+
+from app.document import Document
+from app.explain import MARK_CLOSE, MARK_OPEN, top_keywords
+from app.lexicon import LEXICON
+from app.sentiment import analyze_sentiment, combine_sentiment
+
+# texts longer than this (in chars) are analyzed in long-document mode
+LONG_DOC_CHARS = int(os.environ.get("LONG_DOC_CHARS", "200000"))
+LONG_DOC_WINDOW = int(os.environ.get("LONG_DOC_WINDOW", "50000"))
+LONG_DOC_OVERLAP = int(os.environ.get("LONG_DOC_OVERLAP", "2000"))
+
+_WHITESPACE_RE = re.compile(r"\s")
+
+
+class Window(NamedTuple):
+    start: int  # window bounds, including the overlap context
+    end: int
+    own_start: int  # the part of the text this window is responsible for
+    own_end: int
+
+
+def is_long(text: str) -> bool:
+    return len(text) > LONG_DOC_CHARS
+
+
+def window_count(text: str, window: int = LONG_DOC_WINDOW) -> int:
+    """About how many windows `iter_windows` cuts `text` into (at least 1)."""
+    return max(1, -(-len(text) // max(1, window)))
+
+
+def _cut_after(text: str, pos: int, limit: int) -> int:
+    """First whitespace at or after `pos` (but before `limit`), else `pos`."""
+    m = _WHITESPACE_RE.search(text, pos, limit)
+    return m.start() if m else pos
+
+
+def iter_windows(text: str, window: int = LONG_DOC_WINDOW, overlap: int = LONG_DOC_OVERLAP) -> Iterator[Window]:
+    """Overlapping windows whose owned regions tile `text` exactly."""
+    n = len(text)
+    if n == 0:
+        return
+    window = max(1, window)
+    pad = max(0, overlap) // 2
+    own_start = 0
+    while own_start < n:
+        target = own_start + window
+        own_end = n if target >= n else _cut_after(text, target, min(n, target + window // 2))
+        yield Window(max(0, own_start - pad), min(n, own_end + pad), own_start, own_end)
+        own_start = own_end
+
+
+def iter_highlighted(text: str, window: int = LONG_DOC_WINDOW, overlap: int = LONG_DOC_OVERLAP) -> Iterator[str]:
+    """The `highlight_keywords` HTML for `text`, yielded one window at a time."""
+    pos = 0  # everything before this has been emitted
+    for w in iter_windows(text, window, overlap):
+        chunk = text[w.start:w.end]
+        parts: List[str] = []
+        for start, end, _ in LEXICON.scan(chunk).word_matches("highlight"):
+            start += w.start
+            end += w.start
+            if start < pos or start < w.own_start:
+                continue
+            if start >= w.own_end:
+                break
+            parts.append(html.escape(text[pos:start]))
+            parts.append(MARK_OPEN + html.escape(text[start:end]) + MARK_CLOSE)
+            pos = end
+        if pos < w.own_end:
+            parts.append(html.escape(text[pos:w.own_end]))
+            pos = w.own_end
+        yield "".join(parts)
+
+
+def analyze_long(
+    text: str,
+    model,
+    window: int = LONG_DOC_WINDOW,
+    overlap: int = LONG_DOC_OVERLAP,
+) -> Dict[str, Any]:
+    """Model, sentiment and keywords for `text`, combined over windows.
+
+    Returns the label/confidence/probabilities/sentiment/keywords part of an
+    /analyze response plus a `windows` summary; no `highlighted` or `raw_text`.
+    """
+    total = 0
+    confidence = 0.0
+    confidences: List[float] = []
+    sentiments: List[Dict[str, Any]] = []
+    weights: List[int] = []
+    freq: Dict[str, int] = {}
+    for w in iter_windows(text, window, overlap):
+        doc = Document(text[w.start:w.end])
+        weight = w.own_end - w.own_start
+        prediction = model.predict(doc)
+        confidences.append(prediction["confidence"])
+        confidence += prediction["confidence"] * weight
+        sentiments.append(analyze_sentiment(doc))
+        weights.append(weight)
+        # keywords from the tokens that start inside the owned region
+        lo, hi = np.searchsorted(doc.offsets[:, 0], [w.own_start - w.start, w.own_end - w.start])
+        for t in doc.tokens[lo:hi]:
+            if len(t) > 3:
+                freq[t] = freq.get(t, 0) + 1
+        total += weight
+
+    score = confidence / total if total else 0.5
+    if confidences:
+        # keep float rounding from pushing the mean past the window scores
+        score = min(max(score, min(confidences)), max(confidences))
+    return {
+        "label": "Real" if score >= 0.5 else "Fake",
+        "confidence": float(score),
+        "probabilities": [float(1 - score), float(score)],
+        "sentiment": combine_sentiment(sentiments, weights),
+        "keywords": top_keywords(freq),
+        "mode": "long",
+        "windows": {
+            "count": len(confidences),
+            "window_chars": window,
+            "overlap_chars": overlap,
+            "min_confidence": min(confidences, default=0.5),
+            "max_confidence": max(confidences, default=0.5),
+            "fake_windows": sum(1 for c in confidences if c < 0.5),
+        },
+    }
+
+
+def select_fields(out: Dict[str, Any], include_raw_text: Optional[bool], include_highlighted: Optional[bool]) -> Dict[str, Any]:
+    """Drop `raw_text` / `highlighted` from an /analyze result when not wanted.
+
+    Unset flags keep the fields for normal results and leave them out for
+    long-document results.
+    """
+    long_mode = out.get("mode") == "long"
+    drop = set()
+    if not (include_raw_text if include_raw_text is not None else not long_mode):
+        drop.add("raw_text")
+    if not (include_highlighted if include_highlighted is not None else not long_mode):
+        drop.add("highlighted")
+    if not drop.intersection(out):
+        return out
+    return {k: v for k, v in out.items() if k not in drop}
@@ -1,22 +1,45 @@
 # backend/app/main.py
+from contextlib import asynccontextmanager
 from typing import Optional
 
 import logging
 
 from fastapi import FastAPI, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
 
 from app.model import NewsModel
-from app.sentiment import analyze_sentiment
-from app.credibility import check_source_credibility
+from app.sentiment import analyze_sentiment, engine_name as sentiment_engine_name
+from app.credibility import REPUTATION, check_source_credibility, check_source_credibility_batch
+from app.document import Document, as_document
 from app.explain import highlight_keywords
+from app import longdoc
+from app.lexicon import LEXICON
 from app.summarizer import summarize_text
-from app import db
-import requests
+from app import db, fact_api
+from app.cache import RESULT_CACHE
+from app.fetch import FETCHER
+from app.extract import ARTICLE_CACHE, fetch_article, html_to_text
+from app.votes import VOTES, VOTE_WRITE_BEHIND
+from app import leaderboard
+from app.leaderboard import LEADERBOARD
+from app import metrics
+from app.metrics import MetricsMiddleware, span
+from app import fanout
+from app import neardup
+from app.neardup import NEAR_DUPS
+from app.startup import WARMUP, WARMUP_BLOCKING
+import asyncio
+import csv
+import functools
+import io
+import json
 import os
+import sqlite3
 from pydantic import BaseModel
-from typing import List
+from typing import List, Union
 from fastapi import Header
 
 # Simple in-memory stores for demo purposes
@@ -26,7 +49,56 @@ _community_votes = {}
 logger = logging.getLogger("fakenews")
 logging.basicConfig(level=logging.INFO)
 
-app = FastAPI(title="FakeNews Detector API")
+
+def _use_transformer() -> bool:
+    return os.environ.get("USE_TRANSFORMER", "0") in ("1", "true", "True")
+
+
+def _warm_transformer() -> None:
+    from app.summarizer_transformer import warmup
+
+    warmup()
+
+
+def _register_warmup_steps() -> None:
+    """Everything the first requests would otherwise pay for, in order."""
+    WARMUP.step("db", db.init_db)
+    if neardup.NEAR_DUP:
+        WARMUP.step("neardup", NEAR_DUPS.load)
+    WARMUP.step("leaderboard", LEADERBOARD.load)
+    WARMUP.step("model", lambda: model.predict("Warmup text."))
+    WARMUP.step("sentiment", lambda: analyze_sentiment("Warmup text is good."))
+    WARMUP.step("credibility", lambda: check_source_credibility("https://www.example.com/"))
+    WARMUP.step("html_parser", lambda: html_to_text("<p>Warmup</p>"))
+    WARMUP.step("summarizer", lambda: summarize_text("Warmup one. Warmup two.", sentences_k=1))
+    # the transformer summarizer so the first /summarize doesn't load it
+    if _use_transformer():
+        WARMUP.step("transformer", _warm_transformer)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # one pooled HTTP client for URL fetching for the whole app lifetime
+    await FETCHER.start()
+    if VOTE_WRITE_BEHIND:
+        VOTES.start()
+    # load heavy dependencies off the import path; /ready flips once done
+    warmup_task = asyncio.ensure_future(run_in_threadpool(WARMUP.run))
+    if WARMUP_BLOCKING:
+        await warmup_task
+    try:
+        yield
+    finally:
+        if not warmup_task.done():
+            warmup_task.cancel()
+        await FETCHER.close()
+        fanout.shutdown()
+        if VOTE_WRITE_BEHIND:
+            # write out buffered votes before the process exits
+            await run_in_threadpool(VOTES.stop)
+
+
+app = FastAPI(title="FakeNews Detector API", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -35,16 +107,22 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(MetricsMiddleware)
 
-model = NewsModel()
-
+# name of a trained artifact under MODEL_DIR (or a path); unset = placeholder rules
+model = NewsModel(os.environ.get("NEWS_MODEL") or None)
 
-# initialize DB file
-try:
-    db.init_db()
-except Exception:
-    # ensure that a permissions issue won't crash the app on import during tests
-    pass
+metrics.register_collector("result_cache", RESULT_CACHE.stats)
+metrics.register_collector("db_pool", lambda: db.get_pool().stats())
+metrics.register_collector("fetch", FETCHER.stats)
+metrics.register_collector("extract", ARTICLE_CACHE.stats)
+metrics.register_collector("fact_check", lambda: dict(fact_api.stats))
+metrics.register_collector("votes", VOTES.stats)
+metrics.register_collector("reputation", REPUTATION.stats)
+metrics.register_collector("startup", WARMUP.stats)
+metrics.register_collector("neardup", NEAR_DUPS.stats)
+metrics.register_collector("leaderboard", LEADERBOARD.stats)
+_register_warmup_steps()
 
 
 def _require_admin(x_admin_key: str | None = Header(default=None)):
@@ -60,11 +138,204 @@ def _require_admin(x_admin_key: str | None = Header(default=None)):
 class AnalyzeRequest(BaseModel):
     text: Optional[str] = None
     url: Optional[str] = None
+    # "long" forces long-document mode; by default it kicks in past LONG_DOC_CHARS
+    mode: Optional[str] = None
+    # unset: included for normal texts, left out in long-document mode
+    include_raw_text: Optional[bool] = None
+    include_highlighted: Optional[bool] = None
 
     def cleaned_text(self) -> str:
         return (self.text or "").strip()
 
 
+class BatchAnalyzeRequest(BaseModel):
+    items: List[AnalyzeRequest]
+
+
+MAX_BATCH_ITEMS = int(os.environ.get("MAX_BATCH_ITEMS", "1000"))
+STREAM_CONCURRENCY = int(os.environ.get("ANALYZE_STREAM_CONCURRENCY", "4"))
+STREAM_MAX_LINE_BYTES = int(os.environ.get("ANALYZE_STREAM_MAX_LINE_BYTES", str(4 * 1024 * 1024)))
+
+
+def _verdict_version() -> str:
+    """Identifies what a verdict (label, confidence, sentiment, keywords) depends on."""
+    return f"{model.name}:{getattr(model, 'version', '')}:{LEXICON.version}:{sentiment_engine_name()}"
+
+
+def _cache_version(namespace: str) -> str:
+    """Identifies everything a cached `namespace` result depends on; changing
+    it invalidates those entries and no others."""
+    if namespace.startswith("analyze"):
+        # analyses carry the source credibility verdict
+        return f"{_verdict_version()}:{REPUTATION.version}"
+    if namespace == "bias":
+        return sentiment_engine_name()
+    # summaries depend only on the summarizer, which the namespace names
+    return ""
+
+
+async def _fetch_page_text(url: str) -> str:
+    """Fetch `url` and return its main article text (raises FetchError on
+    failure, ValueError for a page with no article text).
+
+    Extraction is capped, drops navigation and other boilerplate, and is
+    cached per URL with ETag/Last-Modified revalidation (see app/extract.py).
+    """
+    with span("fetch"):
+        article = await fetch_article(url)
+    if not article.text.strip():
+        # never score an empty page as if it were a story
+        raise ValueError("no article text found")
+    return article.text
+
+
+def _build_analysis(doc: Document, url: str, result: dict) -> dict:
+    """Combine a model prediction with the per-text helper outputs."""
+    with span("sentiment"):
+        sentiment = analyze_sentiment(doc)
+    with span("highlight"):
+        highlighted_text, keywords = highlight_keywords(doc)
+    with span("credibility"):
+        source_data = check_source_credibility(url) if url else None
+
+    return {
+        "label": result["label"],
+        "confidence": result["confidence"],
+        "probabilities": result.get("probabilities", []),
+        "sentiment": sentiment,
+        "keywords": keywords,
+        "highlighted": highlighted_text,
+        "source": source_data,
+        "raw_text": doc.text,
+    }
+
+
+def _run_pipeline(text: Union[str, Document], url: str) -> dict:
+    """Model + helpers for one text (synchronous; CPU-bound)."""
+    # one Document (and one lexicon pass) feeds every analyzer
+    doc = as_document(text)
+    with span("lexicon"):
+        doc.scan
+    with span("model"):
+        result = model.predict(doc)
+    return _build_analysis(doc, url, result)
+
+
+def _run_pipeline_long(text: str, url: str) -> dict:
+    """Long-document pipeline: windowed scores, no highlighted/raw text."""
+    with span("longdoc"):
+        out = longdoc.analyze_long(text, model)
+    with span("credibility"):
+        out["source"] = check_source_credibility(url) if url else None
+    return out
+
+
+def _analysis_from_stages(doc: Document, results: dict) -> dict:
+    """An /analyze result from fanned-out stage results (missing ones are None)."""
+    prediction = results.get("model") or {}
+    highlighted_text, keywords = results.get("highlight") or (None, None)
+    return {
+        "label": prediction.get("label"),
+        "confidence": prediction.get("confidence"),
+        "probabilities": prediction.get("probabilities", []),
+        "sentiment": results.get("sentiment"),
+        "keywords": keywords,
+        "highlighted": highlighted_text,
+        "source": results.get("credibility"),
+        "raw_text": doc.text,
+    }
+
+
+async def _run_pipeline_fanout(text: Union[str, Document], url: str) -> dict:
+    """Like `_run_pipeline` but with model, sentiment, highlighting and
+    credibility running concurrently, each under its own deadline.
+
+    Stages that time out or fail are left as None and listed under
+    `timed_out` / `failed`, with `partial: true`.
+    """
+    loop = asyncio.get_running_loop()
+    # the lexicon scan is shared by the model and the highlighter, so it runs
+    # first; the other Document parts are each used by a single stage
+    doc = as_document(text)
+    with span("lexicon"):
+        await loop.run_in_executor(fanout.get_pool(), lambda: doc.scan)
+    stages = {
+        "model": lambda: model.predict(doc),
+        "sentiment": lambda: analyze_sentiment(doc),
+        "highlight": lambda: highlight_keywords(doc),
+    }
+    if url:
+        stages["credibility"] = lambda: check_source_credibility(url)
+    results, timed_out, failed = await fanout.run_stages(stages)
+    for name in failed:
+        logger.error("Stage %s failed in /analyze", name)
+
+    out = _analysis_from_stages(doc, results)
+    if timed_out or failed:
+        out.update({"partial": True, "timed_out": timed_out, "failed": failed})
+    return out
+
+
+async def _cache_get(key: str) -> Optional[dict]:
+    """`RESULT_CACHE.get`, in the threadpool when it may read the SQLite tier."""
+    if RESULT_CACHE.persistent:
+        return await run_in_threadpool(RESULT_CACHE.get, key)
+    return RESULT_CACHE.get(key)
+
+
+async def _cache_set(key: str, value: dict) -> None:
+    if RESULT_CACHE.persistent:
+        await run_in_threadpool(RESULT_CACHE.set, key, value)
+    else:
+        RESULT_CACHE.set(key, value)
+
+
+def _near_duplicate(doc: Document, url: str):
+    """(signature, reused result or None) for a text about to be analyzed.
+
+    A lightly edited copy of an earlier story reuses its verdict. Blocking
+    (tokenizing, index load, database reads): run it in the threadpool.
+    """
+    if not neardup.NEAR_DUP:
+        return None, None
+    with span("neardup"):
+        signature = neardup.minhash(doc)
+        duplicate = NEAR_DUPS.find(signature, _verdict_version())
+    return signature, (_reuse_analysis(doc, url, duplicate) if duplicate is not None else None)
+
+
+def _register_analysis(signature, out: dict) -> None:
+    if signature is not None:
+        out["analysis_id"] = NEAR_DUPS.add(signature, _verdict_version(), _stored_verdict(out))
+
+
+async def _analyze_text(text: str, url: str, cache_key: str, force_long: bool = False) -> dict:
+    """Analyze fetched `text` the way /analyze does and cache it under `cache_key`.
+
+    Long documents go through the windowed pipeline; anything else first
+    looks for a near-duplicate of an earlier story.
+    """
+    long_mode = force_long or longdoc.is_long(text)
+    doc = None if long_mode else Document(text)
+    signature = None
+    if not long_mode:
+        signature, out = await run_in_threadpool(_near_duplicate, doc, url)
+        if out is not None:
+            await _cache_set(cache_key, out)
+            return out
+
+    if long_mode:
+        out = await run_in_threadpool(_run_pipeline_long, text, url)
+    elif fanout.ANALYZE_FANOUT:
+        out = await _run_pipeline_fanout(doc, url)
+    else:
+        out = await run_in_threadpool(_run_pipeline, doc, url)
+    if not out.get("partial"):
+        await run_in_threadpool(_register_analysis, signature, out)
+        await _cache_set(cache_key, out)
+    return out
+
+
 @app.post("/analyze")
 async def analyze_news(payload: AnalyzeRequest):
     """Analyze either a pasted `text` or a `url` (if text missing, we try to fetch).
@@ -77,38 +348,24 @@ async def analyze_news(payload: AnalyzeRequest):
     if not text and not url:
         raise HTTPException(status_code=400, detail="Provide 'text' or 'url' in JSON body")
 
+    force_long = payload.mode == "long"
+    namespace = "analyze:long" if force_long else "analyze"
+    cache_key = RESULT_CACHE.key(namespace, _cache_version(namespace), text=text, url=url)
+    out = await _cache_get(cache_key)
+    if out is not None:
+        return await _analyze_response(out, payload, text)
+
     # If URL was provided but text is empty, attempt to fetch page text (best-effort)
     if not text and url:
         try:
-            resp = requests.get(url, timeout=5)
-            resp.raise_for_status()
-            # naive extraction: take body text — for demo it's acceptable
-            # In production use proper HTML-to-text extraction
-            from bs4 import BeautifulSoup
-
-            soup = BeautifulSoup(resp.text, "html.parser")
-            # join visible text nodes
-            text = "\n".join(soup.stripped_strings)
+            text = await _fetch_page_text(url)
         except Exception as e:
             logger.exception("Failed to fetch URL %s", url)
             raise HTTPException(status_code=400, detail=f"Could not fetch url: {e}")
 
     try:
-        result = model.predict(text)
-        sentiment = analyze_sentiment(text)
-        highlighted_text, keywords = highlight_keywords(text)
-        source_data = check_source_credibility(url) if url else None
-
-        return {
-            "label": result["label"],
-            "confidence": result["confidence"],
-            "probabilities": result.get("probabilities", []),
-            "sentiment": sentiment,
-            "keywords": keywords,
-            "highlighted": highlighted_text,
-            "source": source_data,
-            "raw_text": text,
-        }
+        out = await _analyze_text(text, url, cache_key, force_long)
+        return await _analyze_response(out, payload, text)
     except HTTPException:
         raise
     except Exception as e:
@@ -116,17 +373,304 @@ async def analyze_news(payload: AnalyzeRequest):
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
+def _stored_verdict(out: dict) -> dict:
+    """The part of an /analyze result kept for near-duplicate reuse."""
+    return {k: out[k] for k in ("label", "confidence", "probabilities", "sentiment", "keywords") if k in out}
+
+
+def _reuse_analysis(doc: Document, url: str, duplicate: dict) -> dict:
+    """An /analyze result for `text` built from a near-duplicate's verdict.
+
+    Model and sentiment come from the earlier analysis; the cheap per-text
+    parts (highlighting, keywords, source) are redone for this copy.
+    """
+    highlighted_text, keywords = highlight_keywords(doc)
+    out = dict(duplicate["result"])
+    out.update({
+        "keywords": keywords,
+        "highlighted": highlighted_text,
+        "source": check_source_credibility(url) if url else None,
+        "raw_text": doc.text,
+        "duplicate_of": {
+            "id": duplicate["id"],
+            "similarity": duplicate["similarity"],
+            "href": f"/analysis/{duplicate['id']}",
+        },
+    })
+    return out
+
+
+async def _analyze_response(out: dict, payload: AnalyzeRequest, text: str) -> dict:
+    """Apply the request's `include_*` flags to a (possibly cached) result.
+
+    Long-document results are stored without `raw_text` / `highlighted`; they
+    are only rebuilt when a client explicitly asks for them.
+    """
+    out = longdoc.select_fields(out, payload.include_raw_text, payload.include_highlighted)
+    if out.get("mode") == "long" and (payload.include_raw_text or payload.include_highlighted):
+        if not text:
+            try:
+                text = await _fetch_page_text(payload.url)
+            except Exception as e:
+                raise HTTPException(status_code=400, detail=f"Could not fetch url: {e}")
+        out = dict(out)
+        if payload.include_highlighted:
+            out["highlighted"] = await run_in_threadpool(lambda: "".join(longdoc.iter_highlighted(text)))
+        if payload.include_raw_text:
+            out["raw_text"] = text
+    return out
+
+
+@app.get("/analysis/{analysis_id}")
+async def get_analysis(analysis_id: int):
+    """A stored verdict, as linked from `duplicate_of` in /analyze."""
+    row = await run_in_threadpool(db.get_analysis, analysis_id)
+    if row is None:
+        raise HTTPException(status_code=404, detail="Analysis not found")
+    return {"id": row["id"], "created_at": row["created_at"], "version": row["version"], **json.loads(row["result"])}
+
+
+@app.post("/analyze/highlight")
+async def analyze_highlight(payload: AnalyzeRequest):
+    """Stream the highlighted HTML for a text or URL, window by window.
+
+    Same markup as `highlighted` in /analyze, without holding the whole
+    output in memory; meant for long documents.
+    """
+    text = payload.cleaned_text()
+    if not text and payload.url:
+        try:
+            text = await _fetch_page_text(payload.url)
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=f"Could not fetch url: {e}")
+    if not text:
+        raise HTTPException(status_code=400, detail="Provide 'text' or 'url' in JSON body")
+    return StreamingResponse(longdoc.iter_highlighted(text), media_type="text/html; charset=utf-8")
+
+
+@app.post("/analyze/batch")
+async def analyze_batch(payload: BatchAnalyzeRequest):
+    """Analyze many texts/URLs in one call.
+
+    All texts are scored together with `NewsModel.predict_batch`. Results come
+    back in input order; an item that fails (missing input, unreachable URL)
+    gets an `error` entry instead of failing the whole batch.
+    """
+    if len(payload.items) > MAX_BATCH_ITEMS:
+        raise HTTPException(status_code=413, detail=f"Batch too large (max {MAX_BATCH_ITEMS} items)")
+
+    results: List[dict] = [{} for _ in payload.items]
+    item_texts = [item.cleaned_text() for item in payload.items]
+
+    # fetch URL-only items concurrently; the shared pool bounds connections
+    to_fetch = [i for i, item in enumerate(payload.items) if not item_texts[i] and item.url]
+    fetched = await asyncio.gather(
+        *(_fetch_page_text(payload.items[i].url) for i in to_fetch), return_exceptions=True
+    )
+    for i, res in zip(to_fetch, fetched):
+        if isinstance(res, Exception):
+            logger.warning("Failed to fetch URL %s in batch: %s", payload.items[i].url, res)
+            results[i] = {"index": i, "error": f"Could not fetch url: {res}"}
+        else:
+            item_texts[i] = res
+
+    texts: List[str] = []
+    pending: List[int] = []
+    for i, item in enumerate(payload.items):
+        if results[i]:
+            continue
+        if not item_texts[i] and not item.url:
+            results[i] = {"index": i, "error": "Provide 'text' or 'url'"}
+            continue
+        texts.append(item_texts[i])
+        pending.append(i)
+
+    try:
+        docs = [Document(t) for t in texts]
+        with span("lexicon"):
+            for d in docs:
+                d.scan
+        with span("model.batch"):
+            predictions = model.predict_batch(docs)
+    except Exception:
+        logger.exception("Unhandled error in /analyze/batch")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+    for i, doc, result in zip(pending, docs, predictions):
+        try:
+            results[i] = {"index": i, **_build_analysis(doc, payload.items[i].url or "", result)}
+        except Exception:
+            logger.exception("Failed to analyze batch item %d", i)
+            results[i] = {"index": i, "error": "Internal server error"}
+
+    return {"count": len(results), "results": results}
+
+
+async def _ndjson_lines(request: Request):
+    """Yield raw lines from the request body as they arrive."""
+    buf = b""
+    async for chunk in request.stream():
+        buf += chunk
+        start = 0
+        while True:
+            nl = buf.find(b"\n", start)
+            if nl < 0:
+                break
+            yield buf[start:nl]
+            start = nl + 1
+        buf = buf[start:]
+        if len(buf) > STREAM_MAX_LINE_BYTES:
+            raise ValueError(f"NDJSON line exceeds {STREAM_MAX_LINE_BYTES} bytes")
+    if buf.strip():
+        yield buf
+
+
+async def _analyze_stream_item(index: int, line: bytes) -> dict:
+    try:
+        doc = json.loads(line)
+        if not isinstance(doc, dict):
+            raise ValueError("each line must be a JSON object")
+        text = (doc.get("text") or "").strip()
+        url = doc.get("url") or ""
+        if not text and not url:
+            return {"index": index, "error": "Provide 'text' or 'url'"}
+        cache_key = RESULT_CACHE.key("analyze", _cache_version("analyze"), text=text, url=url)
+        out = await _cache_get(cache_key)
+        if out is None:
+            if not text:
+                text = await _fetch_page_text(url)
+            out = await _analyze_text(text, url, cache_key)
+        # same fields as a plain /analyze call: none of the bulky ones for long documents
+        out = dict(longdoc.select_fields(out, None, None))
+    except Exception as e:
+        return {"index": index, "error": str(e) or e.__class__.__name__}
+    if "id" in doc:
+        out["id"] = doc["id"]
+    return {"index": index, **out}
+
+
+class _RequestStreamingResponse(StreamingResponse):
+    """StreamingResponse that leaves `receive` to the handler.
+
+    The stock response listens for disconnects on `receive` while streaming,
+    which would swallow request-body chunks the handler is still reading.
+    Disconnects still surface through `request.stream()` and failed sends.
+    """
+
+    async def listen_for_disconnect(self, receive) -> None:
+        await asyncio.Event().wait()
+
+
+@app.post("/analyze/stream")
+async def analyze_stream(request: Request):
+    """Analyze an NDJSON body (one {"text"|"url", "id"?} object per line).
+
+    Lines are read incrementally and analyzed by at most
+    ANALYZE_STREAM_CONCURRENCY workers; each result is written back as an NDJSON
+    line as soon as it completes (tagged with its input `index`, so output order
+    may differ from input order). A slow client stalls the workers, which in
+    turn stops the body from being read, so memory stays flat regardless of
+    corpus size.
+    """
+    done = object()
+    results: asyncio.Queue = asyncio.Queue(maxsize=STREAM_CONCURRENCY)
+    slots = asyncio.Semaphore(STREAM_CONCURRENCY)
+    workers = set()
+
+    async def worker(index: int, line: bytes):
+        try:
+            await results.put(await _analyze_stream_item(index, line))
+        finally:
+            slots.release()
+
+    async def producer():
+        index = 0
+        try:
+            async for line in _ndjson_lines(request):
+                if not line.strip():
+                    continue
+                await slots.acquire()
+                task = asyncio.create_task(worker(index, line))
+                workers.add(task)
+                task.add_done_callback(workers.discard)
+                index += 1
+        except Exception as e:
+            logger.warning("Aborting NDJSON stream: %s", e)
+            await results.put({"index": index, "error": f"Invalid stream: {e}"})
+        if workers:
+            await asyncio.gather(*list(workers), return_exceptions=True)
+        await results.put(done)
+
+    async def body():
+        reader = asyncio.create_task(producer())
+        try:
+            while True:
+                item = await results.get()
+                if item is done:
+                    break
+                yield json.dumps(item) + "\n"
+        finally:
+            reader.cancel()
+            for task in list(workers):
+                task.cancel()
+
+    return _RequestStreamingResponse(body(), media_type="application/x-ndjson")
+
+
 @app.get("/health")
 async def healthcheck():
     """Simple health endpoint for CI and quick checks."""
     return {"status": "ok"}
 
 
+@app.get("/ready")
+async def readiness():
+    """Readiness probe: 503 until the startup warmup has finished.
+
+    The body reports how long each warmup step and lazy import took.
+    """
+    report = WARMUP.report()
+    report["status"] = "ready" if report["ready"] else "warming up"
+    return JSONResponse(report, status_code=200 if report["ready"] else 503)
+
+
 class TextRequest(BaseModel):
     text: Optional[str] = None
     url: Optional[str] = None
 
 
+def _summary_namespace() -> str:
+    if _use_transformer():
+        from app.summarizer_transformer import get_model_name
+
+        return f"summarize:transformer:{get_model_name()}"
+    return "summarize:textrank"
+
+
+def _summary_result(text: Union[str, Document]) -> dict:
+    """Transformer summary when configured (falling back to TextRank)."""
+    # Prefer transformer summarizer if configured
+    if _use_transformer():
+        try:
+            from app.summarizer_transformer import summarize_with_transformer
+
+            with span("summarize.transformer"):
+                summary = summarize_with_transformer(as_document(text).text)
+            return {"summary": summary, "source": "transformer"}
+        except Exception:
+            # log and fall back
+            logger.exception("Transformer summarizer unavailable, falling back to TextRank")
+
+    with span("summarize.textrank"):
+        summary = summarize_text(text, sentences_k=3)
+    return {"summary": summary, "source": "textrank"}
+
+
+def _summary_cacheable(out: dict) -> bool:
+    # a fallback result must not be pinned under the transformer key
+    return out["source"] == "transformer" or not _use_transformer()
+
+
 @app.post("/summarize")
 async def summarize(req: TextRequest):
     """Return a short summary.
@@ -136,93 +680,63 @@ async def summarize(req: TextRequest):
     the lightweight TextRank summarizer implemented in `summarizer.py`.
     """
     text = (req.text or "")
+    url = "" if text else (req.url or "")
+    namespace = _summary_namespace()
+    cache_key = RESULT_CACHE.key(namespace, _cache_version(namespace), text=text, url=url)
+    cached = await _cache_get(cache_key)
+    if cached is not None:
+        return cached
+
     if not text and req.url:
         try:
-            resp = requests.get(req.url, timeout=5)
-            resp.raise_for_status()
-            from bs4 import BeautifulSoup
-
-            soup = BeautifulSoup(resp.text, "html.parser")
-            text = "\n".join(soup.stripped_strings)
+            text = await _fetch_page_text(req.url)
         except Exception as e:
             raise HTTPException(status_code=400, detail=f"Could not fetch url: {e}")
 
     if not text:
         raise HTTPException(status_code=400, detail="Provide 'text' or 'url'")
 
-    # Prefer transformer summarizer if configured
-    use_transformer = os.environ.get("USE_TRANSFORMER", "0") in ("1", "true", "True")
-    if use_transformer:
-        try:
-            from app.summarizer_transformer import summarize_with_transformer
+    out = await run_in_threadpool(_summary_result, text)
+    if _summary_cacheable(out):
+        await _cache_set(cache_key, out)
+    return out
 
-            summary = summarize_with_transformer(text)
-            return {"summary": summary, "source": "transformer"}
+
+async def _fact_check_results(text: str, url: str) -> dict:
+    """Related fact-checks via the configured search backend, else demo data."""
+    if text:
+        q = " \"" + (text[:200].replace('\n',' ')) + "\""
+    elif url:
+        q = url
+    else:
+        q = None
+
+    # If NewsAPI key provided, perform a lightweight search for related articles
+    if q:
+        try:
+            with span("fact_check"):
+                hits = await fact_api.search(q, limit=5)
+            if hits:
+                return {"results": hits}
         except Exception:
-            # log and fall back
-            logger.exception("Transformer summarizer unavailable, falling back to TextRank")
+            # if NewsAPI fails or the key is missing, fall back to demo
+            pass
 
-    summary = summarize_text(text, sentences_k=3)
-    return {"summary": summary, "source": "textrank"}
+    return {"results": fact_api.DEMO_RESULTS}
 
 
 @app.post("/fact-check")
 async def fact_check(req: TextRequest):
     """Return fact-checked alternatives: use NewsAPI when NEWSAPI_KEY present, else return demo data."""
-    text = (req.text or "")
-    url = (req.url or "")
-    demo = [
-        {
-            "title": "Fact Check: Viral 'miracle cure' claim debunked",
-            "source": "ExampleFactCheck",
-            "url": "https://example.com/fact-check-miracle-cure",
-            "summary": "Independent health reporters found no evidence for the claimed cure."
-        },
-        {
-            "title": "Related: Misleading 'big pharma secret' narrative",
-            "source": "TrustedNews",
-            "url": "https://trustednews.example/article/123",
-            "summary": "Context and quotes from experts explaining why the narrative is misleading."
-        }
-    ]
-
-    # If NewsAPI key provided, perform a lightweight search for related articles
-    try:
-        from app.fact_api import search_newsapi
-        if text:
-            q = " \"" + (text[:200].replace('\n',' ')) + "\""
-        elif url:
-            q = url
-        else:
-            q = None
-
-        if q:
-            try:
-                hits = search_newsapi(q, limit=5)
-                # map to same shape
-                if hits:
-                    return {"results": hits}
-            except Exception:
-                # if NewsAPI fails, fall back to demo
-                pass
-    except Exception:
-        # fact_api not available or missing key
-        pass
+    return await _fact_check_results(req.text or "", req.url or "")
 
-    return {"results": demo}
 
+OPINION_WORDS = ["believe", "obviously", "clearly", "must", "should", "hate", "love"]
 
-@app.post("/bias")
-async def bias(req: TextRequest):
-    """Simple bias heuristic: use sentiment magnitude and presence of opinion words."""
-    text = (req.text or "")
-    if not text:
-        raise HTTPException(status_code=400, detail="Provide 'text' in body")
 
-    # naive heuristic
-    opinion_words = ["believe", "obviously", "clearly", "must", "should", "hate", "love"]
-    ow = sum(1 for w in opinion_words if w in text.lower())
-    sentiment = analyze_sentiment(text)
+def _bias_result(doc: Document, sentiment: dict) -> dict:
+    """Simple bias heuristic: sentiment magnitude plus opinion words."""
+    ow = sum(1 for w in OPINION_WORDS if w in doc.lower)
     polarity = abs(sentiment.get("polarity", 0))
 
     score = min(100, int((ow * 10) + polarity * 50))
@@ -240,6 +754,176 @@ async def bias(req: TextRequest):
     return {"label": label, "score": score, "color": color, "distribution": distribution}
 
 
+@app.post("/bias")
+async def bias(req: TextRequest):
+    """Simple bias heuristic: use sentiment magnitude and presence of opinion words."""
+    text = (req.text or "")
+    if not text:
+        raise HTTPException(status_code=400, detail="Provide 'text' in body")
+
+    cache_key = RESULT_CACHE.key("bias", _cache_version("bias"), text=text)
+    cached = await _cache_get(cache_key)
+    if cached is not None:
+        return cached
+
+    doc = Document(text)
+    with span("sentiment"):
+        sentiment = analyze_sentiment(doc)
+    out = _bias_result(doc, sentiment)
+    await _cache_set(cache_key, out)
+    return out
+
+
+REPORT_SECTIONS = ("analysis", "summary", "bias", "fact_check")
+# default deadlines for the stages /analyze does not have: the summary may run
+# a transformer and the fact-check waits on an upstream API
+REPORT_TIMEOUTS = {"summary": 10.0, "fact_check": 8.0}
+_ANALYSIS_STAGES = {"model", "sentiment", "highlight", "credibility", "analysis"}
+
+
+class ReportRequest(AnalyzeRequest):
+    # any of REPORT_SECTIONS; unset = all of them
+    sections: Optional[List[str]] = None
+
+
+@app.post("/report")
+async def report(payload: ReportRequest):
+    """Analysis, summary, bias and fact-checks for one article in one call.
+
+    The URL is fetched and extracted at most once, and one Document and one
+    sentiment result feed both the analysis and the bias sections. The
+    analysis goes through the same near-duplicate reuse as /analyze. Every
+    stage the requested sections need runs concurrently under the /analyze
+    stage deadlines. Sections already in the result cache (same keys as
+    /analyze, /summarize and /bias) are served from it and their stages
+    skipped. A section whose stages timed out or failed is null, and the
+    response lists them under `timed_out` / `failed` with `partial: true`.
+    """
+    sections = list(dict.fromkeys(payload.sections or REPORT_SECTIONS))
+    unknown = [name for name in sections if name not in REPORT_SECTIONS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown section(s): {', '.join(unknown)}")
+    text = payload.cleaned_text()
+    url = (payload.url or "")
+    if not text and not url:
+        raise HTTPException(status_code=400, detail="Provide 'text' or 'url' in JSON body")
+
+    # /summarize and /bias key on the text as sent, /analyze on the stripped text
+    raw_text = payload.text or ""
+    analysis_ns = "analyze:long" if payload.mode == "long" else "analyze"
+    summary_ns = _summary_namespace()
+    keys = {
+        "analysis": RESULT_CACHE.key(analysis_ns, _cache_version(analysis_ns), text=text, url=url),
+        "summary": RESULT_CACHE.key(summary_ns, _cache_version(summary_ns), text=raw_text, url="" if raw_text else url),
+    }
+    out = {}
+    for name in ("analysis", "summary"):
+        if name in sections:
+            cached = await _cache_get(keys[name])
+            if cached is not None:
+                out[name] = cached
+
+    # everything but the fact-check needs the article text (bias is keyed on it)
+    if not text and any(name not in out for name in sections if name != "fact_check"):
+        try:
+            text = await _fetch_page_text(url)
+        except Exception as e:
+            logger.exception("Failed to fetch URL %s", url)
+            raise HTTPException(status_code=400, detail=f"Could not fetch url: {e}")
+    if "bias" in sections:
+        keys["bias"] = RESULT_CACHE.key("bias", _cache_version("bias"), text=raw_text or text)
+        cached = await _cache_get(keys["bias"])
+        if cached is not None:
+            out["bias"] = cached
+
+    long_mode = payload.mode == "long" or longdoc.is_long(text)
+    want = {name for name in sections if name not in out}
+    # a long-mode analysis on its own never needs the whole-text Document
+    needs_doc = bool(want & {"bias", "summary"}) or ("analysis" in want and not long_mode)
+    doc = Document(text) if needs_doc else None
+    signature = None
+    if "analysis" in want and not long_mode:
+        # same near-duplicate reuse and registration as /analyze
+        signature, reused = await run_in_threadpool(_near_duplicate, doc, url)
+        if reused is not None:
+            await _cache_set(keys["analysis"], reused)
+            out["analysis"] = reused
+            want.discard("analysis")
+    stages = {}
+    if "analysis" in want and long_mode:
+        stages["analysis"] = lambda: _run_pipeline_long(text, url)
+    elif "analysis" in want:
+        # model and highlighter share the lexicon scan, so it runs first
+        with span("lexicon"):
+            await asyncio.get_running_loop().run_in_executor(fanout.get_pool(), lambda: doc.scan)
+        stages["model"] = lambda: model.predict(doc)
+        stages["highlight"] = lambda: highlight_keywords(doc)
+        if url:
+            stages["credibility"] = lambda: check_source_credibility(url)
+    if "bias" in want or ("analysis" in want and not long_mode):
+        stages["sentiment"] = lambda: analyze_sentiment(doc)
+    if "summary" in want:
+        stages["summary"] = lambda: _summary_result(doc)
+    if "fact_check" in want:
+        stages["fact_check"] = functools.partial(_fact_check_results, raw_text, url)
+    timeouts = {name: fanout.stage_timeout(name, default) for name, default in REPORT_TIMEOUTS.items()}
+    if "analysis" in stages:
+        # the windowed pipeline scores every window in turn: one stage
+        # deadline (ANALYZE_TIMEOUT_ANALYSIS) per window
+        timeouts["analysis"] = fanout.stage_timeout("analysis") * longdoc.window_count(text)
+    results, timed_out, failed = await fanout.run_stages(stages, timeouts=timeouts)
+    for name in failed:
+        logger.error("Stage %s failed in /report", name)
+    missing = set(timed_out) | set(failed)
+
+    if "analysis" in want:
+        if long_mode:
+            analysis = results.get("analysis")
+        else:
+            analysis = _analysis_from_stages(doc, results) if "model" in results else None
+        if analysis is not None and not missing & _ANALYSIS_STAGES:
+            await run_in_threadpool(_register_analysis, signature, analysis)
+            await _cache_set(keys["analysis"], analysis)
+        out["analysis"] = analysis
+    if "bias" in want:
+        sentiment = results.get("sentiment")
+        out["bias"] = _bias_result(doc, sentiment) if sentiment is not None else None
+        if out["bias"] is not None:
+            await _cache_set(keys["bias"], out["bias"])
+    if "summary" in want:
+        out["summary"] = results.get("summary")
+        if out["summary"] is not None and _summary_cacheable(out["summary"]):
+            await _cache_set(keys["summary"], out["summary"])
+    if "fact_check" in want:
+        out["fact_check"] = results.get("fact_check")
+
+    if out.get("analysis") is not None:
+        out["analysis"] = await _analyze_response(out["analysis"], payload, text)
+    response = {"sections": sections, **{name: out.get(name) for name in sections}}
+    if missing:
+        response.update({"partial": True, "timed_out": timed_out, "failed": failed})
+    return response
+
+
+class CredibilityBatchRequest(BaseModel):
+    urls: List[str]
+
+
+MAX_CREDIBILITY_BATCH = int(os.environ.get("MAX_CREDIBILITY_BATCH", "10000"))
+
+
+@app.post("/credibility/batch")
+async def credibility_batch(req: CredibilityBatchRequest):
+    """Source credibility for a list of URLs, all checked against the same
+    version of the reputation list. Results are in request order; empty URLs
+    give null."""
+    if len(req.urls) > MAX_CREDIBILITY_BATCH:
+        raise HTTPException(status_code=413, detail=f"Batch too large (max {MAX_CREDIBILITY_BATCH} urls)")
+    with span("credibility"):
+        results = await run_in_threadpool(check_source_credibility_batch, req.urls)
+    return {"version": REPUTATION.version, "results": results}
+
+
 class SubscribeRequest(BaseModel):
     channel: str
     address: str
@@ -248,7 +932,7 @@ class SubscribeRequest(BaseModel):
 @app.post("/subscribe")
 async def subscribe(req: SubscribeRequest):
     try:
-        db.add_subscription(req.channel, req.address)
+        await run_in_threadpool(db.add_subscription, req.channel, req.address)
     except Exception:
         # fallback to in-memory store if DB unavailable
         _subscriptions.append({"channel": req.channel, "address": req.address})
@@ -263,7 +947,10 @@ class VoteRequest(BaseModel):
 @app.post("/community/vote")
 async def community_vote(req: VoteRequest):
     try:
-        score = db.add_vote(req.item_id, int(req.vote))
+        if VOTE_WRITE_BEHIND:
+            score = await run_in_threadpool(VOTES.vote, req.item_id, int(req.vote))
+        else:
+            score = await run_in_threadpool(db.add_vote, req.item_id, int(req.vote))
     except Exception:
         cur = _community_votes.get(req.item_id, 0)
         _community_votes[req.item_id] = cur + req.vote
@@ -274,30 +961,146 @@ async def community_vote(req: VoteRequest):
 @app.get("/community/score/{item_id}")
 async def community_score(item_id: str):
     try:
-        score = db.get_score(item_id)
+        if VOTE_WRITE_BEHIND:
+            # committed score (other workers write it too) plus deltas
+            # still buffered in memory
+            score = await run_in_threadpool(functools.partial(VOTES.score, item_id, fresh=True))
+        else:
+            score = await run_in_threadpool(db.get_score, item_id)
     except Exception:
         score = _community_votes.get(item_id, 0)
     return {"item_id": item_id, "score": score}
 
 
-@app.get("/admin/subscriptions")
-async def admin_subscriptions():
-    """Return recent subscriptions (admin view, demo only)."""
+@app.get("/community/leaderboard")
+async def community_leaderboard(order: str = "top", window: str = "all", limit: int = 10):
+    """Highest (`order=top`) or lowest (`order=bottom`) scored items, all-time
+    or over one of the leaderboard windows (1h, 24h, 7d)."""
+    if order not in ("top", "bottom"):
+        raise HTTPException(status_code=400, detail="order must be 'top' or 'bottom'")
+    if window != "all" and window not in leaderboard.WINDOWS:
+        raise HTTPException(status_code=400, detail=f"window must be one of: all, {', '.join(leaderboard.WINDOWS)}")
+    if not 1 <= limit <= leaderboard.LEADERBOARD_SIZE:
+        raise HTTPException(status_code=400, detail=f"limit must be between 1 and {leaderboard.LEADERBOARD_SIZE}")
     try:
-        subs = db.get_subscriptions()
+        items = await run_in_threadpool(
+            LEADERBOARD.ranking, limit, order == "top", None if window == "all" else window
+        )
     except Exception:
-        subs = _subscriptions
-    return {"count": len(subs), "subscriptions": subs}
+        if window != "all":
+            raise HTTPException(status_code=503, detail="Leaderboard unavailable")
+        ranked = sorted(_community_votes.items(), key=lambda kv: (kv[1], kv[0]), reverse=order == "top")
+        items = [{"rank": i, "item_id": k, "score": v} for i, (k, v) in enumerate(ranked[:limit], 1)]
+    return {"order": order, "window": window, "items": items}
+
+
+ADMIN_PAGE_SIZE = int(os.environ.get("ADMIN_PAGE_SIZE", "100"))
+ADMIN_MAX_PAGE_SIZE = int(os.environ.get("ADMIN_MAX_PAGE_SIZE", "1000"))
+EXPORT_FORMATS = ("csv", "ndjson")
+
+
+def _page_limit(limit: Optional[int]) -> int:
+    if limit is None:
+        return ADMIN_PAGE_SIZE
+    if not 1 <= limit <= ADMIN_MAX_PAGE_SIZE:
+        raise HTTPException(status_code=400, detail=f"limit must be between 1 and {ADMIN_MAX_PAGE_SIZE}")
+    return limit
+
+
+@app.get("/admin/subscriptions")
+async def admin_subscriptions(limit: Optional[int] = None, cursor: Optional[str] = None):
+    """Return a page of subscriptions, newest first (admin view, demo only).
+
+    Pass `next_cursor` back as `cursor` for the following page; it is null on
+    the last one. `count` is the total number of subscriptions.
+    """
+    limit = _page_limit(limit)
+    try:
+        subs, next_cursor = await run_in_threadpool(db.get_subscriptions, limit, cursor)
+        count = await run_in_threadpool(db.count_subscriptions)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except sqlite3.OperationalError:
+        # database unavailable: fall back to this process's in-memory copy
+        subs, next_cursor, count = _subscriptions[:limit], None, len(_subscriptions)
+    return {"count": count, "subscriptions": subs, "next_cursor": next_cursor}
 
 
 @app.get("/admin/votes")
-async def admin_votes():
-    """Return vote scores for items."""
+async def admin_votes(limit: Optional[int] = None, cursor: Optional[str] = None):
+    """Return a page of vote scores for items, highest first."""
+    limit = _page_limit(limit)
     try:
-        votes = db.get_all_votes()
-    except Exception:
-        votes = _community_votes
-    return {"votes": votes}
+        if VOTE_WRITE_BEHIND:
+            await run_in_threadpool(VOTES.flush)
+        rows, next_cursor = await run_in_threadpool(db.get_votes, limit, cursor)
+        count = await run_in_threadpool(db.count_votes)
+        votes = {r["item_id"]: r["score"] for r in rows}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except sqlite3.OperationalError:
+        votes, next_cursor, count = _community_votes, None, len(_community_votes)
+    return {"count": count, "votes": votes, "next_cursor": next_cursor}
+
+
+def _export_response(rows, fields: List[str], fmt: str, name: str) -> StreamingResponse:
+    """Stream `rows` (an iterator of dicts) as CSV or NDJSON, a batch at a time."""
+    if fmt not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of: {', '.join(EXPORT_FORMATS)}")
+
+    def body():
+        buf = io.StringIO()
+        writer = csv.DictWriter(buf, fieldnames=fields, extrasaction="ignore")
+        if fmt == "csv":
+            writer.writeheader()
+        for n, row in enumerate(rows, 1):
+            if fmt == "csv":
+                writer.writerow(row)
+            else:
+                buf.write(json.dumps(row) + "\n")
+            if n % 1000 == 0:
+                yield buf.getvalue()
+                buf.seek(0)
+                buf.truncate()
+        yield buf.getvalue()
+
+    media_type = "text/csv" if fmt == "csv" else "application/x-ndjson"
+    headers = {"Content-Disposition": f'attachment; filename="{name}.{fmt}"'}
+    return StreamingResponse(body(), media_type=media_type, headers=headers)
+
+
+@app.get("/admin/subscriptions/export")
+async def admin_subscriptions_export(format: str = "csv"):
+    """Download every subscription as CSV or NDJSON, streamed from the database."""
+    return _export_response(db.iter_subscriptions(), ["id", "channel", "address", "created_at"], format, "subscriptions")
+
+
+@app.get("/admin/votes/export")
+async def admin_votes_export(format: str = "csv"):
+    """Download every vote score as CSV or NDJSON, streamed from the database."""
+    if VOTE_WRITE_BEHIND:
+        await run_in_threadpool(VOTES.flush)
+    return _export_response(db.iter_votes(), ["item_id", "score"], format, "votes")
+
+
+@app.get("/metrics")
+async def prometheus_metrics():
+    """Prometheus text exposition of request/stage latency and pool/cache counters."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/admin/cache")
+async def admin_cache():
+    """Return result-cache hit/miss counters and occupancy."""
+    return RESULT_CACHE.stats()
+
+
+@app.get("/admin/summarizer")
+async def admin_summarizer():
+    """Return loaded transformer summarizers with load time and memory use."""
+    from app.summarizer_transformer import REGISTRY
+
+    return REGISTRY.stats()
 
 if __name__ == '__main__':
     import uvicorn
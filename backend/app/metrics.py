@@ -0,0 +1,276 @@
+"""Low-overhead latency instrumentation and Prometheus text exposition.
+
+`span("model")` times a block into the per-stage histogram, and `timed(name)`
+does the same for a whole function. `MetricsMiddleware` records per-endpoint
+latency, labelled with the route template so paths with IDs don't explode
+cardinality. `render()` produces the Prometheus text format for `/metrics`,
+including any gauges registered with `register_collector` (cache, pools, ...).
+
+Each observation is one `perf_counter` pair, a bisect and a short locked
+increment, cheap enough to leave on under load. A sampling profiler can be
+enabled with PROFILE_SLOW_MS (threshold in ms) and PROFILE_SAMPLE_RATE
+(fraction of requests to profile, default 0.01). While a sampled request runs,
+the Python stack of every busy thread (event loop, request threadpool, stage
+pool) is sampled every PROFILE_INTERVAL_MS (default 5), so the work handed to
+worker threads is seen too; other requests running at the same time show up
+as well. Sampled requests slower than the threshold have their top functions
+logged, and their collapsed stacks (flame graph input) are written to
+PROFILE_DIR when that is set.
+"""
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+from contextlib import contextmanager
+from functools import wraps
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger("fakenews")
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+PROFILE_SLOW_MS = float(os.environ.get("PROFILE_SLOW_MS", "0"))
+PROFILE_SAMPLE_RATE = float(os.environ.get("PROFILE_SAMPLE_RATE", "0.01"))
+PROFILE_DIR = os.environ.get("PROFILE_DIR")
+PROFILE_INTERVAL_MS = float(os.environ.get("PROFILE_INTERVAL_MS", "5"))
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Histogram:
+    """Cumulative-bucket histogram keyed by a tuple of label values."""
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = (), buckets=DEFAULT_BUCKETS) -> None:
+        self.name = name
+        self.help = help
+        self.label_names = labels
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        # label values -> [bucket counts..., +Inf count, sum]
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, *label_values: str) -> None:
+        idx = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[idx] += 1
+            series[-1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = [(k, list(v)) for k, v in self._series.items()]
+        for label_values, series in sorted(items):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series[:-1]):
+                cumulative += count
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{bound!r}"'
+                lines.append(f"{self.name}_bucket{_labels(self.label_names, label_values, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.label_names, label_values)} {series[-1]:.6f}")
+            lines.append(f"{self.name}_count{_labels(self.label_names, label_values)} {cumulative}")
+        return lines
+
+    def reset(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+
+REQUEST_LATENCY = Histogram(
+    "fakenews_request_duration_seconds", "HTTP request latency by route.", ("method", "route", "status")
+)
+STAGE_LATENCY = Histogram("fakenews_stage_duration_seconds", "Latency of individual pipeline stages.", ("stage",))
+
+# name -> callable returning {metric_suffix: value}; rendered as gauges
+_collectors: Dict[str, Callable[[], Dict[str, float]]] = {}
+
+
+def register_collector(prefix: str, fn: Callable[[], Dict[str, float]]) -> None:
+    """Expose numeric stats from `fn()` as `fakenews_<prefix>_<key>` gauges."""
+    _collectors[prefix] = fn
+
+
+@contextmanager
+def span(stage: str) -> Iterator[None]:
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_LATENCY.observe(time.perf_counter() - started, stage)
+
+
+def timed(stage: str):
+    """Decorator form of `span` for synchronous functions."""
+    def decorate(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                STAGE_LATENCY.observe(time.perf_counter() - started, stage)
+        return wrapper
+    return decorate
+
+
+def render() -> str:
+    lines = REQUEST_LATENCY.render() + STAGE_LATENCY.render()
+    for prefix, fn in sorted(_collectors.items()):
+        try:
+            values = fn()
+        except Exception:
+            logger.exception("Metrics collector %s failed", prefix)
+            continue
+        for key, value in sorted(values.items()):
+            if isinstance(value, bool):
+                value = int(value)
+            if not isinstance(value, (int, float)):
+                continue
+            name = f"fakenews_{prefix}_{key}"
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {value}")
+    return "\n".join(lines) + "\n"
+
+
+# a thread whose innermost Python frame is in one of these is waiting, not working
+_IDLE_FILES = ("threading.py", "queue.py", "selectors.py")
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class _StackSampler:
+    """Counts the Python stacks of every busy thread, sampled on a timer."""
+
+    def __init__(self, interval: float, max_depth: int = 64) -> None:
+        self.interval = interval
+        self.max_depth = max_depth
+        self.stacks: "Counter[Tuple[str, ...]]" = Counter()  # root first
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        me = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            self.sample(skip=me)
+
+    def sample(self, skip: Optional[int] = None) -> None:
+        for ident, frame in sys._current_frames().items():
+            if ident == skip or os.path.basename(frame.f_code.co_filename) in _IDLE_FILES:
+                continue
+            stack = []
+            while frame is not None and len(stack) < self.max_depth:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            self.stacks[tuple(reversed(stack))] += 1
+        self.samples += 1
+
+    def top(self, n: int = 25) -> List[Tuple[str, int, int]]:
+        """(function, samples on the stack, samples as the innermost frame), busiest first."""
+        total: "Counter[str]" = Counter()
+        own: "Counter[str]" = Counter()
+        for stack, count in self.stacks.items():
+            for label in set(stack):
+                total[label] += count
+            own[stack[-1]] += count
+        return [(label, count, own[label]) for label, count in total.most_common(n)]
+
+    def collapsed(self) -> str:
+        """Stacks in the collapsed `a;b;c count` format flame graph tools read."""
+        return "".join(f"{';'.join(stack)} {count}\n" for stack, count in self.stacks.most_common())
+
+
+class _SlowRequestProfiler:
+    def __init__(
+        self, threshold_ms: float, sample_rate: float, out_dir: Optional[str], interval_ms: float = PROFILE_INTERVAL_MS
+    ) -> None:
+        self.threshold_ms = threshold_ms
+        self.sample_rate = sample_rate
+        self.out_dir = out_dir
+        self.interval_ms = interval_ms
+        self._active = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.threshold_ms > 0 and self.sample_rate > 0
+
+    def start(self) -> Optional[_StackSampler]:
+        # only one profiled request at a time; the sampler sees the whole process
+        if random.random() >= self.sample_rate or not self._active.acquire(blocking=False):
+            return None
+        sampler = _StackSampler(self.interval_ms / 1000)
+        sampler.start()
+        return sampler
+
+    def finish(self, sampler: _StackSampler, route: str, elapsed: float) -> None:
+        try:
+            sampler.stop()
+            if elapsed * 1000 < self.threshold_ms:
+                return
+            lines = [f"{'samples':>8} {'own':>6}  function ({sampler.samples} samples)"]
+            lines += [f"{total:>8} {own:>6}  {label}" for label, total, own in sampler.top(25)]
+            logger.warning("Slow request %s took %.1f ms; profile:\n%s", route, elapsed * 1000, "\n".join(lines))
+            if self.out_dir:
+                os.makedirs(self.out_dir, exist_ok=True)
+                safe = route.strip("/").replace("/", "_").replace("{", "").replace("}", "") or "root"
+                path = os.path.join(self.out_dir, f"{safe}-{int(time.time() * 1000)}.folded")
+                with open(path, "w", encoding="utf-8") as f:
+                    f.write(sampler.collapsed())
+        finally:
+            self._active.release()
+
+
+PROFILER = _SlowRequestProfiler(PROFILE_SLOW_MS, PROFILE_SAMPLE_RATE, PROFILE_DIR)
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording request latency (and optional sampled profiles)."""
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        profiler = PROFILER.start() if PROFILER.enabled else None
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            REQUEST_LATENCY.observe(elapsed, scope.get("method", ""), route, str(status["code"]))
+            if profiler is not None:
+                PROFILER.finish(profiler, route, elapsed)
@@ -1,42 +1,72 @@
 # backend/app/model.py
 # Lightweight placeholder model wrapper. For hackathon/demo use a small rule-based fallback
-# Replace with a fine-tuned transformers checkpoint for production.
+# Replace with a fine-tuned transformers checkpoint for production, or train the linear
+# classifier in app/classifier.py and select it with NEWS_MODEL.
 
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Union
+import logging
 import math
 
+import numpy as np
+
+from app.document import Document, as_document
+from app.lexicon import LEXICON, LexiconScan
+
+SENSATIONAL_WORDS = LEXICON.terms("sensational")
+
+PLACEHOLDER_MODEL = "placeholder-rule-model"
+
+logger = logging.getLogger("fakenews")
+
+
+def _prediction(score: float) -> Dict[str, Any]:
+    label = "Real" if score >= 0.5 else "Fake"
+    return {"label": label, "confidence": float(score), "probabilities": [float(1 - score), float(score)]}
+
 
 class NewsModel:
-    """Tiny heuristic model for demo purposes.
+    """Tiny heuristic model for demo purposes, or a trained classifier.
 
-    It returns a confidence in [0.05, 0.95] where higher means more likely Real.
+    The heuristic returns a confidence in [0.05, 0.95] where higher means more
+    likely Real. `model_name` naming a trained artifact (see app/classifier.py)
+    switches to the linear classifier, whose confidence is P(Real).
     """
 
+    # bump whenever the scoring rules change; cached results are keyed on it
+    version = "1"
+
     def __init__(self, model_name: str | None = None) -> None:
-        # Placeholder: in production replace with an actual model loader
-        self.name = model_name or "placeholder-rule-model"
+        self.name = model_name or PLACEHOLDER_MODEL
+        self.classifier = None
+        if self.name != PLACEHOLDER_MODEL:
+            from app.classifier import LinearTextClassifier, resolve_artifact
+
+            path = resolve_artifact(self.name)
+            if path is None:
+                logger.error("Model %r not found, using the placeholder model", self.name)
+                self.name = PLACEHOLDER_MODEL
+            else:
+                self.classifier = LinearTextClassifier.load(str(path))
+                self.version = self.classifier.version
 
-    def predict(self, text: str) -> Dict[str, Any]:
-        text_l = (text or "").lower()
-        if not text_l.strip():
+    def predict(self, text: Union[str, Document], scan: Optional[LexiconScan] = None) -> Dict[str, Any]:
+        """Score one text or `Document`. `scan` may be a precomputed `LEXICON.scan(text)`."""
+        doc = as_document(text)
+        if self.classifier is not None:
+            return self.predict_batch([doc])[0]
+        if not doc.n_words:
             # no content -> uncertain
             score = 0.5
         else:
             # base confidence increases with length and reduces with sensational tokens
-            base = 0.55 if len(text_l.split()) > 40 else 0.5
-            sensational = [
-                "miracle",
-                "shocking",
-                "secret",
-                "exposed",
-                "cure",
-                "unbelievable",
-                "overnight",
-            ]
+            base = 0.55 if doc.n_words > 40 else 0.5
+            if scan is None:
+                scan = doc.scan
+            counts = scan.counts("sensational")
             penalty = 0.0
-            for w in sensational:
+            for w in SENSATIONAL_WORDS:
                 # penalize per-occurrence but with diminishing returns
-                count = text_l.count(w)
+                count = counts.get(w, 0)
                 if count:
                     penalty += 0.18 * (1 - math.exp(-0.5 * count))
 
@@ -44,5 +74,33 @@ class NewsModel:
 
         # clamp and convert to probabilities (fake, real)
         score = max(0.05, min(0.95, score))
-        label = "Real" if score >= 0.5 else "Fake"
-        return {"label": label, "confidence": float(score), "probabilities": [float(1 - score), float(score)]}
+        return _prediction(score)
+
+    def predict_batch(self, texts: List[Union[str, Document]], scans: Optional[List[LexiconScan]] = None) -> List[Dict[str, Any]]:
+        """Score many texts at once; same output per item as `predict`.
+
+        Occurrence counts are gathered into an (n_texts, n_words) matrix so the
+        penalty, base and clamping steps run as array operations over the batch.
+        """
+        if not texts:
+            return []
+        docs = [as_document(t) for t in texts]
+        if self.classifier is not None:
+            # one sparse feature matrix and one product for the whole batch
+            return [_prediction(p) for p in self.classifier.predict_proba([d.text for d in docs]).tolist()]
+        if scans is None:
+            scans = [d.scan for d in docs]
+        per_text = [s.counts("sensational") for s in scans]
+        counts = np.array(
+            [[c.get(w, 0) for w in SENSATIONAL_WORDS] for c in per_text],
+            dtype=np.float64,
+        ).reshape(len(docs), len(SENSATIONAL_WORDS))
+        n_words = np.fromiter((d.n_words for d in docs), dtype=np.int64, count=len(docs))
+        empty = n_words == 0
+
+        penalty = (0.18 * (1 - np.exp(-0.5 * counts))).sum(axis=1)
+        base = np.where(n_words > 40, 0.55, 0.5)
+        scores = np.where(empty, 0.5, base - penalty)
+        scores = np.clip(scores, 0.05, 0.95)
+
+        return [_prediction(score) for score in scores.tolist()]
@@ -0,0 +1,330 @@
+# backend/app/neardup.py
+"""Near-duplicate detection for analyzed texts (MinHash + LSH).
+
+Copies of the same story usually differ by an intro line, a few hashtags or
+a tracking footer, so they miss the exact-hash result cache. Each analyzed
+text gets a MinHash signature over its word 3-grams: NEAR_DUP_PERM hash
+permutations, keeping the low 16 bits of each minimum (b-bit MinHash). The
+fraction of equal positions between two signatures estimates the Jaccard
+similarity of their shingle sets.
+
+Signatures are split into bands of 4 values; a band's 4 x 16 bits pack into a
+single uint64 key, and two texts are candidates when any band key matches.
+With 16 bands of 4 rows, pairs at Jaccard 0.8 collide with probability
+>0.999 and unrelated texts almost never. Candidates are then checked against
+the full signature and ranked by similarity; the best one at or above
+NEAR_DUP_THRESHOLD that was analyzed under the current model/lexicon
+version wins.
+
+Each band is a sorted key array searched with `searchsorted` (O(log n)) plus
+a small unsorted tail for recent inserts, merged in when it fills up. Memory
+is about 330 bytes per document (signature, band keys and ids), ~330 MB for
+a million. Signatures and the verdicts they point to are stored in the
+`analyses` table of the app database and the index is rebuilt from it on
+first use, so it survives restarts. When a story is analyzed again under a
+new version, its stale row is overwritten in place rather than joined by a
+second copy. Only the NEAR_DUP_MAX_ANALYSES most recently added analyses are
+kept: once the table grows 10% past that, the oldest rows are deleted and
+the index is rebuilt (0 keeps everything).
+"""
+import json
+from array import array
+import logging
+import os
+import threading
+import zlib
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from app import db
+from app.document import Document, as_document
+
+logger = logging.getLogger("fakenews")
+
+NEAR_DUP = os.environ.get("NEAR_DUP", "1") in ("1", "true", "True")
+NEAR_DUP_THRESHOLD = float(os.environ.get("NEAR_DUP_THRESHOLD", "0.8"))
+# texts with fewer words are too short for shingle overlap to mean much
+NEAR_DUP_MIN_WORDS = int(os.environ.get("NEAR_DUP_MIN_WORDS", "12"))
+NEAR_DUP_MAX_ANALYSES = int(os.environ.get("NEAR_DUP_MAX_ANALYSES", "200000"))
+
+# version code of an index entry whose row now holds a newer analysis
+_SUPERSEDED = -1
+
+NUM_PERM = 64
+ROWS_PER_BAND = 4  # 4 x 16-bit values = one uint64 band key
+BANDS = NUM_PERM // ROWS_PER_BAND
+SHINGLE = 3
+TAIL_SIZE = 8192
+
+_MERSENNE = np.uint64((1 << 61) - 1)
+_rng = np.random.default_rng(0x5EED)
+# fixed seed: signatures are persisted, so the permutations must never change
+_A = _rng.integers(1, 1 << 31, NUM_PERM, dtype=np.uint64)
+_B = _rng.integers(0, 1 << 31, NUM_PERM, dtype=np.uint64)
+
+
+def shingle_hashes(text: Union[str, Document]) -> np.ndarray:
+    """32-bit hashes of the word 3-grams of `text` (lowercased)."""
+    words = as_document(text).tokens
+    if len(words) < NEAR_DUP_MIN_WORDS:
+        return np.zeros(0, dtype=np.uint64)
+    h = np.fromiter((zlib.crc32(w.encode("utf-8")) for w in words), dtype=np.uint64, count=len(words))
+    # combine consecutive word hashes into one 32-bit hash per shingle
+    mixed = h[:-2] * np.uint64(0x9E3779B1) + h[1:-1] * np.uint64(0x85EBCA77) + h[2:]
+    return np.unique(mixed & np.uint64(0xFFFFFFFF))
+
+
+def minhash(text: Union[str, Document], block: int = 4096) -> Optional[np.ndarray]:
+    """b-bit MinHash signature (NUM_PERM uint16) of `text`, or None if too short."""
+    shingles = shingle_hashes(text)
+    if not len(shingles):
+        return None
+    mins = np.full(NUM_PERM, np.iinfo(np.uint64).max, dtype=np.uint64)
+    for i in range(0, len(shingles), block):
+        # (a*x + b) mod p stays below 2**63 since a, b < 2**31 and x < 2**32
+        part = (_A[:, None] * shingles[None, i:i + block] + _B[:, None]) % _MERSENNE
+        np.minimum(mins, part.min(axis=1), out=mins)
+    return (mins & np.uint64(0xFFFF)).astype(np.uint16)
+
+
+def band_keys(signatures: np.ndarray) -> np.ndarray:
+    """(n, BANDS) uint64 band keys for (n, NUM_PERM) uint16 signatures."""
+    return np.ascontiguousarray(signatures, dtype=np.uint16).view("<u8")
+
+
+class MinHashLSH:
+    """In-memory LSH index over b-bit MinHash signatures.
+
+    Documents get sequential ids from 0 in insertion order.
+    """
+
+    def __init__(self, tail_size: int = TAIL_SIZE) -> None:
+        self.tail_size = tail_size
+        self._sigs = np.zeros((1024, NUM_PERM), dtype=np.uint16)
+        self._n = 0
+        self._base_keys = np.zeros((BANDS, 0), dtype=np.uint64)
+        self._base_ids = np.zeros((BANDS, 0), dtype=np.uint32)
+        self._tail_keys = np.zeros((BANDS, tail_size), dtype=np.uint64)
+        self._n_tail = 0
+        self.merges = 0
+
+    def __len__(self) -> int:
+        return self._n
+
+    def _reserve(self, extra: int) -> None:
+        if self._n + extra > len(self._sigs):
+            grown = np.zeros((max(2 * len(self._sigs), self._n + extra), NUM_PERM), dtype=np.uint16)
+            grown[:self._n] = self._sigs[:self._n]
+            self._sigs = grown
+
+    def add_many(self, signatures: np.ndarray) -> np.ndarray:
+        """Insert (n, NUM_PERM) signatures; returns their ids."""
+        signatures = np.asarray(signatures, dtype=np.uint16).reshape(-1, NUM_PERM)
+        first, m = self._n, len(signatures)
+        self._reserve(m)
+        self._sigs[first:first + m] = signatures
+        keys = band_keys(signatures).T
+        if self._n_tail + m <= self.tail_size:
+            self._tail_keys[:, self._n_tail:self._n_tail + m] = keys
+            self._n_tail += m
+        else:
+            # a full tail (or a bulk load) is sorted into the base in one merge
+            self._merge(np.concatenate([self._tail_keys[:, :self._n_tail], keys], axis=1))
+        self._n += m
+        return np.arange(first, self._n)
+
+    def add(self, signature: np.ndarray) -> int:
+        return int(self.add_many(signature[None, :])[0])
+
+    def _merge(self, new_keys: np.ndarray) -> None:
+        """Merge (BANDS, m) keys for ids following the base into the base."""
+        n_base, m = self._base_keys.shape[1], new_keys.shape[1]
+        new_ids = np.arange(n_base, n_base + m, dtype=np.uint32)
+        keys = np.empty((BANDS, n_base + m), dtype=np.uint64)
+        ids = np.empty((BANDS, n_base + m), dtype=np.uint32)
+        for b in range(BANDS):
+            order = np.argsort(new_keys[b], kind="stable")
+            nk = new_keys[b, order]
+            pos = np.searchsorted(self._base_keys[b], nk, side="right")
+            keys[b] = np.insert(self._base_keys[b], pos, nk)
+            ids[b] = np.insert(self._base_ids[b], pos, new_ids[order])
+        self._base_keys, self._base_ids = keys, ids
+        self._n_tail = 0
+        self.merges += 1
+
+    def candidates(self, signature: np.ndarray) -> np.ndarray:
+        """Ids sharing at least one band key with `signature`."""
+        q = band_keys(np.asarray(signature)[None, :])[0]
+        found = []
+        base_keys, base_ids = self._base_keys, self._base_ids
+        if base_keys.shape[1]:
+            for b in range(BANDS):
+                lo = np.searchsorted(base_keys[b], q[b], side="left")
+                hi = np.searchsorted(base_keys[b], q[b], side="right")
+                if hi > lo:
+                    found.append(base_ids[b, lo:hi])
+        if self._n_tail:
+            _, cols = np.nonzero(self._tail_keys[:, :self._n_tail] == q[:, None])
+            found.append((cols + base_keys.shape[1]).astype(np.uint32))
+        if not found:
+            return np.zeros(0, dtype=np.uint32)
+        return np.unique(np.concatenate(found))
+
+    def signature(self, doc_id: int) -> np.ndarray:
+        return self._sigs[doc_id]
+
+    def matches(self, signature: np.ndarray, threshold: float = NEAR_DUP_THRESHOLD) -> List[Tuple[int, float]]:
+        """(id, estimated similarity) of every document at or above
+        `threshold`, closest first (newest first among equals)."""
+        cands = self.candidates(signature)
+        if not len(cands):
+            return []
+        sims = (self._sigs[cands] == signature).mean(axis=1)
+        keep = sims >= threshold
+        cands, sims = cands[keep], sims[keep]
+        order = np.lexsort((-cands.astype(np.int64), -sims))
+        return [(int(cands[i]), float(sims[i])) for i in order]
+
+    def query(self, signature: np.ndarray, threshold: float = NEAR_DUP_THRESHOLD) -> Optional[Tuple[int, float]]:
+        """(id, estimated similarity) of the closest document at or above
+        `threshold`, or None."""
+        found = self.matches(signature, threshold)
+        return found[0] if found else None
+
+    def stats(self) -> Dict[str, Any]:
+        return {"documents": self._n, "tail": self._n_tail, "merges": self.merges}
+
+
+class NearDuplicateIndex:
+    """`MinHashLSH` backed by the `analyses` table: verdicts and signatures
+    are persisted, and the in-memory index is rebuilt from them on first use."""
+
+    def __init__(self, threshold: float = NEAR_DUP_THRESHOLD, max_rows: int = NEAR_DUP_MAX_ANALYSES) -> None:
+        self.threshold = threshold
+        self.max_rows = max_rows
+        self._lock = threading.Lock()
+        self._lsh: Optional[MinHashLSH] = None
+        self._rowids = array("q")  # index id -> analyses.id
+        # index id -> code of the version it was analyzed under, _SUPERSEDED
+        # once a newer analysis of the same story took its row
+        self._versions = array("i")
+        self._version_codes: Dict[str, int] = {}
+        self._rows = 0  # rows in the analyses table
+        self.counters = {
+            "hits": 0, "misses": 0, "stale": 0, "added": 0, "replaced": 0, "skipped": 0, "aged_out": 0,
+        }
+
+    def _index(self) -> MinHashLSH:
+        if self._lsh is None:
+            with self._lock:
+                if self._lsh is None:
+                    self._load()
+        return self._lsh
+
+    def _version_code(self, version: str) -> int:
+        return self._version_codes.setdefault(version, len(self._version_codes))
+
+    def _load(self) -> None:
+        lsh = MinHashLSH()
+        rowids, versions = array("q"), array("i")
+        self._version_codes = {}
+        batch: List[bytes] = []
+        for rowid, version, blob in db.iter_analysis_signatures():
+            rowids.append(rowid)
+            versions.append(self._version_code(version))
+            batch.append(blob)
+            if len(batch) == 10000:
+                lsh.add_many(np.frombuffer(b"".join(batch), dtype="<u2"))
+                batch = []
+        if batch:
+            lsh.add_many(np.frombuffer(b"".join(batch), dtype="<u2"))
+        self._lsh, self._rowids, self._versions, self._rows = lsh, rowids, versions, len(rowids)
+        if rowids:
+            logger.info("Loaded %d analyses into the near-duplicate index", len(rowids))
+
+    def load(self) -> None:
+        self._index()
+
+    def reset(self) -> None:
+        """Drop the in-memory index; the next use rebuilds it from the database."""
+        with self._lock:
+            self._lsh = None
+
+    def _age_out(self) -> None:
+        with self._lock:
+            if self._rows <= self.max_rows + max(1, self.max_rows // 10):
+                return
+            removed = db.prune_analyses(self.max_rows)
+            self._load()
+        self.counters["aged_out"] += removed
+        logger.info("Aged %d analyses out of the near-duplicate index", removed)
+
+    def find(self, signature: Optional[np.ndarray], version: str) -> Optional[Dict[str, Any]]:
+        """The stored analysis closest to `signature`, with `id` and
+        `similarity`, if one clears the threshold under the same `version`."""
+        if signature is None:
+            return None
+        self._index()
+        with self._lock:
+            # self._lsh, not a reference taken earlier: an age-out may have rebuilt it
+            found = self._lsh.matches(signature, self.threshold)
+            code = self._version_codes.get(version)
+            # rows scored by an older model/lexicon do not count
+            hit = next(((i, sim) for i, sim in found if self._versions[i] == code), None)
+            rowid = self._rowids[hit[0]] if hit else None
+        if hit is None:
+            self.counters["stale" if found else "misses"] += 1
+            return None
+        row = db.get_analysis(rowid)
+        if row is None or row["version"] != version:
+            self.counters["stale"] += 1
+            return None
+        self.counters["hits"] += 1
+        return {"id": rowid, "similarity": round(hit[1], 4), "result": json.loads(row["result"])}
+
+    def add(self, signature: Optional[np.ndarray], version: str, result: Dict[str, Any]) -> Optional[int]:
+        """Persist `result` for a newly analyzed text and index it; returns its id."""
+        if signature is None:
+            self.counters["skipped"] += 1
+            return None
+        self._index()
+        blob = np.ascontiguousarray(signature, dtype="<u2").tobytes()
+        with self._lock:
+            lsh, code = self._lsh, self._version_code(version)
+            # the closest copy of this story analyzed under another version
+            stale = next(
+                (i for i, _ in lsh.matches(signature, self.threshold) if self._versions[i] not in (code, _SUPERSEDED)),
+                None,
+            )
+            rowid = self._rowids[stale] if stale is not None else None
+        if rowid is not None and db.replace_analysis(rowid, blob, version, json.dumps(result)):
+            self.counters["replaced"] += 1
+            with self._lock:
+                if self._lsh is lsh:
+                    if np.array_equal(lsh.signature(stale), signature):
+                        self._versions[stale] = code
+                        return rowid
+                    # an edited copy: index the new signature for the same row
+                    self._versions[stale] = _SUPERSEDED
+        else:
+            rowid = db.add_analysis(blob, version, json.dumps(result))
+            self.counters["added"] += 1
+            with self._lock:
+                self._rows += 1
+        with self._lock:
+            self._lsh.add(signature)
+            self._rowids.append(rowid)
+            self._versions.append(self._version_code(version))
+        if self.max_rows:
+            self._age_out()
+        return rowid
+
+    def stats(self) -> Dict[str, Any]:
+        out = dict(self.counters)
+        if self._lsh is not None:
+            out.update(self._lsh.stats())
+        return out
+
+
+NEAR_DUPS = NearDuplicateIndex()
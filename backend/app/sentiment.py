@@ -1,34 +1,100 @@
 # backend/app/sentiment.py
-from typing import Dict, Any
+import os
+from typing import Dict, Any, List, Union
+
+from app.document import Document, as_document
+from app.startup import has_module, lazy_import
+
+# optional dependency for nicer sentiment; imported on first use because it
+# pulls in nltk, scikit-learn and SciPy (seconds of startup)
+_HAS_TEXTBLOB = has_module("textblob")
 
 try:
-    from textblob import TextBlob  # optional dependency for nicer sentiment
-    _HAS_TEXTBLOB = True
+    from app.sentiment_engine import get_engine  # needs numpy
+    _HAS_LEXICON_ENGINE = True
 except Exception:
-    TextBlob = None
-    _HAS_TEXTBLOB = False
+    get_engine = None
+    _HAS_LEXICON_ENGINE = False
+
+# "textblob" (default) or "lexicon" for the built-in NumPy engine in
+# app/sentiment_engine.py. If the lexicon engine can't load, TextBlob is used.
+SENTIMENT_ENGINE = os.environ.get("SENTIMENT_ENGINE", "textblob").lower()
+
+
+def engine_name() -> str:
+    """The engine that will actually score text, after fallbacks."""
+    if SENTIMENT_ENGINE == "lexicon" and _lexicon_engine() is not None:
+        return "lexicon"
+    return "textblob"
+
+
+def _lexicon_engine():
+    if not _HAS_LEXICON_ENGINE:
+        return None
+    try:
+        return get_engine()
+    except Exception:
+        return None
 
 
-def analyze_sentiment(text: str) -> Dict[str, Any]:
+def _result(polarity: float) -> Dict[str, Any]:
+    polarity = round(float(polarity), 3)
+    if polarity > 0.2:
+        tone = "Positive"
+    elif polarity < -0.2:
+        tone = "Negative"
+    else:
+        tone = "Neutral"
+    return {"polarity": polarity, "tone": tone}
+
+
+def analyze_sentiment(text: Union[str, Document]) -> Dict[str, Any]:
     """Return a simple sentiment dict. If TextBlob isn't installed or fails,
     return a neutral fallback so the API doesn't crash.
+
+    `text` may be a `Document`, whose tokens the lexicon engine reuses.
     """
+    if isinstance(text, Document):
+        doc, text = text, text.text
+    else:
+        doc = None
     if not text:
         return {"polarity": 0.0, "tone": "Neutral"}
-    if not _HAS_TEXTBLOB:
+    if engine_name() == "lexicon":
+        engine = _lexicon_engine()
+        if doc is None:
+            return _result(engine.polarity_of(text))
+        return _result(engine.score_tokens([doc.sentiment_tokens])[0])
+    textblob = lazy_import("textblob") if _HAS_TEXTBLOB else None
+    if textblob is None:
         # graceful fallback when textblob isn't available
         return {"polarity": 0.0, "tone": "Neutral", "note": "textblob missing"}
 
     try:
-        tb = TextBlob(text)
-        polarity = round(tb.sentiment.polarity, 3)
-        if polarity > 0.2:
-            tone = "Positive"
-        elif polarity < -0.2:
-            tone = "Negative"
-        else:
-            tone = "Neutral"
-        return {"polarity": polarity, "tone": tone}
+        tb = textblob.TextBlob(text)
+        return _result(tb.sentiment.polarity)
     except Exception:
         # Unexpected runtime error from TextBlob -> return neutral and a note
         return {"polarity": 0.0, "tone": "Neutral", "note": "textblob error"}
+
+
+def analyze_sentiment_batch(texts: List[Union[str, Document]]) -> List[Dict[str, Any]]:
+    """`analyze_sentiment` for many texts (or Documents); the lexicon engine
+    scores them in one vectorized pass."""
+    if engine_name() != "lexicon":
+        return [analyze_sentiment(t) for t in texts]
+    docs = [as_document(t) for t in texts]
+    scores = _lexicon_engine().score_tokens([d.sentiment_tokens for d in docs])
+    return [_result(p) if d.text else {"polarity": 0.0, "tone": "Neutral"} for d, p in zip(docs, scores)]
+
+
+def combine_sentiment(results: List[Dict[str, Any]], weights: List[float]) -> Dict[str, Any]:
+    """Merge per-piece sentiment results into one, weighting each polarity."""
+    total = sum(weights)
+    if not results or not total:
+        return {"polarity": 0.0, "tone": "Neutral"}
+    out = _result(sum(r["polarity"] * w for r, w in zip(results, weights)) / total)
+    notes = {r["note"] for r in results if "note" in r}
+    if notes:
+        out["note"] = ", ".join(sorted(notes))
+    return out
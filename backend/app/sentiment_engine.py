@@ -0,0 +1,203 @@
+# backend/app/sentiment_engine.py
+"""Built-in lexicon sentiment engine, scored with NumPy.
+
+The polarity lexicon (app/lexicons/polarity.tsv) is compiled once into a
+term -> id dict plus parallel NumPy arrays (polarity, intensity, flags). Scoring
+a text is a single tokenizer pass followed by array operations, and
+`score_batch` scores many documents with one set of array ops over the
+concatenated token stream, so it needs no per-document Python loop after
+tokenizing.
+
+The scoring rules follow TextBlob's PatternAnalyzer closely enough that
+outputs are interchangeable (see benchmarks/sentiment_compare.py):
+
+* the document polarity is the mean over assessments, where an assessment
+  is a known term (plus whatever modifiers precede it);
+* a modifier ("very", "really") folds into the next known term and scales
+  its polarity by the modifier's intensity;
+* a negation ("not", "never", "no", "n't") directly before a chain (short
+  one-letter words may sit in between) flips and halves it: "not good" is
+  slightly bad, and inverts the modifier ("not very good");
+* each "!" after a term boosts it by 1.25x.
+
+Unlike TextBlob's tokenizer, contractions such as "don't" count as
+negations.
+"""
+import re
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+
+from app.lexicon import LEXICON_DIR
+
+DEFAULT_POLARITY_LEXICON = LEXICON_DIR / "polarity.tsv"
+NEGATIONS = ("no", "not", "never", "n't")
+EXCLAMATION_BOOST = 1.25
+
+_TOKEN_RE = re.compile(r"n't|[a-z0-9]+(?:[-'][a-z0-9]+)*|!")
+_CONTRACTION_RE = re.compile(r"(?<=[a-z])n't\b")
+
+# per-id flag bits
+_KNOWN, _MODIFIER, _NEGATION, _BANG = 1, 2, 4, 8
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens, with "n't" split off and "!" kept."""
+    return tokenize_lowered(text.lower())
+
+
+def tokenize_lowered(lowered: str) -> List[str]:
+    """`tokenize` for text that is already lowercased."""
+    return _TOKEN_RE.findall(_CONTRACTION_RE.sub(" n't", lowered))
+
+
+def read_polarity_lexicon(path: Union[str, Path]) -> Dict[str, Tuple[float, float, bool]]:
+    """Parse a tab-separated `term polarity intensity modifier` file."""
+    entries: Dict[str, Tuple[float, float, bool]] = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            term, polarity, intensity, modifier = line.split("\t")
+            entries[term.lower()] = (float(polarity), float(intensity), modifier == "1")
+    return entries
+
+
+class LexiconSentiment:
+    """Polarity scorer over an array-backed lexicon."""
+
+    def __init__(self, entries: Dict[str, Tuple[float, float, bool]], negations: Iterable[str] = NEGATIONS):
+        vocab: Dict[str, int] = {}
+        polarity: List[float] = []
+        intensity: List[float] = []
+        flags: List[int] = []
+
+        def add(term: str, p: float = 0.0, i: float = 1.0, flag: int = 0) -> None:
+            if term in vocab:
+                flags[vocab[term]] |= flag
+                return
+            vocab[term] = len(polarity)
+            polarity.append(p)
+            intensity.append(i)
+            flags.append(flag)
+
+        for term, (p, i, modifier) in entries.items():
+            add(term, p, i, _KNOWN | (_MODIFIER if modifier else 0))
+        for term in negations:
+            add(term, flag=_NEGATION)
+        add("!", flag=_BANG)
+        # id -1 (unknown token) indexes this trailing all-zero slot
+        add("\0", flag=0)
+
+        self.vocab = vocab
+        self.polarity = np.asarray(polarity, dtype=np.float64)
+        self.intensity = np.asarray(intensity, dtype=np.float64)
+        self.flags = np.asarray(flags, dtype=np.uint8)
+
+    @classmethod
+    def from_file(cls, path: Union[str, Path] = DEFAULT_POLARITY_LEXICON) -> "LexiconSentiment":
+        return cls(read_polarity_lexicon(path))
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self.flags & _KNOWN))
+
+    def polarity_of(self, text: str) -> float:
+        return float(self.score_batch([text])[0])
+
+    def score_batch(self, texts: List[str]) -> np.ndarray:
+        """Polarity in [-1, 1] for each text (0.0 when no known terms)."""
+        return self.score_tokens([tokenize(text or "") for text in texts])
+
+    def score_tokens(self, token_lists: List[List[str]]) -> np.ndarray:
+        """`score_batch` over already tokenized texts (see `tokenize`)."""
+        n_docs = len(token_lists)
+        if n_docs == 0:
+            return np.zeros(0)
+        vocab_get = self.vocab.get
+        ids_list: List[int] = []
+        lens_list: List[int] = []
+        doc_list: List[int] = []
+        for d, tokens in enumerate(token_lists):
+            ids_list.extend(vocab_get(t, -1) for t in tokens)
+            lens_list.extend(len(t) for t in tokens)
+            doc_list.extend([d] * len(tokens))
+        if not ids_list:
+            return np.zeros(n_docs)
+
+        ids = np.asarray(ids_list, dtype=np.int64)
+        lens = np.asarray(lens_list, dtype=np.int64)
+        doc = np.asarray(doc_list, dtype=np.int64)
+        flags = self.flags[ids]
+        known = (flags & _KNOWN) != 0
+        negation = (flags & _NEGATION) != 0
+        bang = (flags & _BANG) != 0
+        n = len(ids)
+        idx = np.arange(n)
+
+        # a modifier reaches across short unknown words ("really is a good");
+        # a negation only across one-letter ones ("not a good")
+        mod_gap = ~known & ~negation & (lens <= 2)
+        neg_gap = ~known & ~negation & (lens <= 1)
+        prev_sig = _previous(np.where(~mod_gap, idx, -1))
+        prev_neg_sig = _previous(np.where(~neg_gap, idx, -1))
+
+        has_prev = prev_sig >= 0
+        prev_ok = np.where(has_prev, prev_sig, 0)
+        merged = known & has_prev & known[prev_ok] & ((flags[prev_ok] & _MODIFIER) != 0) & (doc[prev_ok] == doc)
+        has_neg = prev_neg_sig >= 0
+        neg_ok = np.where(has_neg, prev_neg_sig, 0)
+        negated = known & has_neg & negation[neg_ok] & (doc[neg_ok] == doc)
+
+        kidx = np.flatnonzero(known)
+        if len(kidx) == 0:
+            return np.zeros(n_docs)
+        starts = ~merged[kidx]
+        chain = np.cumsum(starts) - 1
+        head = kidx[starts][chain]
+        chain_negated = negated[head]
+        ends = np.append(starts[1:], True)
+
+        end_idx = kidx[ends]
+        end_negated = chain_negated[ends]
+        pol = self.polarity[ids[end_idx]]
+        # a merged term takes its modifier's intensity; a negated chain head
+        # inverts that intensity for the word it modifies
+        was_merged = merged[end_idx]
+        mod_idx = prev_ok[end_idx]
+        factor = self.intensity[ids[mod_idx]]
+        invert = was_merged & (mod_idx == head[ends]) & end_negated
+        factor = np.where(invert, 1.0 / factor, factor)
+        pol = np.where(was_merged, np.clip(pol * factor, -1.0, 1.0), pol)
+
+        # exclamation marks between this term and the next known term (or
+        # the end of its document)
+        bang_cum = np.cumsum(bang)
+        end_doc = doc[end_idx]
+        stop = np.minimum(np.append(kidx[1:], n)[ends], np.searchsorted(doc, end_doc, side="right"))
+        bangs = bang_cum[stop - 1] - bang_cum[end_idx]
+        boosted = bangs > 0
+        if boosted.any():
+            pol = np.where(boosted, np.clip(pol * EXCLAMATION_BOOST ** bangs, -1.0, 1.0), pol)
+
+        pol = np.where(end_negated, pol * -0.5, pol)
+        sums = np.bincount(end_doc, weights=pol, minlength=n_docs)
+        counts = np.bincount(end_doc, minlength=n_docs)
+        return sums / np.maximum(counts, 1)
+
+
+def _previous(marks: np.ndarray) -> np.ndarray:
+    """For each position, the last index before it whose mark is >= 0 (else -1)."""
+    running = np.maximum.accumulate(marks)
+    return np.concatenate(([-1], running[:-1]))
+
+
+_ENGINE: Optional[LexiconSentiment] = None
+
+
+def get_engine() -> LexiconSentiment:
+    global _ENGINE
+    if _ENGINE is None:
+        _ENGINE = LexiconSentiment.from_file()
+    return _ENGINE
@@ -0,0 +1,173 @@
+# backend/app/startup.py
+"""Startup cost tracking: lazy optional imports, warmup and readiness.
+
+Heavy optional dependencies are not imported with `app.main`: TextBlob alone
+pulls in nltk, scikit-learn and SciPy. Modules fetch them with
+`lazy_import`, which imports on first use and records how long that took.
+The app lifespan runs `WARMUP.run()` after startup so those imports (and the
+database schema, the suffix list, ...) are done before real traffic arrives.
+`/ready` answers 503 until warmup has finished, while `/health` stays a plain
+liveness check. Set WARMUP_BLOCKING=1 to finish warmup before the server
+accepts requests at all.
+
+Per-module import cost of `import app.main` itself::
+
+    python -m app.startup                 # top 25 modules by cumulative time
+    python -m app.startup --json out.json # full report, for tracking over time
+"""
+import argparse
+import importlib
+import importlib.util
+import json
+import logging
+import os
+import subprocess
+import sys
+import threading
+import time
+from types import ModuleType
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger("fakenews")
+
+WARMUP_BLOCKING = os.environ.get("WARMUP_BLOCKING", "0") in ("1", "true", "True")
+
+# module name -> seconds spent importing it on first use (None if it failed)
+IMPORT_TIMES: Dict[str, Optional[float]] = {}
+_loaded: Dict[str, Optional[ModuleType]] = {}
+_import_lock = threading.Lock()
+
+
+def has_module(name: str) -> bool:
+    """Whether `name` is importable, without importing it."""
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+def lazy_import(name: str) -> Optional[ModuleType]:
+    """Import `name` on first use and record the cost; None if unavailable."""
+    module = _loaded.get(name)
+    if module is not None:
+        return module
+    with _import_lock:
+        if name in _loaded:
+            return _loaded[name]
+        # a module already in sys.modules may still be initialising in another
+        # thread; import_module waits for it rather than returning it half-built
+        already = name in sys.modules
+        started = time.perf_counter()
+        try:
+            module = importlib.import_module(name)
+        except Exception as e:
+            IMPORT_TIMES[name] = None
+            logger.warning("Optional dependency %s unavailable: %s", name, e)
+            module = None
+        else:
+            if not already:
+                IMPORT_TIMES[name] = time.perf_counter() - started
+        _loaded[name] = module
+        return module
+
+
+class Warmup:
+    """Ordered warmup steps, run once; readiness is "all steps attempted"."""
+
+    def __init__(self) -> None:
+        self._steps: List[Tuple[str, Callable[[], Any]]] = []
+        self.results: Dict[str, Dict[str, Any]] = {}
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._done = threading.Event()
+
+    def step(self, name: str, fn: Callable[[], Any]) -> None:
+        self._steps.append((name, fn))
+
+    @property
+    def ready(self) -> bool:
+        return self._done.is_set()
+
+    def run(self) -> None:
+        """Run every step, timing each; a failing step is logged, not fatal."""
+        if self.started_at is not None:
+            self._done.wait()
+            return
+        self.started_at = time.time()
+        begun = time.perf_counter()
+        for name, fn in self._steps:
+            started = time.perf_counter()
+            result: Dict[str, Any] = {}
+            try:
+                fn()
+            except Exception as e:
+                logger.exception("Warmup step %s failed", name)
+                result["error"] = str(e) or e.__class__.__name__
+            result["seconds"] = round(time.perf_counter() - started, 4)
+            self.results[name] = result
+        self.finished_at = time.time()
+        logger.info("Warmup finished in %.2fs", time.perf_counter() - begun)
+        self._done.set()
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "ready": self.ready,
+            "seconds": round(self.finished_at - self.started_at, 4) if self.ready else None,
+            "steps": dict(self.results),
+            "imports": {k: (round(v, 4) if v is not None else None) for k, v in IMPORT_TIMES.items()},
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        out: Dict[str, Any] = {"ready": self.ready}
+        if self.ready:
+            out["seconds"] = self.finished_at - self.started_at
+        for name, result in self.results.items():
+            out[f"step_{name}_seconds"] = result["seconds"]
+        return out
+
+
+WARMUP = Warmup()
+
+
+def import_report(target: str = "app.main") -> List[Dict[str, Any]]:
+    """Per-module import cost of `import <target>` in a fresh interpreter,
+    parsed from `python -X importtime` (self and cumulative seconds)."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        capture_output=True, text=True, check=True,
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append({
+            "module": name.strip(),
+            "depth": depth,
+            "self_s": int(self_us) / 1e6,
+            "cumulative_s": int(cumulative_us) / 1e6,
+        })
+    return rows
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    p = argparse.ArgumentParser(description="Import-time report for the API")
+    p.add_argument("--target", default="app.main", help="module to import (default app.main)")
+    p.add_argument("--top", type=int, default=25, help="how many modules to print")
+    p.add_argument("--json", metavar="PATH", help="write the full report as JSON")
+    args = p.parse_args(argv)
+
+    rows = import_report(args.target)
+    total = next((r["cumulative_s"] for r in rows if r["module"] == args.target), None)
+    print(f"import {args.target}: {total:.3f}s" if total is not None else f"import {args.target}")
+    for r in sorted(rows, key=lambda r: -r["cumulative_s"])[:args.top]:
+        print(f"  {r['cumulative_s']:8.3f}s cumulative {r['self_s']:8.3f}s self  {r['module']}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"target": args.target, "total_s": total, "modules": rows}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,11 +1,21 @@
 """Lightweight TextRank-style summarizer for demo (no external deps).
 
 This builds a sentence-similarity graph using token overlap and runs a simple
-PageRank iteration to score sentences and return the top few.
+PageRank iteration to score sentences and return the top few. The graph and the
+iteration are computed with NumPy (and a SciPy sparse incidence matrix when
+SciPy is installed); iteration stops early once the scores converge.
 """
 import re
 from math import sqrt
-from typing import List
+from typing import List, Optional, Union
+
+import numpy as np
+
+from app.document import Document, as_document
+from app.startup import has_module, lazy_import
+
+# optional: sparse token-incidence matrix (imported on first summary)
+_HAS_SCIPY = has_module("scipy")
 
 
 def tokenize_words(text: str) -> List[str]:
@@ -28,46 +38,72 @@ def sentence_similarity(s1_tokens, s2_tokens):
     return len(common) / (sqrt(len(s1_set)) * sqrt(len(s2_set)))
 
 
-def textrank(sentences: List[str], top_k: int = 3, max_iter: int = 50, d: float = 0.85):
+def _similarity_matrix(tokenized: List[List[str]]) -> np.ndarray:
+    """Cosine overlap between sentence token sets, via a binary incidence matrix.
+
+    Entry (i, j) equals `sentence_similarity(tokenized[i], tokenized[j])`; the
+    diagonal is zero.
+    """
+    vocab = {}
+    rows, cols = [], []
+    for i, toks in enumerate(tokenized):
+        for t in set(toks):
+            rows.append(i)
+            cols.append(vocab.setdefault(t, len(vocab)))
+    n = len(tokenized)
+    data = np.ones(len(rows), dtype=np.float64)
+    sparse = lazy_import("scipy.sparse") if _HAS_SCIPY else None
+    if sparse is not None:
+        incidence = sparse.csr_matrix((data, (rows, cols)), shape=(n, max(len(vocab), 1)))
+        common = (incidence @ incidence.T).toarray()
+    else:
+        incidence = np.zeros((n, max(len(vocab), 1)), dtype=np.float64)
+        incidence[rows, cols] = 1.0
+        common = incidence @ incidence.T
+    sizes = np.sqrt(np.diag(common))
+    norm = np.outer(sizes, sizes)
+    weights = np.divide(common, norm, out=np.zeros_like(common), where=norm > 0)
+    np.fill_diagonal(weights, 0.0)
+    return weights
+
+
+def textrank(sentences: List[str], top_k: int = 3, max_iter: int = 50, d: float = 0.85, tol: float = 1e-6,
+             tokenized: Optional[List[List[str]]] = None):
+    """Top `top_k` sentences in original order. `tokenized` may hold the
+    precomputed `sentence_tokens` of each sentence."""
     n = len(sentences)
     if n == 0:
         return []
     if n <= top_k:
         return sentences
 
-    tokenized = [sentence_tokens(s) for s in sentences]
-    # build weight matrix
-    weights = [[0.0] * n for _ in range(n)]
-    for i in range(n):
-        for j in range(i + 1, n):
-            w = sentence_similarity(tokenized[i], tokenized[j])
-            weights[i][j] = w
-            weights[j][i] = w
+    if tokenized is None:
+        tokenized = [sentence_tokens(s) for s in sentences]
+    weights = _similarity_matrix(tokenized)
 
-    # normalize rows
-    out_sum = [sum(weights[i]) for i in range(n)]
+    # column-normalise so transition[i, j] = weights[i, j] / out_sum[j]
+    out_sum = weights.sum(axis=0)
+    transition = np.divide(weights, out_sum, out=np.zeros_like(weights), where=out_sum > 0)
 
-    scores = [1.0 / n] * n
+    scores = np.full(n, 1.0 / n)
     for _ in range(max_iter):
-        new_scores = [ (1 - d) / n ] * n
-        for i in range(n):
-            for j in range(n):
-                if out_sum[j] != 0:
-                    new_scores[i] += d * (weights[i][j] / out_sum[j]) * scores[j]
+        new_scores = (1 - d) / n + d * (transition @ scores)
+        delta = np.abs(new_scores - scores).sum()
         scores = new_scores
+        if delta < tol:
+            break
 
-    ranked = sorted(enumerate(scores), key=lambda x: x[1], reverse=True)
-    top_idx = [i for i, _ in ranked[:top_k]]
+    top_idx = np.argpartition(-scores, top_k - 1)[:top_k]
     # preserve original order
-    top_idx_sorted = sorted(top_idx)
-    summary = [sentences[i] for i in top_idx_sorted]
+    summary = [sentences[i] for i in np.sort(top_idx)]
     return summary
 
 
-def summarize_text(text: str, sentences_k: int = 3) -> str:
-    sentences = re.split(r'(?<=[.!?])\s+', text)
-    sentences = [s.strip() for s in sentences if s.strip()]
+def summarize_text(text: Union[str, Document], sentences_k: int = 3) -> str:
+    """`text` may be a `Document`; its sentence split and tokens are reused."""
+    doc = as_document(text)
+    sentences = doc.sentence_texts
     if not sentences:
         return ""
-    top = textrank(sentences, top_k=sentences_k)
+    top = textrank(sentences, top_k=sentences_k, tokenized=doc.sentence_tokens)
     return " ".join(top)
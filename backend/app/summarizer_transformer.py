@@ -1,23 +1,201 @@
 """Optional transformer-based summarizer used only if transformers is installed
 and a model is provided via SUMMARIZER_MODEL env var (or default HuggingFace model).
 
-This file is intentionally optional — if transformers isn't installed this module
-will raise an ImportError and the code will fall back to the lightweight textrank summarizer.
+This file is intentionally optional — if transformers isn't installed, loading a
+model raises a RuntimeError and the code will fall back to the lightweight textrank summarizer.
+
+Pipelines are kept in a process-wide `REGISTRY` so each model is loaded from
+disk once and shared by all requests. The registry is a thread-safe LRU bounded
+by SUMMARIZER_CACHE_MAX_MODELS (default 2) and, optionally, by
+SUMMARIZER_CACHE_MAX_MB of estimated model memory. SUMMARIZER_MODEL may be a
+local directory; it (or SUMMARIZER_OFFLINE=1 / HF_HUB_OFFLINE=1) makes loading
+use local files only.
 """
+import logging
 import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
 
-def summarize_with_transformer(text: str, max_length: int = 120, min_length: int = 30) -> str:
+logger = logging.getLogger("fakenews")
+
+DEFAULT_MODEL = "sshleifer/distilbart-cnn-12-6"
+
+_TRUTHY = ("1", "true", "True")
+
+
+def get_model_name() -> str:
+    # if not set, use a small default summarization-capable model name (still requires download)
+    return os.environ.get("SUMMARIZER_MODEL") or DEFAULT_MODEL
+
+
+def _offline(model_name: str) -> bool:
+    if os.path.isdir(model_name):
+        return True
+    return any(os.environ.get(v, "0") in _TRUTHY
+               for v in ("SUMMARIZER_OFFLINE", "HF_HUB_OFFLINE", "TRANSFORMERS_OFFLINE"))
+
+
+def _load_pipeline(model_name: str):
     try:
         from transformers import pipeline
     except Exception as e:
         raise RuntimeError("transformers not available") from e
 
-    model_name = os.environ.get("SUMMARIZER_MODEL")
-    # if not set, use a small default summarization-capable model name (still requires download)
-    if not model_name:
-        model_name = "sshleifer/distilbart-cnn-12-6"
+    if _offline(model_name):
+        from transformers import AutoModelForSeq2SeqLM, AutoTokenizer
+
+        tokenizer = AutoTokenizer.from_pretrained(model_name, local_files_only=True)
+        model = AutoModelForSeq2SeqLM.from_pretrained(model_name, local_files_only=True)
+        return pipeline("summarization", model=model, tokenizer=tokenizer)
+    return pipeline("summarization", model=model_name)
+
+
+def resident_memory_bytes() -> int:
+    """Current resident set size of this process (0 if it can't be read)."""
+    try:
+        with open("/proc/self/statm") as fh:
+            pages = int(fh.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE")
+    except Exception:
+        pass
+    try:
+        import resource
+
+        # ru_maxrss is the peak (KiB on Linux, bytes on macOS); best effort elsewhere
+        return int(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss) * 1024
+    except Exception:
+        return 0
+
+
+def _pipeline_bytes(pipe: Any) -> int:
+    """Size of the model weights, if the pipeline exposes a torch-style model."""
+    try:
+        return int(sum(p.numel() * p.element_size() for p in pipe.model.parameters()))
+    except Exception:
+        return 0
 
-    summarizer = pipeline("summarization", model=model_name)
+
+class _Entry:
+    __slots__ = ("pipeline", "load_seconds", "memory_bytes", "loaded_at", "hits")
+
+    def __init__(self, pipeline: Any, load_seconds: float, memory_bytes: int) -> None:
+        self.pipeline = pipeline
+        self.load_seconds = load_seconds
+        self.memory_bytes = memory_bytes
+        self.loaded_at = time.time()
+        self.hits = 0
+
+
+class SummarizerRegistry:
+    """Thread-safe LRU of loaded summarization pipelines keyed by model name."""
+
+    def __init__(
+        self,
+        loader: Callable[[str], Any] = _load_pipeline,
+        max_models: int = 2,
+        max_memory_bytes: int = 0,
+        measure: Callable[[Any], int] = _pipeline_bytes,
+    ) -> None:
+        self._loader = loader
+        self._measure = measure
+        self.max_models = max(1, max_models)
+        self.max_memory_bytes = max_memory_bytes
+        self._lock = threading.Lock()
+        self._load_locks: Dict[str, threading.Lock] = {}
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self.loads = 0
+        self.evictions = 0
+
+    def get(self, model_name: str) -> Any:
+        """Return the pipeline for `model_name`, loading it at most once."""
+        with self._lock:
+            entry = self._entries.get(model_name)
+            if entry is not None:
+                self._entries.move_to_end(model_name)
+                entry.hits += 1
+                return entry.pipeline
+            load_lock = self._load_locks.setdefault(model_name, threading.Lock())
+
+        # one loader per model; concurrent callers wait here and then share it
+        with load_lock:
+            with self._lock:
+                entry = self._entries.get(model_name)
+                if entry is not None:
+                    self._entries.move_to_end(model_name)
+                    entry.hits += 1
+                    return entry.pipeline
+
+            rss_before = resident_memory_bytes()
+            started = time.perf_counter()
+            pipe = self._loader(model_name)
+            load_seconds = time.perf_counter() - started
+            memory = self._measure(pipe) or max(0, resident_memory_bytes() - rss_before)
+            logger.info("Loaded summarizer %s in %.2fs (~%.1f MB)", model_name, load_seconds, memory / 2**20)
+
+            with self._lock:
+                self._entries[model_name] = _Entry(pipe, load_seconds, memory)
+                self.loads += 1
+                self._evict()
+        return pipe
+
+    def _evict(self) -> None:
+        # caller holds self._lock; never evict the entry that was just added
+        while len(self._entries) > 1 and (
+            len(self._entries) > self.max_models
+            or (self.max_memory_bytes and self.memory_bytes() > self.max_memory_bytes)
+        ):
+            name, _ = self._entries.popitem(last=False)
+            self.evictions += 1
+            logger.info("Evicted summarizer %s from registry", name)
+
+    def memory_bytes(self) -> int:
+        return sum(e.memory_bytes for e in self._entries.values())
+
+    def warm(self, model_names: Optional[List[str]] = None) -> None:
+        for name in model_names or [get_model_name()]:
+            self.get(name)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            models = [
+                {
+                    "model": name,
+                    "load_seconds": round(e.load_seconds, 3),
+                    "memory_mb": round(e.memory_bytes / 2**20, 1),
+                    "hits": e.hits,
+                    "loaded_at": e.loaded_at,
+                }
+                for name, e in self._entries.items()
+            ]
+            return {
+                "models": models,
+                "loads": self.loads,
+                "evictions": self.evictions,
+                "max_models": self.max_models,
+                "max_memory_mb": round(self.max_memory_bytes / 2**20, 1),
+                "resident_memory_mb": round(resident_memory_bytes() / 2**20, 1),
+            }
+
+
+REGISTRY = SummarizerRegistry(
+    max_models=int(os.environ.get("SUMMARIZER_CACHE_MAX_MODELS", "2")),
+    max_memory_bytes=int(float(os.environ.get("SUMMARIZER_CACHE_MAX_MB", "0")) * 2**20),
+)
+
+
+def warmup() -> None:
+    """Load the configured model ahead of the first request."""
+    REGISTRY.warm()
+
+
+def summarize_with_transformer(text: str, max_length: int = 120, min_length: int = 30) -> str:
+    summarizer = REGISTRY.get(get_model_name())
     # Hugging Face pipelines will chunk long inputs; for demo keep simple
     out = summarizer(text, max_length=max_length, min_length=min_length, do_sample=False)
     if isinstance(out, list) and len(out) > 0 and isinstance(out[0], dict):
@@ -0,0 +1,213 @@
+"""Write-behind aggregation for /community/vote.
+
+During traffic spikes a popular item can get thousands of votes a second.
+Instead of one SQLite transaction per vote, `VoteAggregator` merges deltas per
+`item_id` in memory and writes them with `db.add_votes` in one batched
+transaction, either every VOTE_FLUSH_INTERVAL seconds or as soon as
+VOTE_FLUSH_MAX_PENDING distinct items are waiting. Reads add the pending delta
+to the persisted score so clients always see their own votes. Persisted
+scores are cached and kept current by the flushes themselves, so a vote only
+takes short in-memory locks; the table is read on a cache miss, never while
+holding up a flush. Other worker processes write the same table, so a cached
+score is only trusted for VOTE_SCORE_CACHE_TTL seconds, and `score(...,
+fresh=True)` (used by /community/score) always reads the committed value.
+
+Enable with VOTE_WRITE_BEHIND=1; otherwise every vote goes straight to
+`db.add_vote`.
+"""
+import atexit
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+from app import db
+
+logger = logging.getLogger("fakenews")
+
+VOTE_WRITE_BEHIND = os.environ.get("VOTE_WRITE_BEHIND", "0") in ("1", "true", "True")
+VOTE_FLUSH_INTERVAL = float(os.environ.get("VOTE_FLUSH_INTERVAL", "1.0"))
+VOTE_FLUSH_MAX_PENDING = int(os.environ.get("VOTE_FLUSH_MAX_PENDING", "1000"))
+# persisted scores remembered per item, so a vote rarely has to read the table
+VOTE_SCORE_CACHE_SIZE = int(os.environ.get("VOTE_SCORE_CACHE_SIZE", "100000"))
+# how long a cached score may miss votes flushed by other worker processes
+VOTE_SCORE_CACHE_TTL = float(os.environ.get("VOTE_SCORE_CACHE_TTL", "2.0"))
+
+
+class VoteAggregator:
+    def __init__(
+        self,
+        flush_interval: float = VOTE_FLUSH_INTERVAL,
+        max_pending: int = VOTE_FLUSH_MAX_PENDING,
+        writer: Callable[[Dict[str, int]], None] = db.add_votes,
+        reader: Callable[[str], Optional[int]] = db.get_score,
+        cache_ttl: float = VOTE_SCORE_CACHE_TTL,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._writer = writer
+        self._reader = reader
+        self._pending: Dict[str, int] = {}
+        # the batch being written by the current flush (not yet in the table)
+        self._inflight: Dict[str, int] = {}
+        self._flushing = False
+        # bumped when a flush starts or ends; a table read is only cached if no
+        # flush overlapped it
+        self._epoch = 0
+        # item_id -> (persisted score, when it was read from the table)
+        self._persisted: "OrderedDict[str, Tuple[int, float]]" = OrderedDict()
+        self.cache_size = VOTE_SCORE_CACHE_SIZE
+        self.cache_ttl = cache_ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        # serializes flushes; votes never wait on it
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.flushes = 0
+        self.flushed_votes = 0
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name="vote-flusher", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background flusher and write out everything still pending."""
+        self._stopping.set()
+        self._wake.set()
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout=max(5.0, self.flush_interval * 2))
+        self._thread = None
+        self.flush()
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Vote flush failed; deltas kept for the next attempt")
+
+    def add(self, item_id: str, delta: int) -> None:
+        if self._thread is None:
+            self.start()
+        with self._lock:
+            self._pending[item_id] = self._pending.get(item_id, 0) + delta
+            full = len(self._pending) >= self.max_pending
+        if full:
+            self._wake.set()
+
+    def pending(self, item_id: str) -> int:
+        with self._lock:
+            return self._pending.get(item_id, 0)
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def _cached_score(self, item_id: str) -> Optional[int]:
+        # caller holds self._lock
+        entry = self._persisted.get(item_id)
+        if entry is None:
+            return None
+        persisted, read_at = entry
+        if self._clock() - read_at >= self.cache_ttl:
+            del self._persisted[item_id]
+            return None
+        self._persisted.move_to_end(item_id)
+        return persisted + self._inflight.get(item_id, 0) + self._pending.get(item_id, 0)
+
+    def _remember(self, item_id: str, persisted: int) -> int:
+        # caller holds self._lock
+        self._persisted[item_id] = (persisted, self._clock())
+        self._persisted.move_to_end(item_id)
+        if len(self._persisted) > self.cache_size:
+            self._persisted.popitem(last=False)
+        return persisted + self._inflight.get(item_id, 0) + self._pending.get(item_id, 0)
+
+    def score(self, item_id: str, fresh: bool = False) -> int:
+        """Persisted score plus any delta that hasn't been flushed yet.
+
+        With `fresh`, the persisted part is read from the table rather than
+        the cache.
+        """
+        for _ in range(3):
+            with self._lock:
+                cached = None if fresh else self._cached_score(item_id)
+                if cached is not None:
+                    return cached
+                epoch, flushing = self._epoch, self._flushing
+            persisted = int(self._reader(item_id) or 0)
+            with self._lock:
+                if not flushing and epoch == self._epoch:
+                    # no batch was committed while we read
+                    return self._remember(item_id, persisted)
+        # flushes kept overlapping the read: read once with them held off
+        with self._flush_lock:
+            persisted = int(self._reader(item_id) or 0)
+            with self._lock:
+                return self._remember(item_id, persisted)
+
+    def vote(self, item_id: str, delta: int) -> int:
+        self.add(item_id, delta)
+        return self.score(item_id)
+
+    def flush(self) -> int:
+        """Write all pending deltas in one transaction; returns the number of items written."""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+                if not batch:
+                    return 0
+                self._inflight, self._flushing = batch, True
+                self._epoch += 1
+            try:
+                self._writer(batch)
+            except Exception:
+                # put the deltas back so no vote is lost
+                with self._lock:
+                    for item_id, delta in batch.items():
+                        self._pending[item_id] = self._pending.get(item_id, 0) + delta
+                    self._inflight, self._flushing = {}, False
+                    self._epoch += 1
+                raise
+            with self._lock:
+                for item_id, delta in batch.items():
+                    entry = self._persisted.get(item_id)
+                    if entry is not None:
+                        # keeps its read time: it still lacks other workers' votes
+                        self._persisted[item_id] = (entry[0] + delta, entry[1])
+                self._inflight, self._flushing = {}, False
+                self._epoch += 1
+            self.flushes += 1
+            self.flushed_votes += len(batch)
+            return len(batch)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "pending_items": self.pending_count(),
+            "flushes": self.flushes,
+            "flushed_items": self.flushed_votes,
+            "cached_scores": len(self._persisted),
+        }
+
+
+VOTES = VoteAggregator()
+
+
+@atexit.register
+def _flush_on_exit() -> None:
+    try:
+        VOTES.flush()
+    except Exception:
+        logger.exception("Final vote flush failed")
@@ -0,0 +1 @@
+"""Performance benchmarks for the analysis stages (run with `python -m benchmarks.run`)."""
@@ -0,0 +1,60 @@
+"""Deterministic synthetic news corpora for benchmarks.
+
+Texts are assembled from a fixed vocabulary with a seeded RNG, so every run
+(and every machine) benchmarks exactly the same input.
+"""
+import random
+from typing import Dict, List
+
+_NEUTRAL = (
+    "government officials report city council budget residents school hospital data study "
+    "researchers analysis weather market economy election policy court community program "
+    "annual statement spokesperson according published figures increase decrease quarter "
+    "region national local committee agency percent million survey results evidence"
+).split()
+_SENSATIONAL = "shocking miracle secret exposed cure unbelievable overnight exclusive claims".split()
+_SENTIMENT = "good great terrible bad excellent awful happy sad not very really".split()
+_OPINION = "believe obviously clearly must should hate love".split()
+
+# name -> (sentences, words per sentence)
+SIZES = {
+    "tweet": (2, 12),
+    "article": (40, 18),
+    "long": (1200, 16),
+}
+
+
+def make_sentence(rng: random.Random, n_words: int) -> str:
+    words = []
+    for _ in range(n_words):
+        r = rng.random()
+        if r < 0.03:
+            words.append(rng.choice(_SENSATIONAL))
+        elif r < 0.08:
+            words.append(rng.choice(_SENTIMENT))
+        elif r < 0.10:
+            words.append(rng.choice(_OPINION))
+        else:
+            words.append(rng.choice(_NEUTRAL))
+    words[0] = words[0].capitalize()
+    return " ".join(words) + rng.choice([".", ".", ".", "!", "?"])
+
+
+def make_document(rng: random.Random, sentences: int, words: int) -> str:
+    return " ".join(make_sentence(rng, max(3, int(rng.gauss(words, 3)))) for _ in range(sentences))
+
+
+def make_corpus(size: str, count: int = 1, seed: int = 1234) -> List[str]:
+    sentences, words = SIZES[size]
+    rng = random.Random(f"{seed}:{size}")
+    return [make_document(rng, sentences, words) for _ in range(count)]
+
+
+def make_urls(count: int, seed: int = 1234) -> List[str]:
+    rng = random.Random(seed)
+    hosts = ["www.bbc.com", "reuters.com", "news.example.org", "fake-news.net", "blog.gossipbuzz.com"]
+    return [f"https://{rng.choice(hosts)}/story/{rng.randrange(10**6)}" for _ in range(count)]
+
+
+def corpora(count: int = 1) -> Dict[str, List[str]]:
+    return {size: make_corpus(size, count) for size in SIZES}
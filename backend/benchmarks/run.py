@@ -0,0 +1,347 @@
+"""Benchmark every analysis stage on synthetic corpora and compare against a baseline.
+
+Usage (from `backend/`)::
+
+    python -m benchmarks.run --output bench.json              # record
+    python -m benchmarks.run --baseline bench.json            # compare, exit 1 on regression
+    python -m benchmarks.run --only model --only summarize    # subset (name prefixes)
+
+Each benchmark is timed in isolation (`--repeat` runs after one warm-up call)
+and reported as median / p95 / min milliseconds per call. End-to-end numbers go
+through the ASGI app in-process with the result cache disabled, so they
+measure real work rather than cache hits.
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import re
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from benchmarks.corpus import SIZES, corpora, make_corpus, make_urls
+
+# (name, setup) where setup() returns the zero-argument callable to time
+Benchmark = Tuple[str, Callable[[], Callable[[], object]]]
+BENCHMARKS: List[Benchmark] = []
+
+
+def benchmark(name: str):
+    def register(setup):
+        BENCHMARKS.append((name, setup))
+        return setup
+    return register
+
+
+_DOCS = corpora()
+
+
+def _per_size(prefix: str, make: Callable[[str], Callable[[], object]]) -> None:
+    for size in SIZES:
+        text = _DOCS[size][0]
+        benchmark(f"{prefix}/{size}")(lambda text=text: make(text))
+
+
+def _register_stages() -> None:
+    from app.credibility import check_source_credibility, check_source_credibility_batch
+    from app.explain import highlight_keywords
+    from app.model import NewsModel
+    from app.sentiment import analyze_sentiment
+    from app.summarizer import summarize_text, textrank
+
+    model = NewsModel()
+    _per_size("model.predict", lambda t: (lambda: model.predict(t)))
+    _per_size("summarize_text", lambda t: (lambda: summarize_text(t, sentences_k=3)))
+    _per_size("textrank", lambda t: (lambda s=[x for x in re.split(r'(?<=[.!?])\s+', t) if x]: textrank(s)))
+    _per_size("highlight_keywords", lambda t: (lambda: highlight_keywords(t)))
+    _per_size("analyze_sentiment", lambda t: (lambda: analyze_sentiment(t)))
+    from app.document import Document
+
+    # every per-text analyzer over one shared Document, as /analyze runs them
+    _per_size("document.all_analyzers", lambda t: (lambda: (
+        lambda d=Document(t): (model.predict(d), analyze_sentiment(d), highlight_keywords(d), summarize_text(d))
+    )()))
+    from app.extract import extract_text
+
+    def page(text: str) -> bytes:
+        nav = "".join(f'<li><a href="/s{i}">Section {i}</a></li>' for i in range(50))
+        body = "".join(f"<p>{s}</p>" for s in re.split(r"(?<=[.!?])\s+", text))
+        return (f"<html><head><title>t</title><script>{'x' * 5000}</script></head><body>"
+                f"<nav><ul>{nav}</ul></nav><article>{body}</article><footer>{nav}</footer></body></html>").encode()
+
+    _per_size("extract_text", lambda t: (lambda html=page(t): extract_text(html)))
+    try:
+        from app.sentiment_engine import get_engine
+        engine = get_engine()
+        _per_size("sentiment_engine", lambda t: (lambda: engine.polarity_of(t)))
+    except ImportError:
+        engine = None
+
+    mixed = corpora(50)
+    batch = mixed["tweet"] + mixed["article"]
+    benchmark("model.predict_batch/100-mixed")(lambda: (lambda: model.predict_batch(batch)))
+    if engine is not None:
+        benchmark("sentiment_engine.score_batch/100-mixed")(lambda: (lambda: engine.score_batch(batch)))
+
+    from app import longdoc
+
+    book = " ".join(mixed["article"]) * 4  # ~1.1M chars
+    benchmark("longdoc.analyze_long/book")(lambda: (lambda: longdoc.analyze_long(book, model)))
+    benchmark("longdoc.iter_highlighted/book")(lambda: (lambda: sum(map(len, longdoc.iter_highlighted(book)))))
+
+    urls = make_urls(1000)
+    benchmark("check_source_credibility/1000-urls")(
+        lambda: (lambda: [check_source_credibility(u) for u in urls])
+    )
+    benchmark("check_source_credibility_batch/1000-urls")(
+        lambda: (lambda: check_source_credibility_batch(urls))
+    )
+
+
+def _register_classifier() -> None:
+    """Linear classifier vs the placeholder rules on the same batches."""
+    from app.model import NewsModel
+
+    train_docs = corpora(400)
+    tweets = make_corpus("tweet", 1000, seed=99)
+    articles = make_corpus("article", 100, seed=99)
+    models: Dict[str, NewsModel] = {}
+
+    def linear() -> NewsModel:
+        if "linear" not in models:
+            from app.classifier import train
+
+            texts = train_docs["tweet"] + train_docs["article"]
+            # synthetic labels: the corpus has no ground truth, any separable rule will do
+            labels = np.array([int(sum(w in t.lower() for w in ("shocking", "miracle", "secret")) == 0) for t in texts])
+            out = Path(tempfile.mkdtemp()) / "bench-linear"
+            train(texts, labels, str(out))
+            models["linear"] = NewsModel(model_name=str(out))
+        return models["linear"]
+
+    for name, make in (("placeholder", NewsModel), ("linear", linear)):
+        benchmark(f"model.predict_batch/1000-tweets/{name}")(lambda make=make: (lambda m=make(): m.predict_batch(tweets)))
+        benchmark(f"model.predict_batch/100-articles/{name}")(lambda make=make: (lambda m=make(): m.predict_batch(articles)))
+        benchmark(f"model.predict/article/{name}")(lambda make=make: (lambda m=make(): m.predict(articles[0])))
+
+
+def _register_neardup() -> None:
+    """MinHash signatures per document size, and LSH insert/query at scale
+    (NEAR_DUP_BENCH_DOCS random signatures, default one million)."""
+    from app.neardup import NUM_PERM, MinHashLSH, minhash
+
+    _per_size("neardup.minhash", lambda t: (lambda: minhash(t)))
+    n = int(os.environ.get("NEAR_DUP_BENCH_DOCS", "1000000"))
+    label = f"{n // 1000000}M" if n % 1000000 == 0 else str(n)
+    rng = np.random.default_rng(7)
+    state: Dict[str, object] = {}
+
+    def signatures() -> np.ndarray:
+        if "sigs" not in state:
+            state["sigs"] = rng.integers(0, 2 ** 16, (n, NUM_PERM), dtype=np.uint16)
+        return state["sigs"]
+
+    def index() -> MinHashLSH:
+        if "lsh" not in state:
+            state["lsh"] = MinHashLSH()
+            state["lsh"].add_many(signatures())
+        return state["lsh"]
+
+    def query():
+        lsh, sigs = index(), signatures()
+        probes = sigs[rng.integers(0, n, 1000)].copy()
+        probes[:, :6] ^= 1  # near duplicates, ~90% similar
+        it = iter(range(10 ** 9))
+        return lambda: lsh.query(probes[next(it) % len(probes)])
+
+    def insert():
+        lsh = index()
+        fresh = rng.integers(0, 2 ** 16, (100000, NUM_PERM), dtype=np.uint16)
+        it = iter(range(10 ** 9))
+        return lambda: lsh.add(fresh[next(it) % len(fresh)])
+
+    benchmark(f"neardup.add_many/{label}")(lambda: (lambda: MinHashLSH().add_many(signatures())))
+    benchmark(f"neardup.query/{label}")(query)
+    benchmark(f"neardup.add/{label}")(insert)
+
+
+def _register_db() -> None:
+    from app import db
+
+    def with_temp_db(make):
+        def setup():
+            db.DB_PATH = Path(tempfile.mkdtemp()) / "bench.db"
+            db.init_db()
+            return make()
+        return setup
+
+    counter = iter(range(10**9))
+    benchmark("db.add_vote")(with_temp_db(lambda: (lambda: db.add_vote(f"item-{next(counter) % 500}", 1))))
+    benchmark("db.get_score")(with_temp_db(lambda: (db.add_vote("hot", 1), lambda: db.get_score("hot"))[1]))
+    benchmark("db.add_subscription")(with_temp_db(lambda: (lambda: db.add_subscription("email", "a@example.com"))))
+
+    def subscriptions():
+        for i in range(1000):
+            db.add_subscription("email", f"user{i}@example.com")
+        return lambda: db.get_subscriptions()
+    benchmark("db.get_subscriptions/1000")(with_temp_db(subscriptions))
+    benchmark("db.count_subscriptions/1000")(with_temp_db(lambda: (subscriptions(), db.count_subscriptions)[1]))
+    def leaderboard():
+        from app.leaderboard import LEADERBOARD
+
+        # 100k items over a few batches; reads should not depend on the count
+        for start in range(0, 100000, 10000):
+            db.add_votes({f"item-{i}": (i * 7919) % 1000 - 500 for i in range(start, start + 10000)})
+        LEADERBOARD.load()
+        return lambda: (LEADERBOARD.ranking(10), LEADERBOARD.ranking(10, highest=False, window="24h"))
+    benchmark("leaderboard.ranking/100k")(with_temp_db(leaderboard))
+    benchmark("db.iter_subscriptions/1000")(with_temp_db(lambda: (subscriptions(), lambda: sum(1 for _ in db.iter_subscriptions()))[1]))
+
+
+def _register_e2e() -> None:
+    def setup(path: str, size: str):
+        def make():
+            from fastapi.testclient import TestClient
+            from app.cache import RESULT_CACHE
+            from app.main import app
+
+            RESULT_CACHE.enabled = False
+            client = TestClient(app)
+            payload = {"text": _DOCS[size][0]}
+            return lambda: client.post(path, json=payload).raise_for_status()
+        return make
+
+    for path in ("/analyze", "/summarize", "/bias"):
+        for size in SIZES:
+            benchmark(f"e2e{path}/{size}")(setup(path, size))
+
+
+def time_call(fn: Callable[[], object], repeat: int, max_seconds: float) -> Dict[str, float]:
+    fn()  # warm-up (imports, lazy initialisation)
+    samples = []
+    deadline = time.perf_counter() + max_seconds
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000.0)
+        if time.perf_counter() > deadline and len(samples) >= 3:
+            break
+    samples.sort()
+    p95 = samples[min(len(samples) - 1, int(round(0.95 * (len(samples) - 1))))]
+    return {
+        "median_ms": round(statistics.median(samples), 4),
+        "p95_ms": round(p95, 4),
+        "min_ms": round(samples[0], 4),
+        "runs": len(samples),
+    }
+
+
+def run(only: Optional[List[str]] = None, repeat: int = 20, max_seconds: float = 5.0) -> Dict[str, Dict[str, float]]:
+    results = {}
+    for name, setup in BENCHMARKS:
+        if only and not any(name.startswith(prefix) for prefix in only):
+            continue
+        results[name] = time_call(setup(), repeat, max_seconds)
+        r = results[name]
+        print(f"{name:45s} median {r['median_ms']:10.3f} ms   p95 {r['p95_ms']:10.3f} ms   ({r['runs']} runs)",
+              file=sys.stderr)
+    return results
+
+
+def compare(current: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]],
+            threshold: float) -> List[Dict[str, object]]:
+    """Return benchmarks whose median got slower than baseline by more than `threshold` (0.2 = 20%)."""
+    regressions = []
+    for name, cur in current.items():
+        base = baseline.get(name)
+        if not base or not base.get("median_ms"):
+            continue
+        ratio = cur["median_ms"] / base["median_ms"]
+        if ratio > 1.0 + threshold:
+            regressions.append({
+                "name": name,
+                "baseline_ms": base["median_ms"],
+                "current_ms": cur["median_ms"],
+                "slowdown": round(ratio, 3),
+            })
+    return regressions
+
+
+def _meta() -> Dict[str, str]:
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpus": str(os.cpu_count()),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def _register_startup() -> None:
+    import subprocess
+
+    # a fresh interpreter each call: what a cold container pays before serving
+    cmd = [sys.executable, "-c", "import app.main"]
+    benchmark("startup/import-app.main")(lambda: (lambda: subprocess.run(cmd, check=True)))
+
+
+def register_all() -> None:
+    if BENCHMARKS:
+        return
+    _register_stages()
+    _register_classifier()
+    _register_neardup()
+    _register_db()
+    _register_e2e()
+    _register_startup()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    p = argparse.ArgumentParser(prog="python -m benchmarks.run", description=__doc__.splitlines()[0])
+    p.add_argument("--output", help="write results as JSON to this file")
+    p.add_argument("--baseline", help="compare against a previous --output file")
+    p.add_argument("--threshold", type=float, default=0.25, help="allowed median slowdown (default 0.25 = 25%%)")
+    p.add_argument("--only", action="append", help="run benchmarks whose name starts with this prefix")
+    p.add_argument("--repeat", type=int, default=20)
+    p.add_argument("--max-seconds", type=float, default=5.0, help="time budget per benchmark")
+    p.add_argument("--list", action="store_true", help="list benchmark names and exit")
+    args = p.parse_args(argv)
+
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    # never benchmark against (or modify) the real demo.db
+    from app import db
+
+    db.DB_PATH = Path(tempfile.mkdtemp()) / "bench.db"
+    register_all()
+    if args.list:
+        for name, _ in BENCHMARKS:
+            print(name)
+        return 0
+
+    results = run(args.only, args.repeat, args.max_seconds)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            json.dump({"meta": _meta(), "results": results}, fh, indent=2, sort_keys=True)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as fh:
+            baseline = json.load(fh)["results"]
+        regressions = compare(results, baseline, args.threshold)
+        for r in regressions:
+            print(f"REGRESSION {r['name']}: {r['baseline_ms']} ms -> {r['current_ms']} ms (x{r['slowdown']})",
+                  file=sys.stderr)
+        if regressions:
+            return 1
+        print(f"No regressions beyond {args.threshold:.0%} against {args.baseline}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
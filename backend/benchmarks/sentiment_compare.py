@@ -0,0 +1,151 @@
+"""Compare the built-in lexicon sentiment engine against TextBlob.
+
+Usage (from `backend/`)::
+
+    python -m benchmarks.sentiment_compare                       # synthetic corpora
+    python -m benchmarks.sentiment_compare --input dump.jsonl    # real texts (JSONL/CSV/TXT)
+    python -m benchmarks.sentiment_compare --export-lexicon app/lexicons/polarity.tsv
+
+Reports polarity error (mean / max absolute difference, correlation), how
+often the two engines agree on the tone bucket and on the sign, the worst
+disagreements, and the time each engine takes over the whole input.
+`--export-lexicon` rebuilds the shipped polarity lexicon from TextBlob's.
+"""
+import argparse
+import csv
+import json
+import sys
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from benchmarks.corpus import SIZES, make_corpus
+
+SAMPLES = [
+    "The new hospital is a great help for the community.",
+    "Officials said the results were not good.",
+    "This is a terrible, awful decision!",
+    "Researchers were very happy with the excellent data.",
+    "The committee did not find anything really bad.",
+    "Residents are sad about the budget cuts, but the outlook is good!!",
+]
+
+
+def _tone(p: float) -> str:
+    return "Positive" if p > 0.2 else "Negative" if p < -0.2 else "Neutral"
+
+
+def load_texts(path: str, text_field: str = "text", limit: Optional[int] = None) -> List[str]:
+    texts: List[str] = []
+    with open(path, encoding="utf-8", newline="") as f:
+        if path.lower().endswith((".csv", ".tsv")):
+            delimiter = "\t" if path.lower().endswith(".tsv") else ","
+            texts = [row.get(text_field) or "" for row in csv.DictReader(f, delimiter=delimiter)]
+        elif path.lower().endswith((".jsonl", ".ndjson")):
+            texts = [json.loads(line).get(text_field) or "" for line in f if line.strip()]
+        else:
+            texts = [line.strip() for line in f if line.strip()]
+    texts = [t for t in texts if t]
+    return texts[:limit] if limit else texts
+
+
+def default_texts(count: int = 200) -> List[str]:
+    texts = list(SAMPLES)
+    for size in SIZES:
+        texts += make_corpus(size, count if size == "tweet" else max(1, count // 20))
+    return texts
+
+
+def compare(texts: List[str]) -> Dict[str, object]:
+    from textblob import TextBlob
+
+    from app.sentiment_engine import get_engine
+
+    engine = get_engine()
+    started = time.perf_counter()
+    reference = np.array([TextBlob(t).sentiment.polarity for t in texts])
+    textblob_s = time.perf_counter() - started
+    started = time.perf_counter()
+    ours = engine.score_batch(texts)
+    lexicon_s = time.perf_counter() - started
+
+    diff = np.abs(ours - reference)
+    corr = float(np.corrcoef(ours, reference)[0, 1]) if len(texts) > 1 and reference.std() and ours.std() else 1.0
+    worst = np.argsort(-diff)[:5]
+    return {
+        "texts": len(texts),
+        "mean_abs_error": round(float(diff.mean()), 4),
+        "max_abs_error": round(float(diff.max()), 4),
+        "correlation": round(corr, 4),
+        "tone_agreement": round(float(np.mean([_tone(a) == _tone(b) for a, b in zip(ours, reference)])), 4),
+        "sign_agreement": round(float(np.mean(np.sign(np.round(ours, 3)) == np.sign(np.round(reference, 3)))), 4),
+        "textblob_seconds": round(textblob_s, 4),
+        "lexicon_seconds": round(lexicon_s, 4),
+        "speedup": round(textblob_s / lexicon_s, 1) if lexicon_s else None,
+        "worst": [
+            {"text": texts[i][:120], "textblob": round(float(reference[i]), 3), "lexicon": round(float(ours[i]), 3)}
+            for i in worst if diff[i] > 0
+        ],
+    }
+
+
+def export_lexicon(out_path: str) -> int:
+    """Write TextBlob's loaded English sentiment lexicon in the polarity.tsv
+    format: per-term scores averaged over senses and parts of speech, plus the
+    "-ly" adverbs TextBlob derives from adjectives at load time."""
+    from textblob.en import sentiment
+
+    len(sentiment)  # the lexicon is loaded lazily, on first access
+    rows = []
+    for term, by_pos in sorted(dict.items(sentiment)):
+        if " " in term:
+            continue  # multi-word forms never match a single token
+        polarity, _, intensity = by_pos[None]
+        rows.append(f"{term}\t{round(polarity, 4):g}\t{round(intensity, 4):g}\t{int('RB' in by_pos)}\n")
+    with open(out_path, "w", encoding="utf-8") as f:
+        f.write(
+            "# Polarity lexicon for the built-in sentiment engine (app/sentiment_engine.py).\n"
+            "# Exported from TextBlob's English sentiment lexicon (pattern en-sentiment.xml, PDDL)\n"
+            "# with `python -m benchmarks.sentiment_compare --export-lexicon`.\n"
+            "# Columns (tab-separated): term, polarity (-1..1), intensity (multiplier applied\n"
+            "# to the next word when the term is a modifier), modifier (1 = adverb like 'very').\n"
+            "# Blank lines and lines starting with '#' are ignored.\n"
+        )
+        f.writelines(rows)
+    return len(rows)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    p.add_argument("--input", help="JSONL/CSV/TSV with a text field, or plain text (one per line)")
+    p.add_argument("--text-field", default="text")
+    p.add_argument("--limit", type=int, help="compare at most this many texts")
+    p.add_argument("--output", help="also write the report as JSON here")
+    p.add_argument("--export-lexicon", metavar="PATH", help="rebuild polarity.tsv from TextBlob's lexicon and exit")
+    return p
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.export_lexicon:
+        n = export_lexicon(args.export_lexicon)
+        print(f"wrote {n} terms to {args.export_lexicon}")
+        return 0
+    texts = load_texts(args.input, args.text_field, args.limit) if args.input else default_texts()
+    if args.limit:
+        texts = texts[:args.limit]
+    report = compare(texts)
+    for key, value in report.items():
+        if key != "worst":
+            print(f"{key:>18}: {value}")
+    for w in report["worst"]:
+        print(f"  textblob={w['textblob']:+.3f} lexicon={w['lexicon']:+.3f}  {w['text']!r}")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,23 @@
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from app import db
+from app.neardup import NEAR_DUPS
+
+# Point the app at a throwaway SQLite file before any test touches the
+# database (the schema is created on first use), so tests never touch demo.db.
+_TMP_DIR = tempfile.TemporaryDirectory()
+db.DB_PATH = Path(_TMP_DIR.name) / "test.db"
+
+
+@pytest.fixture
+def fresh_db(tmp_path, monkeypatch):
+    """An empty app database for one test. The near-duplicate index is
+    rebuilt from whichever database is current on its next use."""
+    monkeypatch.setattr(db, "DB_PATH", tmp_path / "app.db")
+    db.init_db()
+    NEAR_DUPS.reset()
+    yield tmp_path
+    NEAR_DUPS.reset()
@@ -1,3 +1,5 @@
+import json
+
 from fastapi.testclient import TestClient
 from app.main import app
 
@@ -14,3 +16,55 @@ def test_admin_votes_and_subscriptions():
     assert r2.status_code == 200
     d2 = r2.json()
     assert 'subscriptions' in d2 and 'count' in d2
+
+
+def test_admin_votes_paginate_and_export():
+    for i in range(5):
+        client.post('/community/vote', json={'item_id': f'admin-page-{i}', 'vote': i + 1})
+    r = client.get('/admin/votes', params={'limit': 2})
+    assert r.status_code == 200
+    data = r.json()
+    assert len(data['votes']) == 2 and data['next_cursor']
+    assert data['count'] >= 5
+    nxt = client.get('/admin/votes', params={'limit': 2, 'cursor': data['next_cursor']}).json()
+    assert not set(nxt['votes']) & set(data['votes'])
+
+    assert client.get('/admin/votes', params={'cursor': 'not-a-cursor'}).status_code == 400
+    assert client.get('/admin/votes', params={'limit': 0}).status_code == 400
+
+    csv_export = client.get('/admin/votes/export')
+    assert csv_export.headers['content-type'].startswith('text/csv')
+    lines = csv_export.text.strip().splitlines()
+    assert lines[0] == 'item_id,score' and len(lines) == data['count'] + 1
+
+    ndjson_export = client.get('/admin/votes/export', params={'format': 'ndjson'})
+    rows = [json.loads(line) for line in ndjson_export.text.splitlines()]
+    assert len(rows) == data['count'] and set(rows[0]) == {'item_id', 'score'}
+    assert client.get('/admin/votes/export', params={'format': 'xml'}).status_code == 400
+
+
+def test_admin_subscriptions_count_and_export():
+    client.post('/subscribe', json={'channel': 'email', 'address': 'export@example.com'})
+    data = client.get('/admin/subscriptions', params={'limit': 1}).json()
+    assert len(data['subscriptions']) == 1 and data['count'] >= 1
+    lines = client.get('/admin/subscriptions/export').text.strip().splitlines()
+    assert lines[0] == 'id,channel,address,created_at' and len(lines) == data['count'] + 1
+
+
+def test_admin_rejects_malformed_cursors():
+    from app.db import encode_cursor
+
+    bad = [
+        encode_cursor(({'a': 1}, 2)),
+        encode_cursor((1,)),
+        encode_cursor((1, 'item', 3)),
+        encode_cursor(('7', 'item')),
+        encode_cursor((True, 'item')),
+        encode_cursor((2 ** 70, 'item')),
+        encode_cursor((1, None)),
+    ]
+    for cursor in bad:
+        assert client.get('/admin/votes', params={'cursor': cursor}).status_code == 400, cursor
+    assert client.get('/admin/subscriptions', params={'cursor': encode_cursor((5, 'x'))}).status_code == 400
+    good = client.get('/admin/subscriptions', params={'cursor': encode_cursor(('9999-12-31 00:00:00', 1))})
+    assert good.status_code == 200
@@ -0,0 +1,74 @@
+import json
+
+import numpy as np
+import pytest
+
+from app.batch_score import main, load_checkpoint, save_checkpoint
+
+
+def _write_jsonl(path, n):
+    with open(path, "w") as fh:
+        for i in range(n):
+            fh.write(json.dumps({"id": f"a{i}", "text": f"Article {i}. A shocking miracle cure was exposed."}) + "\n")
+        fh.write(json.dumps({"id": "blank", "text": ""}) + "\n")
+
+
+def test_scores_jsonl_in_order(tmp_path):
+    src, dst = tmp_path / "in.jsonl", tmp_path / "out.jsonl"
+    _write_jsonl(src, 7)
+    main([str(src), str(dst), "--chunk-size", "3", "--workers", "2"])
+    rows = [json.loads(line) for line in dst.read_text().splitlines()]
+    assert [r["row"] for r in rows] == list(range(8))
+    assert rows[0]["label"] == "Fake" and "summary" in rows[0]
+    assert "error" in rows[-1]
+    assert load_checkpoint(str(dst) + ".ckpt")["rows_done"] == 8
+
+
+def test_resume_continues_from_checkpoint(tmp_path):
+    src, full, partial = tmp_path / "in.jsonl", tmp_path / "full.csv", tmp_path / "partial.csv"
+    _write_jsonl(src, 9)
+    main([str(src), str(full), "--chunk-size", "4", "--workers", "1"])
+
+    # simulate a crash after the first chunk: keep the header + 4 rows plus some garbage
+    lines = full.read_bytes().split(b"\r\n")
+    head = b"\r\n".join(lines[:5]) + b"\r\n"
+    partial.write_bytes(head + b"half-written row")
+    save_checkpoint(str(partial) + ".ckpt", {"input": str(src.resolve()), "rows_done": 4, "output_bytes": len(head)})
+
+    main([str(src), str(partial), "--chunk-size", "4", "--workers", "1", "--resume"])
+    assert partial.read_bytes() == full.read_bytes()
+
+
+def test_scores_with_the_configured_model(tmp_path, monkeypatch):
+    import pytest
+
+    from app import classifier
+    from app.model import NewsModel
+
+    texts = ["officials said the council published the budget report"] * 10 + ["shocking secret miracle cure"] * 10
+    artifact = tmp_path / "news-linear"
+    classifier.train(texts, np.array([1] * 10 + [0] * 10, dtype=np.int8), str(artifact), n_features=2 ** 12)
+    monkeypatch.setenv("NEWS_MODEL", str(artifact))
+    src, dst = tmp_path / "in.jsonl", tmp_path / "out.jsonl"
+    _write_jsonl(src, 3)
+    main([str(src), str(dst), "--workers", "1"])
+    rows = [json.loads(line) for line in dst.read_text().splitlines()]
+    served = NewsModel(str(artifact))
+    assert {r["model"] for r in rows} == {str(artifact)}
+    assert {r["model_version"] for r in rows} == {served.version}
+    assert rows[0]["confidence"] == served.predict(json.loads(src.read_text().splitlines()[0])["text"])["confidence"]
+
+    with pytest.raises(SystemExit):
+        main([str(src), str(dst), "--model", str(tmp_path / "missing")])
+
+
+def test_resume_refuses_a_checkpoint_for_another_input(tmp_path):
+    src, other, dst = tmp_path / "in.jsonl", tmp_path / "other.jsonl", tmp_path / "out.jsonl"
+    _write_jsonl(src, 5)
+    _write_jsonl(other, 5)
+    main([str(src), str(dst), "--chunk-size", "2", "--workers", "1"])
+    scored = dst.read_bytes()
+
+    with pytest.raises(SystemExit, match="belongs to input"):
+        main([str(other), str(dst), "--workers", "1", "--resume"])
+    assert dst.read_bytes() == scored  # nothing truncated
@@ -0,0 +1,20 @@
+from benchmarks.corpus import make_corpus
+from benchmarks.run import compare, time_call
+
+
+def test_corpus_is_deterministic_and_sized():
+    assert make_corpus("article", 2) == make_corpus("article", 2)
+    long_doc = make_corpus("long")[0]
+    assert long_doc.count(".") + long_doc.count("!") + long_doc.count("?") >= 1000
+
+
+def test_compare_flags_only_slowdowns_beyond_threshold():
+    baseline = {"a": {"median_ms": 10.0}, "b": {"median_ms": 10.0}, "gone": {"median_ms": 1.0}}
+    current = {"a": {"median_ms": 12.0}, "b": {"median_ms": 14.0}, "new": {"median_ms": 5.0}}
+    regressions = compare(current, baseline, threshold=0.25)
+    assert [r["name"] for r in regressions] == ["b"]
+
+
+def test_time_call_reports_stats():
+    stats = time_call(lambda: sum(range(100)), repeat=5, max_seconds=1)
+    assert stats["runs"] == 5 and stats["min_ms"] <= stats["median_ms"] <= stats["p95_ms"]
@@ -0,0 +1,126 @@
+from fastapi.testclient import TestClient
+
+from app.cache import ResultCache, RESULT_CACHE
+from app.main import app
+
+client = TestClient(app)
+
+
+def test_memory_tier_ttl_and_size_eviction():
+    cache = ResultCache(ttl=60, max_entries=2)
+    keys = [cache.key("analyze", "v1", text=t) for t in ("a", "b", "c")]
+    for k in keys:
+        cache.set(k, {"k": k})
+    assert cache.get(keys[0]) is None  # evicted (LRU, max 2 entries)
+    assert cache.get(keys[2]) == {"k": keys[2]}
+    assert cache.stats()["evictions"] == 1
+
+    expired = ResultCache(ttl=-1)
+    k = expired.key("bias", "v1", text="x")
+    expired.set(k, {"x": 1})
+    assert expired.get(k) is None
+
+
+def test_normalized_text_and_version_invalidation():
+    cache = ResultCache()
+    k1 = cache.key("analyze", "v1", text="Same story\r\n")
+    assert k1 == cache.key("analyze", "v1", text="  Same story")
+    cache.set(k1, {"label": "Fake"})
+    k2 = cache.key("analyze", "v2", text="Same story")
+    assert k2 != k1 and cache.get(k1) is None
+    assert cache.stats()["invalidations"] == 1
+
+
+def test_sqlite_tier_survives_restart(tmp_path):
+    path = str(tmp_path / "cache.db")
+    first = ResultCache(db_path=path)
+    key = first.key("analyze", "v1", url="https://example.com/a")
+    first.set(key, {"label": "Real"})
+
+    second = ResultCache(db_path=path)
+    key2 = second.key("analyze", "v1", url="https://example.com/a")
+    assert second.get(key2) == {"label": "Real"}
+    assert second.stats()["disk_hits"] == 1
+
+
+def test_analyze_hits_cache_on_repeat():
+    RESULT_CACHE.clear()
+    before = RESULT_CACHE.stats()["hits"]
+    payload = {"text": "Repeat viral story about a miracle cure."}
+    first = client.post("/analyze", json=payload).json()
+    second = client.post("/analyze", json=payload).json()
+    assert first == second
+    assert RESULT_CACHE.stats()["hits"] == before + 1
+
+
+def test_versions_are_per_namespace():
+    cache = ResultCache()
+    bias = cache.key("bias", "s1", text="x")
+    cache.set(bias, {"label": "Neutral"})
+    analyze = cache.key("analyze", "m1:r1", text="x")
+    cache.set(analyze, {"label": "Fake"})
+    cache.key("analyze", "m1:r2", text="x")  # e.g. a reputation edit
+    assert cache.get(bias) == {"label": "Neutral"} and cache.get(analyze) is None
+
+
+def test_reputation_edits_only_invalidate_analyses(monkeypatch):
+    from app import main
+    from app.credibility import DomainReputation, ReputationIndex, parse_rules
+
+    namespaces = ("analyze", "analyze:long", "bias", "summarize:textrank")
+    before = {ns: main._cache_version(ns) for ns in namespaces}
+    verdict = main._verdict_version()
+    edited = DomainReputation(None)
+    edited._index = ReputationIndex(parse_rules(["bbc.com 0.1"]))
+    monkeypatch.setattr(main, "REPUTATION", edited)
+
+    after = {ns: main._cache_version(ns) for ns in namespaces}
+    assert after["analyze"] != before["analyze"] and after["analyze:long"] != before["analyze:long"]
+    assert after["bias"] == before["bias"] and after["summarize:textrank"] == before["summarize:textrank"]
+    assert main._verdict_version() == verdict  # stored near-duplicate verdicts stay reusable
+
+
+def test_sqlite_tier_stays_off_the_event_loop(tmp_path, monkeypatch):
+    import asyncio
+
+    from app import main
+
+    cache = ResultCache(db_path=str(tmp_path / "cache.db"))
+    calls = []
+
+    class Recorder:
+        def __getattr__(self, name):
+            return getattr(cache, name)
+
+        def _record(self, method, *args):
+            try:
+                asyncio.get_running_loop()
+                calls.append((method.__name__, "event loop"))
+            except RuntimeError:
+                calls.append((method.__name__, "thread"))
+            return method(*args)
+
+        def get(self, key):
+            return self._record(cache.get, key)
+
+        def set(self, key, value):
+            return self._record(cache.set, key, value)
+
+    monkeypatch.setattr(main, "RESULT_CACHE", Recorder())
+    payload = {"text": "A calm and ordinary council report about road repairs."}
+    assert client.post("/bias", json=payload).json() == client.post("/bias", json=payload).json()
+    assert calls and all(where == "thread" for _, where in calls)
+    assert cache.stats()["hits"] == 1
+
+
+def test_version_change_purges_disk_lazily(tmp_path):
+    import sqlite3
+
+    path = str(tmp_path / "cache.db")
+    cache = ResultCache(db_path=path)
+    old = cache.key("analyze", "v1", text="x")
+    cache.set(old, {"label": "Real"})
+    new = cache.key("analyze", "v2", text="x")  # no disk write here
+    assert sqlite3.connect(path).execute("SELECT COUNT(*) FROM results").fetchone()[0] == 1
+    assert cache.get(new) is None
+    assert sqlite3.connect(path).execute("SELECT COUNT(*) FROM results").fetchone()[0] == 0
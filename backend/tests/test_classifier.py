@@ -0,0 +1,72 @@
+import csv
+import random
+
+import numpy as np
+import pytest
+
+from app import classifier
+from app.model import NewsModel
+
+REAL = "officials said the council published the annual budget report and survey results".split()
+FAKE = "shocking secret miracle cure exposed overnight unbelievable exclusive".split()
+
+
+def _write_csv(path, n=200, seed=5):
+    rng = random.Random(seed)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(["text", "label"])
+        for i in range(n):
+            fake = i % 2
+            words = [rng.choice(FAKE if fake and rng.random() < 0.4 else REAL) for _ in range(20)]
+            w.writerow([" ".join(words), "fake" if fake else "Real"])
+    return path
+
+
+@pytest.fixture
+def artifact(tmp_path):
+    texts, labels = classifier.read_labeled_csv(str(_write_csv(tmp_path / "train.csv")))
+    out = tmp_path / "news-linear"
+    meta = classifier.train(texts, labels, str(out), n_features=2 ** 16)
+    assert meta["report"]["holdout_accuracy"] > 0.9
+    return out
+
+
+def test_trained_model_loads_memory_mapped_and_scores(artifact):
+    model = NewsModel(model_name=str(artifact))
+    assert isinstance(model.classifier.coef, np.memmap)
+    assert model.version == model.classifier.version
+    real = model.predict("The council published the annual budget report, officials said.")
+    fake = model.predict("Shocking secret miracle cure exposed overnight!")
+    assert real["label"] == "Real" and fake["label"] == "Fake"
+    assert real["probabilities"] == [pytest.approx(1 - real["confidence"]), real["confidence"]]
+
+
+def test_batch_matches_single_predictions(artifact):
+    model = NewsModel(model_name=str(artifact))
+    texts = ["Officials said the survey results", "", "miracle cure secret", "budget report exposed"]
+    batch = model.predict_batch(texts)
+    for text, out in zip(texts, batch):
+        assert out["confidence"] == pytest.approx(model.predict(text)["confidence"])
+
+
+def test_model_name_resolves_under_model_dir(artifact, monkeypatch):
+    monkeypatch.setattr(classifier, "MODEL_DIR", str(artifact.parent))
+    assert NewsModel(model_name="news-linear").classifier is not None
+    missing = NewsModel(model_name="no-such-model")
+    assert missing.classifier is None and missing.name == "placeholder-rule-model"
+
+
+def test_cli_trains_and_evaluates(tmp_path, capsys):
+    data = _write_csv(tmp_path / "train.csv", n=60)
+    out = tmp_path / "cli-model"
+    assert classifier.main(["train", str(data), "--out", str(out), "--n-features", "4096"]) == 0
+    assert classifier.main(["evaluate", str(data), "--model", str(out)]) == 0
+    assert "accuracy" in capsys.readouterr().out
+
+
+def test_bad_label_is_rejected(tmp_path):
+    path = tmp_path / "bad.csv"
+    path.write_text("text,label\nsome text,maybe\n", encoding="utf-8")
+    with pytest.raises(ValueError, match="unknown label"):
+        classifier.read_labeled_csv(str(path))
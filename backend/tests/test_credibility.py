@@ -0,0 +1,95 @@
+import os
+import socket
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import credibility
+from app.credibility import DomainReputation, ReputationIndex, Rule, parse_rules
+
+
+def test_most_specific_rule_wins():
+    index = ReputationIndex(parse_rules([
+        "# comment",
+        "example.com\t0.3",
+        "=news.example.com 0.8",
+        "blog.example.com 0.5  # subdomain rule",
+        "co.uk 0.4",
+    ]))
+    assert index.lookup("example.com").score == 0.3
+    assert index.lookup("www.example.com").score == 0.3
+    assert index.lookup("news.example.com").score == 0.8
+    assert index.lookup("a.news.example.com").score == 0.3  # '=' is exact only
+    assert index.lookup("x.blog.example.com").score == 0.5
+    assert index.lookup("EXAMPLE.COM.").score == 0.3
+    assert index.lookup("other.org") is None
+    assert index.lookup("") is None
+
+
+def test_parse_rules_rejects_bad_lines():
+    with pytest.raises(ValueError):
+        parse_rules(["example.com"])
+    with pytest.raises(ValueError):
+        parse_rules(["example.com 1.5"])
+
+
+def test_reload_swaps_on_change_and_keeps_old_index_on_error(tmp_path):
+    path = tmp_path / "domains.tsv"
+    path.write_text("example.com\t0.9\n")
+    rep = DomainReputation(str(path), reload_interval=0)
+    assert rep.lookup("example.com").score == 0.9
+    old_version = rep.version
+
+    path.write_text("example.com\t0.1\nother.org\t0.8\n")
+    os.utime(path, ns=(1, 10**18))  # make sure the mtime moves
+    assert rep.lookup("example.com").score == 0.1
+    assert rep.lookup("other.org").score == 0.8
+    assert rep.version != old_version and rep.reloads == 2
+
+    path.write_text("broken line here\n")
+    os.utime(path, ns=(1, 2 * 10**18))
+    assert rep.lookup("other.org").score == 0.8
+    assert rep.stats()["reload_errors"] == 1
+
+
+def test_missing_file_uses_builtin_lists():
+    rep = DomainReputation("/nonexistent/domains.tsv")
+    assert rep.lookup("www.bbc.com") == Rule("bbc.com", 0.9, False)
+
+
+def test_check_source_credibility_and_batch(monkeypatch):
+    index = ReputationIndex(parse_rules(["bbc.com 0.9", "gossipbuzz.com 0.2", "=live.example.com 0.5"]))
+    rep = DomainReputation(None)
+    rep._index = index
+    monkeypatch.setattr(credibility, "REPUTATION", rep)
+
+    assert credibility.check_source_credibility("https://www.bbc.com/news/1") == {
+        "domain": "bbc.com", "score": 0.9, "status": "Trusted"}
+    assert credibility.check_source_credibility("") is None
+    results = credibility.check_source_credibility_batch([
+        "http://blog.gossipbuzz.com/x", "live.example.com/feed", "https://example.org", "",
+    ])
+    assert [r and r["status"] for r in results] == ["Unreliable", "Mixed", "Unknown", None]
+    assert results[1]["matched"] == "=live.example.com"
+
+
+def test_domain_extraction_stays_offline(monkeypatch):
+    pytest.importorskip("tldextract")
+
+    def no_network(*args, **kwargs):
+        raise AssertionError("network access attempted")
+
+    monkeypatch.setattr(socket, "create_connection", no_network)
+    monkeypatch.setattr(socket.socket, "connect", no_network)
+    extractor = credibility._make_extractor()
+    e = extractor("https://news.bbc.co.uk/story")
+    assert (e.domain, e.suffix) == ("bbc", "co.uk")
+
+
+def test_credibility_batch_endpoint():
+    from app.main import app
+
+    client = TestClient(app)
+    resp = client.post("/credibility/batch", json={"urls": ["https://www.reuters.com/a", "https://fake-news.net/b"]})
+    assert resp.status_code == 200
+    assert [r["status"] for r in resp.json()["results"]] == ["Trusted", "Unreliable"]
@@ -0,0 +1,56 @@
+import threading
+
+from app import db
+
+
+def test_concurrent_votes_are_not_lost():
+    def vote():
+        for _ in range(50):
+            db.add_vote("concurrent-item", 1)
+
+    threads = [threading.Thread(target=vote) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert db.get_score("concurrent-item") == 400
+    assert db.get_pool().stats()["created"] <= db.get_pool().size
+
+
+def test_add_vote_returns_new_score_and_uses_wal():
+    assert db.add_vote("upsert-item", 3) == 3
+    assert db.add_vote("upsert-item", -1) == 2
+    with db.connection() as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+
+def test_keyset_pages_cover_every_row_once():
+    for i in range(25):
+        db.add_vote(f"page-item-{i:02d}", i % 7)
+    seen, cursor = [], None
+    while True:
+        rows, cursor = db.get_votes(limit=4, cursor=cursor)
+        seen.extend(rows)
+        if cursor is None:
+            break
+    assert len(seen) == db.count_votes()
+    assert len({r["item_id"] for r in seen}) == len(seen)
+    keys = [(r["score"], r["item_id"]) for r in seen]
+    assert keys == sorted(keys, reverse=True)
+    assert list(db.iter_votes(batch_size=3)) == seen
+
+
+def test_subscription_pages_are_newest_first_and_use_index():
+    for i in range(12):
+        db.add_subscription("email", f"pager{i}@example.com")
+    first, cursor = db.get_subscriptions(limit=5)
+    second, _ = db.get_subscriptions(limit=5, cursor=cursor)
+    ids = [r["id"] for r in first + second]
+    assert ids == sorted(ids, reverse=True)  # same-second rows fall back to id order
+    assert db.count_subscriptions() == sum(1 for _ in db.iter_subscriptions(batch_size=4))
+    with db.connection() as conn:
+        plan = conn.execute(
+            "EXPLAIN QUERY PLAN " + db._SUBSCRIPTIONS_PAGE.format(where="WHERE (created_at, id) < (?, ?)"),
+            ("9999", 0, 5),
+        ).fetchall()
+    assert "idx_subscriptions_created_at" in " ".join(r[-1] for r in plan)
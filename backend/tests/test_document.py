@@ -0,0 +1,38 @@
+import re
+
+from app.document import Document
+from app.explain import highlight_keywords
+from app.model import NewsModel
+from app.sentiment import analyze_sentiment
+from app.summarizer import summarize_text
+
+TEXT = (
+    "  Shocking news!  Officials said the miracle cure isn't real.\n\n"
+    "Researchers were very happy?  The data, however, was great. Ünïcode wörds too...   "
+)
+
+
+def test_tokens_offsets_and_sentences():
+    doc = Document(TEXT)
+    assert doc.tokens == re.findall(r"\w+", TEXT.lower())
+    assert [TEXT[s:e].lower() for s, e in doc.offsets.tolist()] == doc.tokens
+    expected = [s.strip() for s in re.split(r"(?<=[.!?])\s+", TEXT) if s.strip()]
+    assert doc.sentence_texts == expected
+    assert doc.sentence_tokens == [re.findall(r"\w+", s.lower()) for s in expected]
+    assert doc.term_counts["the"] == 2 and list(doc.term_counts)[0] == "shocking"
+
+
+def test_analyzers_give_the_same_results_for_a_document():
+    doc = Document(TEXT)
+    model = NewsModel()
+    assert model.predict(doc) == model.predict(TEXT)
+    assert model.predict_batch([doc, Document("")]) == model.predict_batch([TEXT, ""])
+    assert highlight_keywords(doc) == highlight_keywords(TEXT)
+    assert analyze_sentiment(doc) == analyze_sentiment(TEXT)
+    assert summarize_text(doc, sentences_k=2) == summarize_text(TEXT, sentences_k=2)
+
+
+def test_empty_document():
+    doc = Document(None)
+    assert doc.tokens == [] and doc.sentences == [] and doc.n_words == 0
+    assert summarize_text(doc) == "" and highlight_keywords(doc) == ("", [])
@@ -0,0 +1,134 @@
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.extract import ArticleCache, extract_text, fetch_article, html_to_text
+
+PAGE = """<html><head><title>Big  story</title><script>var x = "hidden";</script></head>
+<body><header><a href="/">Home</a> <a href="/news">News</a></header>
+<nav><ul><li><a href="/a">Section A</a></li></ul></nav>
+<div class="cookie-banner">We use cookies to improve your experience on this website.</div>
+<article><header><h1>Officials confirm budget</h1></header>
+<p>The city council approved the annual budget on Tuesday after a long debate about schools and roads.</p>
+<p>Residents said the decision was <b>expected</b> and welcomed the new hospital funding for the region.</p>
+<div class="share-tools"><a href="#">Share this story on social media with your friends</a></div></article>
+<aside>Related: ten other stories you might like to read later on</aside>
+<footer>Copyright 2025 Example News. All rights reserved.</footer></body></html>"""
+
+
+def test_keeps_article_body_and_drops_boilerplate():
+    article = extract_text(PAGE.encode("utf-8"))
+    assert article.title == "Big story"
+    assert article.text.splitlines() == [
+        "Officials confirm budget",
+        "The city council approved the annual budget on Tuesday after a long debate about schools and roads.",
+        "Residents said the decision was expected and welcomed the new hospital funding for the region.",
+    ]
+
+
+def test_without_article_element_drops_link_lists_and_fragments():
+    page = (
+        "<body><div><a href=/1>Home</a> | <a href=/2>World</a> | <a href=/3>Sport</a></div>"
+        "<p>Officials in the region published the quarterly figures for the health program today.</p>"
+        "<p>Read more</p></body>"
+    )
+    assert html_to_text(page) == "Officials in the region published the quarterly figures for the health program today."
+    # short pages fall back to all visible text
+    assert html_to_text("<html><body><p>Hello world</p></body></html>") == "Hello world"
+
+
+def test_byte_cap_charset_and_malformed_markup():
+    article = extract_text([b"<p>", b"word " * 10000, b"</p>"], max_bytes=1000)
+    assert article.truncated and article.source_bytes == 1000
+    latin = '<meta charset="iso-8859-1"><p>Caf\xe9 owners reported record sales across the whole region.</p>'
+    assert "Café" in extract_text(latin.encode("latin-1")).text
+    assert html_to_text("<p>unclosed <p>second <br>line<div>tail") == "unclosed\nsecond\nline\ntail"
+
+
+BODY = (
+    "<p>The city council approved the annual budget on Tuesday after a long debate about schools and roads.</p>"
+    "<p>Residents said the decision was expected and welcomed the new hospital funding for the region.</p>"
+)
+
+
+@pytest.mark.parametrize("page", [
+    # WordPress and similar themes put these classes on the page and article wrappers
+    f'<html class="no-js"><body class="post-template-default single single-post has-sidebar">'
+    f'<article class="post-123 post type-post status-publish format-standard hentry tag-social">{BODY}</article>'
+    f'<div id="comments" class="comments-area"><p>First comment on this post, which says nothing useful at all.</p></div>'
+    f'</body></html>',
+    f'<body><article id="post-9" class="post has-comments entry">{BODY}</article></body>',
+    f'<body class="single-post"><div id="page" class="site with-sidebar"><div class="content-area">'
+    f'<main id="main" class="site-main">{BODY}</main></div>'
+    f'<div class="widget-area"><p>Popular posts this week that you might enjoy reading next.</p></div></div></body>',
+])
+def test_theme_classes_on_page_wrappers_never_drop_the_article(page):
+    assert html_to_text(page).splitlines() == [
+        "The city council approved the annual budget on Tuesday after a long debate about schools and roads.",
+        "Residents said the decision was expected and welcomed the new hospital funding for the region.",
+    ]
+
+
+def test_falls_back_to_unfiltered_text_when_markers_remove_everything():
+    page = f'<body><div class="social-post-container">{BODY}</div></body>'
+    assert "city council approved" in html_to_text(page)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    hits = 0
+
+    def do_GET(self):
+        type(self).hits += 1
+        if self.headers.get("If-None-Match") == '"v1"':
+            self.send_response(304)
+            self.end_headers()
+            return
+        body = PAGE.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("ETag", '"v1"')
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+
+
+def test_fetch_article_caches_and_revalidates(server):
+    cache = ArticleCache(ttl=60)
+    url = server + "/story"
+    first = asyncio.run(fetch_article(url, cache=cache))
+    assert first.etag == '"v1"' and "Officials confirm budget" in first.text
+    assert asyncio.run(fetch_article(url, cache=cache)) is first  # fresh: no request
+    assert _Handler.hits == 1
+
+    cache.ttl = 0  # stale: revalidate, server answers 304
+    again = asyncio.run(fetch_article(url, cache=cache))
+    assert again.text == first.text and _Handler.hits == 2
+    assert cache.stats()["revalidated"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_analyze_rejects_a_page_without_article_text(monkeypatch):
+    from fastapi.testclient import TestClient
+
+    from app import main
+    from app.extract import Article
+
+    async def empty(url):
+        return Article(url=url, text="")
+
+    monkeypatch.setattr(main, "fetch_article", empty)
+    r = TestClient(main.app).post("/analyze", json={"url": "https://example.com/empty-page"})
+    assert r.status_code == 400 and "no article text" in r.json()["detail"]
@@ -0,0 +1,89 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app import fact_api
+
+
+class _StandIn(BaseHTTPRequestHandler):
+    calls = 0
+
+    def do_GET(self):
+        type(self).calls += 1
+        time.sleep(0.2)
+        body = json.dumps({"articles": [
+            {"title": "Claim reviewed", "source": {"name": "LocalWire"}, "url": "http://local/1", "description": "d"},
+        ]}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stand_in():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _StandIn)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    original = fact_api.get_backend()
+    _StandIn.calls = 0
+    fact_api.set_backend(fact_api.NewsAPIBackend(url=f"http://127.0.0.1:{httpd.server_address[1]}/v2/everything",
+                                                 api_key="test"))
+    yield _StandIn
+    fact_api.set_backend(original)
+    httpd.shutdown()
+
+
+def test_concurrent_identical_queries_share_one_call(stand_in):
+    async def run():
+        first = await asyncio.gather(*(fact_api.search("miracle cure", limit=5) for _ in range(10)))
+        again = await fact_api.search("miracle cure", limit=5)
+        return first, again
+
+    first, again = asyncio.run(run())
+    assert stand_in.calls == 1
+    assert all(r == first[0] for r in first) and again == first[0]
+    assert first[0][0]["source"] == "LocalWire"
+
+
+def test_fact_check_endpoint_uses_backend():
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    original = fact_api.get_backend()
+    fact_api.set_backend(fact_api.StaticBackend([{"title": "Offline", "source": "S", "url": "u", "summary": ""}]))
+    try:
+        r = TestClient(app).post("/fact-check", json={"text": "Some claim"})
+        assert r.json()["results"][0]["title"] == "Offline"
+    finally:
+        fact_api.set_backend(original)
+
+
+def test_search_backend_is_abstract():
+    with pytest.raises(TypeError):
+        fact_api.SearchBackend()
+
+    class Incomplete(fact_api.SearchBackend):
+        name = "incomplete"
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_search_newsapi_still_works_but_warns(stand_in, monkeypatch):
+    monkeypatch.setattr(fact_api, "NEWSAPI_URL", fact_api.get_backend().url)
+    monkeypatch.setattr(fact_api, "NEWSAPI_KEY", "test")
+    with pytest.warns(DeprecationWarning):
+        results = fact_api.search_newsapi("claim", limit=1)
+    assert results == [{"title": "Claim reviewed", "source": "LocalWire", "url": "http://local/1", "summary": "d"}]
+
+    monkeypatch.setattr(fact_api, "NEWSAPI_KEY", None)
+    with pytest.warns(DeprecationWarning), pytest.raises(RuntimeError):
+        fact_api.search_newsapi("claim")
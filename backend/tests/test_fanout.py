@@ -0,0 +1,40 @@
+import asyncio
+import time
+
+from app import fanout
+
+
+def test_stages_run_concurrently_and_slow_stage_times_out():
+    stages = {
+        "a": lambda: (time.sleep(0.2), "a")[1],
+        "b": lambda: (time.sleep(0.2), "b")[1],
+        "slow": lambda: (time.sleep(1.0), "slow")[1],
+        "boom": lambda: 1 / 0,
+    }
+    started = time.perf_counter()
+    results, timed_out, failed = asyncio.run(
+        fanout.run_stages(stages, timeouts={"a": 1, "b": 1, "slow": 0.3, "boom": 1})
+    )
+    elapsed = time.perf_counter() - started
+    assert results == {"a": "a", "b": "b"}
+    assert timed_out == ["slow"] and failed == ["boom"]
+    assert elapsed < 0.6  # bounded by the slowest deadline, not the sum
+
+
+def test_analyze_fanout_mode_matches_sequential(monkeypatch):
+    from app import main
+
+    text = "Fan-out check: a shocking secret miracle cure from www.bbc.com."
+    sequential = main._run_pipeline(text, "https://www.bbc.com/news/1")
+    concurrent = asyncio.run(main._run_pipeline_fanout(text, "https://www.bbc.com/news/1"))
+    assert concurrent == sequential
+
+
+def test_analyze_fanout_returns_partial_results(monkeypatch):
+    from app import main
+
+    monkeypatch.setattr(main, "analyze_sentiment", lambda text: time.sleep(0.5))
+    monkeypatch.setenv("ANALYZE_TIMEOUT_SENTIMENT", "0.05")
+    out = asyncio.run(main._run_pipeline_fanout("Some text", ""))
+    assert out["partial"] is True and out["timed_out"] == ["sentiment"]
+    assert out["sentiment"] is None and out["label"] in ("Real", "Fake")
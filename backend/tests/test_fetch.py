@@ -0,0 +1,75 @@
+import asyncio
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.fetch import FetchError, Fetcher
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path == "/slow":
+            time.sleep(1)
+        if self.path == "/missing":
+            self.send_response(404)
+            self.end_headers()
+            return
+        body = b"x" * 4096 if self.path == "/big" else b"<html><body><p>Hello world</p></body></html>"
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        if self.path != "/big":
+            self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(scope="module")
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+
+
+def test_fetch_with_pooled_session(server):
+    async def run():
+        fetcher = Fetcher(timeout=2, max_bytes=1024)
+        await fetcher.start()
+        try:
+            results = await asyncio.gather(*(fetcher.fetch(server + "/ok") for _ in range(5)))
+        finally:
+            await fetcher.close()
+        return results
+
+    results = asyncio.run(run())
+    assert all("Hello world" in r.text for r in results)
+
+
+def test_fetch_limits(server):
+    fetcher = Fetcher(timeout=0.3, max_bytes=1024)
+    with pytest.raises(FetchError, match="larger than"):
+        asyncio.run(fetcher.fetch(server + "/big"))
+    with pytest.raises(FetchError, match="timed out"):
+        asyncio.run(fetcher.fetch(server + "/slow"))
+    with pytest.raises(FetchError, match="404"):
+        asyncio.run(fetcher.fetch(server + "/missing"))
+
+
+def test_analyze_url_via_local_server(server):
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    with TestClient(app) as client:
+        r = client.post("/analyze", json={"url": server + "/ok"})
+        assert r.status_code == 200, r.text
+        assert r.json()["raw_text"] == "Hello world"
+
+        r = client.post("/analyze/batch", json={"items": [{"url": server + "/missing"}, {"url": server + "/ok"}]})
+        results = r.json()["results"]
+        assert "error" in results[0] and results[1]["raw_text"] == "Hello world"
@@ -0,0 +1,166 @@
+import random
+import threading
+
+from fastapi.testclient import TestClient
+
+from app import db, leaderboard
+from app.leaderboard import LEADERBOARD, Leaderboard, RankedSlice
+from app.main import app
+
+client = TestClient(app)
+
+
+def _expected(scores, n, highest=True):
+    ranked = sorted(((s, k) for k, s in scores.items()), reverse=highest)
+    return [(k, s) for s, k in ranked[:n]]
+
+
+def test_ranked_slice_stays_exact_under_random_updates():
+    rng = random.Random(5)
+    scores = {}
+    top, bottom = RankedSlice(8, highest=True), RankedSlice(8, highest=False)
+    for _ in range(3000):
+        item = f"item-{rng.randrange(60)}"
+        scores[item] = scores.get(item, 0) + rng.choice((-3, -1, 1, 2))
+        top.update(item, scores[item])
+        bottom.update(item, scores[item])
+        for end in (top, bottom):
+            best = end.best(len(end))
+            # whatever the slice holds is the true head of the ranking
+            assert best == _expected(scores, len(best), end.highest)
+            if len(end) < 4 and not end.exhaustive:
+                end.reset(_expected(scores, 8, end.highest), exhaustive=False)
+
+
+def test_leaderboard_follows_votes_and_refills_from_index(fresh_db):
+    board = Leaderboard(capacity=4)
+    db.add_vote_listener(board.record)
+    try:
+        for i in range(10):
+            db.add_vote(f"item-{i}", i)
+        assert [r["item_id"] for r in board.ranking(3)] == ["item-9", "item-8", "item-7"]
+        assert [r["item_id"] for r in board.ranking(2, highest=False)] == ["item-0", "item-1"]
+        # knock every member out of the materialized top slice
+        db.add_votes({f"item-{i}": -20 for i in (9, 8, 7, 6)})
+        top = board.ranking(3)
+        assert [(r["rank"], r["item_id"], r["score"]) for r in top] == [(1, "item-5", 5), (2, "item-4", 4), (3, "item-3", 3)]
+        assert board.stats()["refills_all"] >= 3
+        assert board.ranking(1, highest=False)[0] == {"rank": 1, "item_id": "item-6", "score": -14}
+    finally:
+        db._vote_listeners.remove(board.record)
+
+
+def test_windows_expire_old_buckets(fresh_db, monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(db, "vote_bucket", lambda t=None: int(now[0]) // db.VOTE_BUCKET_SECONDS * db.VOTE_BUCKET_SECONDS)
+    board = Leaderboard(capacity=4, windows={"1h": 3600}, clock=lambda: now[0])
+    db.add_vote_listener(board.record)
+    try:
+        db.add_vote("old-story", 5)
+        board.load()
+        now[0] += 1800
+        db.add_vote("new-story", 2)
+        assert [r["item_id"] for r in board.ranking(2, window="1h")] == ["old-story", "new-story"]
+        now[0] += 2400  # old-story's bucket has left the hour
+        assert board.ranking(2, window="1h") == [{"rank": 1, "item_id": "new-story", "score": 2}]
+        assert [r["item_id"] for r in board.ranking(2)] == ["old-story", "new-story"]
+        # a restart rebuilds the same window from vote_buckets
+        reloaded = Leaderboard(capacity=4, windows={"1h": 3600}, clock=lambda: now[0])
+        assert reloaded.ranking(2, window="1h") == board.ranking(2, window="1h")
+    finally:
+        db._vote_listeners.remove(board.record)
+
+
+def test_leaderboard_endpoint(fresh_db):
+    for item, delta in (("lb-a", 3), ("lb-b", -2), ("lb-c", 7)):
+        client.post("/community/vote", json={"item_id": item, "vote": delta})
+    data = client.get("/community/leaderboard", params={"limit": 2}).json()
+    assert [r["item_id"] for r in data["items"]] == ["lb-c", "lb-a"]
+    bottom = client.get("/community/leaderboard", params={"order": "bottom", "window": "24h", "limit": 1}).json()
+    assert bottom["items"] == [{"rank": 1, "item_id": "lb-b", "score": -2}]
+    assert client.get("/community/leaderboard", params={"window": "1y"}).status_code == 400
+    assert client.get("/community/leaderboard", params={"limit": leaderboard.LEADERBOARD_SIZE + 1}).status_code == 400
+    assert LEADERBOARD.stats()["items_24h"] == 3
+
+
+def test_out_of_order_reports_keep_the_latest_score(fresh_db):
+    board = Leaderboard(capacity=4)
+    board.load()
+    bucket = db.vote_bucket()
+    board.record({"late": 1}, {"late": 5}, bucket, 10)
+    board.record({"late": 1}, {"late": 4}, bucket, 9)  # committed first, reported last
+    assert board.ranking(1) == [{"rank": 1, "item_id": "late", "score": 5}]
+    assert board.ranking(1, window="1h")[0]["score"] == 2
+
+
+def test_votes_notify_after_commit(fresh_db):
+    seen = []
+
+    def listener(deltas, scores, bucket, seq):
+        # a separate connection already sees the write, and the writer's
+        # pooled connection is back in the pool
+        with db.connection() as conn:
+            row = conn.execute("SELECT score FROM votes WHERE item_id = ?", ("committed",)).fetchone()
+        seen.append((row["score"], scores["committed"], seq))
+
+    db.add_vote_listener(listener)
+    try:
+        db.add_vote("committed", 2)
+        db.add_votes({"committed": 3})
+    finally:
+        db._vote_listeners.remove(listener)
+    assert [(a, b) for a, b, _ in seen] == [(2, 2), (5, 5)]
+    assert seen[0][2] < seen[1][2]
+
+
+def test_refill_reads_without_the_lock_and_replays_concurrent_votes(fresh_db, monkeypatch):
+    board = Leaderboard(capacity=2)
+    db.add_vote_listener(board.record)
+    try:
+        for i in range(4):
+            db.add_vote(f"item-{i}", i)
+        board.load()
+        db.add_votes({"item-3": -10, "item-2": -10})  # empty the top slice
+
+        def source(n, highest):
+            rows = leaderboard._from_votes_table(n, highest)
+            # a vote arriving mid-read must not wait for the refill
+            voter = threading.Thread(target=db.add_vote, args=("item-1", 20))
+            voter.start()
+            voter.join(timeout=5)
+            assert not voter.is_alive()
+            return rows
+
+        monkeypatch.setattr(board._all, "source", source)
+        assert [(r["item_id"], r["score"]) for r in board.ranking(2)] == [("item-1", 21), ("item-0", 0)]
+        assert not board._journals
+    finally:
+        db._vote_listeners.remove(board.record)
+
+
+def test_window_sum_crossing_zero_expires_cleanly(fresh_db, monkeypatch):
+    step = db.VOTE_BUCKET_SECONDS
+    now = [1_000_000.0 // step * step]
+    monkeypatch.setattr(db, "vote_bucket", lambda t=None: int(now[0]) // step * step)
+    board = Leaderboard(capacity=4, windows={"3b": 3 * step}, clock=lambda: now[0])
+    db.add_vote_listener(board.record)
+    try:
+        board.load()
+        for delta in (1, -1, 1):
+            db.add_vote("x", delta)
+            now[0] += step
+        now[0] -= step
+        # the +1 / -1 buckets sum to 0 but are still inside the window
+        assert board.ranking(1, window="3b") == [{"rank": 1, "item_id": "x", "score": 1}]
+        assert Leaderboard(capacity=4, windows={"3b": 3 * step}, clock=lambda: now[0]).ranking(1, window="3b")[0]["score"] == 1
+        now[0] += step
+        assert board.ranking(1, window="3b")[0]["score"] == 0
+        now[0] += step
+        assert board.ranking(1, window="3b")[0]["score"] == 1
+        now[0] += step
+        assert board.ranking(1, window="3b") == []
+        db.add_vote("y", 2)
+        assert board.ranking(1) == [{"rank": 1, "item_id": "y", "score": 2}]
+        assert board.ranking(2, window="3b") == [{"rank": 1, "item_id": "y", "score": 2}]
+    finally:
+        db._vote_listeners.remove(board.record)
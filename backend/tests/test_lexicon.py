@@ -0,0 +1,45 @@
+import html
+import re
+
+from app.explain import HIGHLIGHT_WORDS, highlight_keywords
+from app.lexicon import Lexicon, LEXICON
+
+
+def _regex_highlight(text):
+    # reference implementation: one re.sub pass per word over the escaped text
+    out = html.escape(text)
+    for w in HIGHLIGHT_WORDS:
+        out = re.sub(rf"(?i)\b({re.escape(w)})\b",
+                     r"<mark class='bg-yellow-200 text-red-700 font-semibold'>\1</mark>", out)
+    return out
+
+
+def test_scan_counts_match_str_count():
+    lex = Lexicon({"x": ["ab", "aba", "b", "cure", "secure"]})
+    text = "ababa bab SECURE cure abab"
+    counts = lex.scan(text).counts("x")
+    for term in ["ab", "aba", "b", "cure", "secure"]:
+        assert counts.get(term, 0) == text.lower().count(term)
+
+
+def test_word_matches_respect_boundaries():
+    lex = Lexicon({"x": ["cure", "secure"]})
+    text = "secure curex <cure>"
+    spans = [text[s:e] for s, e, _ in lex.scan(text).word_matches("x")]
+    assert spans == ["secure", "cure"]
+
+
+def test_highlight_matches_regex_reference():
+    samples = [
+        "This is a SHOCKING secret miracle cure! Claims & <script>exposed</script>",
+        "Secretive cures and unbelievably exclusive_claims, but exclusive claims.",
+        "",
+    ]
+    for text in samples:
+        assert highlight_keywords(text)[0] == (_regex_highlight(text) if text else "")
+
+
+def test_shared_scan_is_reused():
+    text = "miracle cure"
+    scan = LEXICON.scan(text)
+    assert highlight_keywords(text, scan=scan) == highlight_keywords(text)
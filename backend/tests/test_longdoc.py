@@ -0,0 +1,96 @@
+import random
+
+from fastapi.testclient import TestClient
+
+from app import longdoc
+from app.explain import highlight_keywords
+from app.main import app
+from app.model import NewsModel
+
+client = TestClient(app)
+
+WORDS = ["officials", "said", "the", "report", "shocking", "secret", "miracle", "cure", "<b>",
+         "budget", "council", "claims", "exclusive", "secretive", "cured", "great", "awful"]
+
+
+def _document(n_words: int, seed: int = 7) -> str:
+    rng = random.Random(seed)
+    return " ".join(rng.choice(WORDS) for _ in range(n_words))
+
+
+def test_windows_tile_the_text_and_overlap():
+    text = _document(3000)
+    windows = list(longdoc.iter_windows(text, window=997, overlap=64))
+    assert len(windows) > 5
+    assert windows[0].own_start == 0 and windows[-1].own_end == len(text)
+    for prev, cur in zip(windows, windows[1:]):
+        assert prev.own_end == cur.own_start
+        assert text[cur.own_start].isspace()  # cut between words
+        assert cur.start < prev.own_end and prev.end > cur.own_start
+
+
+def test_streamed_highlight_matches_single_pass():
+    text = _document(5000)
+    # tiny windows put many terms right on a window boundary
+    for window, overlap in ((101, 40), (997, 64), (10 ** 6, 0)):
+        streamed = "".join(longdoc.iter_highlighted(text, window=window, overlap=overlap))
+        assert streamed == highlight_keywords(text)[0]
+
+
+def test_long_analysis_combines_window_scores():
+    text = _document(4000)
+    out = longdoc.analyze_long(text, NewsModel(), window=2000, overlap=100)
+    assert out["mode"] == "long"
+    assert out["windows"]["count"] == len(list(longdoc.iter_windows(text, 2000, 100)))
+    assert out["windows"]["min_confidence"] <= out["confidence"] <= out["windows"]["max_confidence"]
+    assert out["label"] == ("Real" if out["confidence"] >= 0.5 else "Fake")
+    # owned regions are cut at whitespace, so keyword counts equal a single pass
+    assert out["keywords"] == highlight_keywords(text)[1]
+    assert "raw_text" not in out and "highlighted" not in out
+
+
+def test_analyze_long_mode_omits_bulky_fields(monkeypatch):
+    monkeypatch.setattr(longdoc, "LONG_DOC_CHARS", 5000)
+    text = _document(2000, seed=11)
+    r = client.post("/analyze", json={"text": text})
+    assert r.status_code == 200
+    data = r.json()
+    assert data["mode"] == "long" and data["windows"]["count"] >= 1
+    assert "raw_text" not in data and "highlighted" not in data
+
+    r = client.post("/analyze", json={"text": text, "include_highlighted": True})
+    assert r.json()["highlighted"] == highlight_keywords(text)[0]
+
+    short = client.post("/analyze", json={"text": "A shocking claim.", "include_raw_text": False}).json()
+    assert "raw_text" not in short and "highlighted" in short
+
+
+def test_highlight_endpoint_streams_html():
+    text = _document(1500, seed=3)
+    r = client.post("/analyze/highlight", json={"text": text})
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/html")
+    assert r.text == highlight_keywords(text)[0]
+
+
+def test_stream_uses_long_mode_and_shares_the_analyze_cache(monkeypatch):
+    import json
+
+    from app.cache import RESULT_CACHE
+
+    RESULT_CACHE.clear()
+    monkeypatch.setattr(longdoc, "LONG_DOC_CHARS", 5000)
+    text = _document(2000, seed=17)
+    r = client.post(
+        "/analyze/stream",
+        content=json.dumps({"id": "big", "text": text}).encode() + b"\n",
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    streamed = json.loads(r.text.splitlines()[0])
+    assert streamed["mode"] == "long" and streamed["id"] == "big"
+    assert "raw_text" not in streamed and "highlighted" not in streamed
+
+    data = client.post("/analyze", json={"text": text}).json()
+    assert data["mode"] == "long" and "id" not in data
+    streamed.pop("index"), streamed.pop("id")
+    assert data == streamed
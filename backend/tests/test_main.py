@@ -42,3 +42,46 @@ def test_summarize_and_bias_and_factcheck():
     r3 = client.post("/fact-check", json=payload)
     assert r3.status_code == 200
     assert "results" in r3.json()
+
+
+def test_analyze_batch_preserves_order_and_isolates_errors():
+    payload = {"items": [
+        {"text": "This is a shocking secret miracle cure!"},
+        {},
+        {"text": "Officials released the quarterly budget report on Tuesday."},
+    ]}
+    r = client.post("/analyze/batch", json=payload)
+    assert r.status_code == 200
+    results = r.json()["results"]
+    assert [x["index"] for x in results] == [0, 1, 2]
+    assert "error" in results[1]
+    assert results[0]["label"] == "Fake"
+    assert "highlighted" in results[2] and "error" not in results[2]
+
+
+def test_predict_batch_matches_predict():
+    from app.model import NewsModel
+
+    m = NewsModel()
+    texts = ["", "miracle cure overnight " * 3, "plain words " * 30, "Shocking SECRET exposed"]
+    for single, batched in zip([m.predict(t) for t in texts], m.predict_batch(texts)):
+        assert single["label"] == batched["label"]
+        assert abs(single["confidence"] - batched["confidence"]) < 1e-9
+
+
+def test_analyze_stream_ndjson():
+    import json
+
+    docs = [{"id": f"doc-{i}", "text": f"Story {i} reveals a shocking secret."} for i in range(20)]
+    lines = [json.dumps(d).encode() + b"\n" for d in docs] + [b"not json\n", b'{"id": "empty"}\n']
+
+    def body():
+        yield from lines
+
+    r = client.post("/analyze/stream", content=body(), headers={"Content-Type": "application/x-ndjson"})
+    assert r.status_code == 200
+    out = [json.loads(line) for line in r.text.splitlines()]
+    assert sorted(x["index"] for x in out) == list(range(22))
+    by_index = {x["index"]: x for x in out}
+    assert by_index[3]["id"] == "doc-3" and by_index[3]["label"] in ("Real", "Fake")
+    assert "error" in by_index[20] and "error" in by_index[21]
@@ -0,0 +1,59 @@
+import time
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.metrics import Histogram, span, STAGE_LATENCY
+
+client = TestClient(app)
+
+
+def test_histogram_buckets_are_cumulative():
+    h = Histogram("t_seconds", "test", ("stage",), buckets=(0.1, 1.0))
+    for v in (0.05, 0.5, 5.0):
+        h.observe(v, "x")
+    lines = h.render()
+    assert 't_seconds_bucket{stage="x",le="0.1"} 1' in lines
+    assert 't_seconds_bucket{stage="x",le="1.0"} 2' in lines
+    assert 't_seconds_bucket{stage="x",le="+Inf"} 3' in lines
+    assert 't_seconds_count{stage="x"} 3' in lines
+
+
+def test_metrics_endpoint_reports_routes_stages_and_counters():
+    with span("unit-test-stage"):
+        pass
+    client.post("/analyze", json={"text": "Metrics check: a shocking claim."})
+    client.get("/community/score/some-item")
+    body = client.get("/metrics").text
+    assert 'route="/analyze"' in body
+    assert 'route="/community/score/{item_id}"' in body
+    assert 'stage="model"' in body and 'stage="db.get_score"' in body
+    assert "fakenews_result_cache_hits" in body and "fakenews_db_pool_created" in body
+    assert STAGE_LATENCY._series[("unit-test-stage",)][-1] >= 0
+
+
+def _busy_stage(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        sum(range(200))
+
+
+def test_slow_request_profile_covers_worker_threads(tmp_path, monkeypatch):
+    from fastapi.concurrency import run_in_threadpool
+
+    from app import metrics
+
+    @app.get("/_test/slow-threadpool")
+    async def slow_threadpool():
+        await run_in_threadpool(_busy_stage, 0.2)
+        return {"ok": True}
+
+    monkeypatch.setattr(metrics, "PROFILER", metrics._SlowRequestProfiler(1, 1.0, str(tmp_path), interval_ms=2))
+    try:
+        assert client.get("/_test/slow-threadpool").status_code == 200
+    finally:
+        app.router.routes.pop()
+    (profile,) = tmp_path.glob("_test_slow-threadpool-*.folded")
+    stacks = profile.read_text().splitlines()
+    # the threadpool work is attributed, as the innermost frames of its stacks
+    assert any(line.rsplit(";", 1)[-1].startswith("_busy_stage") for line in stacks)
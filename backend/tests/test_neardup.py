@@ -0,0 +1,114 @@
+import numpy as np
+from fastapi.testclient import TestClient
+
+from app import db, neardup
+from app.main import app
+from app.neardup import MinHashLSH, NearDuplicateIndex, minhash
+
+client = TestClient(app)
+
+STORY = (
+    "Residents of the coastal town were told by officials that the new water treatment plant "
+    "will open next spring after the regional council approved an emergency budget increase "
+    "for the project, according to a statement published on Tuesday evening."
+)
+
+
+def test_signatures_track_similarity():
+    edited = "BREAKING: " + STORY + " #viral #share"
+    other = "A completely different report about the national football league, the transfer window and ticket prices this season."
+    assert (minhash(STORY) == minhash(edited)).mean() >= 0.8
+    assert (minhash(STORY) == minhash(other)).mean() < 0.2
+    assert minhash("too short to fingerprint") is None
+
+
+def test_lsh_finds_near_duplicates_across_merges():
+    rng = np.random.default_rng(3)
+    sigs = rng.integers(0, 2 ** 16, (500, neardup.NUM_PERM), dtype=np.uint16)
+    lsh = MinHashLSH(tail_size=64)
+    lsh.add_many(sigs[:300])
+    for sig in sigs[300:]:
+        lsh.add(sig)
+    assert lsh.merges > 1 and len(lsh) == 500
+    for i in (0, 150, 299, 420, 499):
+        probe = sigs[i].copy()
+        probe[:8] = 0  # ~12% of positions differ
+        assert lsh.query(probe, 0.8)[0] == i
+    assert lsh.query(rng.integers(0, 2 ** 16, neardup.NUM_PERM, dtype=np.uint16), 0.5) is None
+
+
+def test_index_persists_and_ignores_stale_versions():
+    index = NearDuplicateIndex()
+    sig = minhash(STORY + " Persist check.")
+    rowid = index.add(sig, "v1", {"label": "Real", "confidence": 0.6})
+    reloaded = NearDuplicateIndex()
+    found = reloaded.find(sig, "v1")
+    assert found["id"] == rowid and found["result"]["label"] == "Real"
+    assert reloaded.find(sig, "v2") is None and reloaded.counters["stale"] == 1
+
+
+def test_analyze_reuses_verdict_for_edited_copy():
+    original = "Exclusive: " + STORY + " Officials said the shocking cost overrun was expected."
+    first = client.post("/analyze", json={"text": original}).json()
+    assert "duplicate_of" not in first and first["analysis_id"]
+
+    copy = "Please share!! " + original + " #news #water"
+    second = client.post("/analyze", json={"text": copy}).json()
+    assert second["duplicate_of"]["id"] == first["analysis_id"]
+    assert second["duplicate_of"]["similarity"] >= neardup.NEAR_DUP_THRESHOLD
+    assert second["label"] == first["label"] and second["confidence"] == first["confidence"]
+    assert second["raw_text"] == copy
+
+    linked = client.get(second["duplicate_of"]["href"])
+    assert linked.status_code == 200 and linked.json()["label"] == first["label"]
+    assert client.get("/analysis/999999").status_code == 404
+
+
+def test_new_version_replaces_the_stale_row(fresh_db):
+    index = NearDuplicateIndex()
+    sig = minhash(STORY + " Version check.")
+    first = index.add(sig, "v1", {"label": "Real", "confidence": 0.6})
+    hits = 0
+    for version in ("v2", "v3", "v4"):
+        assert index.find(sig, version) is None
+        assert index.add(sig, version, {"label": "Fake", "confidence": 0.3}) == first
+        found = index.find(sig, version)
+        hits += found is not None and found["id"] == first
+    assert hits == 3 and index.counters["stale"] == 3 and index.counters["replaced"] == 3
+    assert index.stats()["documents"] == 1
+    assert sum(1 for _ in db.iter_analysis_signatures()) == 1
+
+    # an edited copy under a newer version takes over the same row
+    edited = minhash("BREAKING: " + STORY + " Version check. #share")
+    assert index.add(edited, "v5", {"label": "Real", "confidence": 0.7}) == first
+    assert index.find(sig, "v4") is None
+    reloaded = NearDuplicateIndex()
+    assert reloaded.find(edited, "v5")["id"] == first
+    assert reloaded.find(sig, "v5")["result"]["label"] == "Real"
+    assert sum(1 for _ in db.iter_analysis_signatures()) == 1
+
+
+def test_lsh_matches_are_ranked_by_similarity():
+    rng = np.random.default_rng(8)
+    sig = rng.integers(0, 2 ** 16, neardup.NUM_PERM, dtype=np.uint16)
+    near = sig.copy()
+    near[:6] = 0
+    lsh = MinHashLSH()
+    lsh.add(near)
+    lsh.add(sig)
+    lsh.add(sig)
+    assert [i for i, _ in lsh.matches(sig, 0.8)] == [2, 1, 0]
+    assert lsh.query(sig, 0.8) == (2, 1.0)
+
+
+def test_oldest_analyses_age_out(fresh_db):
+    rng = np.random.default_rng(21)
+    sigs = rng.integers(0, 2 ** 16, (12, neardup.NUM_PERM), dtype=np.uint16)
+    index = NearDuplicateIndex(max_rows=8)
+    ids = [index.add(sig, "v1", {"label": "Real", "confidence": 0.5}) for sig in sigs]
+    # one row of slack over the cap: the 10th and 12th rows prune back to 8
+    assert index.counters["aged_out"] == 4
+    assert [rowid for rowid, _, _ in db.iter_analysis_signatures()] == ids[4:]
+    assert index.find(sigs[0], "v1") is None
+    assert index.find(sigs[-1], "v1")["id"] == ids[-1]
+    assert index.stats()["documents"] == 8
@@ -0,0 +1,127 @@
+from fastapi.testclient import TestClient
+
+from app import main, neardup
+from app.cache import RESULT_CACHE
+from app.main import app
+
+client = TestClient(app)
+
+ARTICLE = (
+    "Officials said the council approved the budget on Tuesday. "
+    "Critics clearly believe the plan is a shocking secret giveaway. "
+    "The mayor should explain the miracle savings, one member said. "
+    "A final vote is expected next month after public hearings."
+)
+
+
+def test_report_matches_standalone_endpoints(monkeypatch):
+    # compare fresh results, not near-duplicate reuse of the report's own analysis
+    monkeypatch.setattr(neardup, "NEAR_DUP", False)
+    RESULT_CACHE.clear()
+    r = client.post("/report", json={"text": ARTICLE})
+    assert r.status_code == 200
+    data = r.json()
+    assert data["sections"] == ["analysis", "summary", "bias", "fact_check"]
+    assert "partial" not in data
+
+    RESULT_CACHE.clear()
+    analysis = client.post("/analyze", json={"text": ARTICLE}).json()
+    assert data["analysis"] == analysis
+    assert data["summary"] == client.post("/summarize", json={"text": ARTICLE}).json()
+    assert data["bias"] == client.post("/bias", json={"text": ARTICLE}).json()
+    assert data["fact_check"] == client.post("/fact-check", json={"text": ARTICLE}).json()
+
+
+def test_report_only_runs_requested_sections(monkeypatch):
+    RESULT_CACHE.clear()
+
+    def unexpected(*args, **kwargs):
+        raise AssertionError("not requested")
+
+    monkeypatch.setattr(main, "_summary_result", unexpected)
+    monkeypatch.setattr(main.model, "predict", unexpected)
+    r = client.post("/report", json={"text": ARTICLE, "sections": ["bias", "bias"]})
+    assert r.status_code == 200
+    data = r.json()
+    assert data["sections"] == ["bias"]
+    assert set(data) == {"sections", "bias"}
+    assert data["bias"]["label"] in ("Neutral", "Slightly biased", "Highly biased")
+
+
+def test_report_fetches_url_once(monkeypatch):
+    RESULT_CACHE.clear()
+    calls = []
+
+    async def fake_fetch(url):
+        calls.append(url)
+        return ARTICLE
+
+    monkeypatch.setattr(main, "_fetch_page_text", fake_fetch)
+    url = "https://www.bbc.com/news/report-1"
+    data = client.post("/report", json={"url": url}).json()
+    assert calls == [url]
+    assert data["analysis"]["source"] is not None
+    assert data["analysis"]["raw_text"] == ARTICLE
+    assert data["summary"]["summary"]
+
+    # every section is now cached, so a repeat does not fetch at all
+    again = client.post("/report", json={"url": url, "sections": ["analysis", "summary"]}).json()
+    assert calls == [url]
+    assert again["analysis"] == data["analysis"]
+
+
+def test_report_rejects_unknown_sections():
+    r = client.post("/report", json={"text": ARTICLE, "sections": ["analysis", "horoscope"]})
+    assert r.status_code == 400
+    assert client.post("/report", json={}).status_code == 400
+
+
+def test_report_registers_and_reuses_near_duplicates(fresh_db):
+    # a database without the analyses registered by the tests above
+    RESULT_CACHE.clear()
+    story = "Update: " + ARTICLE + " Council staff published the figures online."
+    first = client.post("/report", json={"text": story, "sections": ["analysis"]}).json()["analysis"]
+    assert first["analysis_id"] and "duplicate_of" not in first
+
+    copy = "Please share! " + story + " #council"
+    via_analyze = client.post("/analyze", json={"text": copy}).json()
+    assert via_analyze["duplicate_of"]["id"] == first["analysis_id"]
+    RESULT_CACHE.clear()
+    via_report = client.post("/report", json={"text": copy, "sections": ["analysis", "bias"]}).json()
+    assert via_report["analysis"]["duplicate_of"]["id"] == first["analysis_id"]
+    assert via_report["analysis"]["label"] == first["label"]
+    assert via_report["bias"]["label"]
+
+
+def test_long_report_analysis_skips_the_document(monkeypatch):
+    RESULT_CACHE.clear()
+
+    def unexpected(*args, **kwargs):
+        raise AssertionError("long-mode analysis built a whole-text Document")
+
+    monkeypatch.setattr(main, "Document", unexpected)
+    data = client.post("/report", json={"text": ARTICLE, "mode": "long", "sections": ["analysis"]}).json()
+    assert data["analysis"]["mode"] == "long" and "partial" not in data
+
+
+def test_long_report_analysis_gets_a_deadline_per_window(monkeypatch):
+    import time
+
+    from app import fanout, longdoc
+
+    RESULT_CACHE.clear()
+    monkeypatch.setattr(longdoc, "LONG_DOC_CHARS", 5000)
+    monkeypatch.setattr(fanout, "DEFAULT_STAGE_TIMEOUT", 0.2)
+
+    def slow_long_pipeline(text, url):
+        time.sleep(0.3)  # slower than one stage deadline
+        return {"mode": "long", "label": "Real", "confidence": 0.7}
+
+    monkeypatch.setattr(main, "_run_pipeline_long", slow_long_pipeline)
+    long_text = ARTICLE * 600  # three windows
+    assert longdoc.window_count(long_text) == 3
+    data = client.post("/report", json={"text": long_text, "sections": ["analysis"]}).json()
+    assert "partial" not in data and data["analysis"]["label"] == "Real"
+
+    one_window = client.post("/report", json={"text": ARTICLE * 30, "sections": ["analysis"]}).json()
+    assert one_window["timed_out"] == ["analysis"] and one_window["analysis"] is None
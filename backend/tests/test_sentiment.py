@@ -0,0 +1,55 @@
+import pytest
+
+from app import sentiment
+from app.sentiment_engine import LexiconSentiment, get_engine, tokenize
+
+
+def test_tokenize_splits_contractions_and_keeps_bangs():
+    assert tokenize("It isn't GOOD!!") == ["it", "is", "n't", "good", "!", "!"]
+
+
+def test_engine_rules():
+    engine = LexiconSentiment({
+        "good": (0.7, 1.0, False), "bad": (-0.7, 1.0, False), "very": (0.2, 1.3, True),
+    })
+    assert engine.polarity_of("good") == pytest.approx(0.7)
+    assert engine.polarity_of("very good") == pytest.approx(0.91)
+    assert engine.polarity_of("not good") == pytest.approx(-0.35)
+    assert engine.polarity_of("not a good idea") == pytest.approx(-0.35)
+    assert engine.polarity_of("not the good") == pytest.approx(0.7)  # negation doesn't reach
+    assert engine.polarity_of("not very good") == pytest.approx(-0.5 * 0.7 / 1.3)
+    assert engine.polarity_of("good bad") == pytest.approx(0.0)
+    assert engine.polarity_of("bad!") == pytest.approx(-0.875)
+    assert engine.polarity_of("I don't think it's good") == pytest.approx(0.7)
+    assert engine.polarity_of("nothing known here") == 0.0
+
+
+def test_batch_matches_single_and_isolates_documents():
+    engine = get_engine()
+    texts = ["very", "good", "", "not", "bad !", "terrible news, not great!"]
+    batch = engine.score_batch(texts)
+    assert list(batch) == pytest.approx([engine.polarity_of(t) for t in texts])
+
+
+def test_lexicon_engine_tracks_textblob():
+    textblob = pytest.importorskip("textblob")
+    engine = get_engine()
+    texts = [
+        "The new hospital is a great help for the community.",
+        "This is a terrible, awful decision!",
+        "Researchers were not very happy with the data.",
+        "Unfortunately the results were seriously bad!!",
+    ]
+    for text, ours in zip(texts, engine.score_batch(texts)):
+        assert ours == pytest.approx(textblob.TextBlob(text).sentiment.polarity, abs=1e-3)
+
+
+def test_engine_selection_and_fallback(monkeypatch):
+    monkeypatch.setattr(sentiment, "SENTIMENT_ENGINE", "lexicon")
+    assert sentiment.engine_name() == "lexicon"
+    assert sentiment.analyze_sentiment("a terrible, awful day") == {"polarity": -1.0, "tone": "Negative"}
+    assert sentiment.analyze_sentiment_batch(["great", ""]) == [
+        {"polarity": 0.8, "tone": "Positive"}, {"polarity": 0.0, "tone": "Neutral"},
+    ]
+    monkeypatch.setattr(sentiment, "_HAS_LEXICON_ENGINE", False)
+    assert sentiment.engine_name() == "textblob"
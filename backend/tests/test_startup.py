@@ -0,0 +1,66 @@
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+from app import db, startup
+from app.startup import Warmup, lazy_import
+
+
+def test_importing_app_leaves_heavy_dependencies_unloaded(tmp_path):
+    code = (
+        "import sys; from app import db; db.DB_PATH = sys.argv[1]; import app.main; "
+        "print(','.join(m for m in ('textblob', 'tldextract', 'requests', 'bs4', 'scipy') if m in sys.modules))"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code, str(tmp_path / "t.db")],
+        capture_output=True, text=True, check=True, cwd=Path(__file__).resolve().parents[1],
+    )
+    assert out.stdout.strip() == ""
+    assert not (tmp_path / "t.db").exists()  # no schema work at import time
+
+
+def test_lazy_import_records_cost_and_tolerates_missing(monkeypatch):
+    monkeypatch.setattr(startup, "IMPORT_TIMES", {})
+    monkeypatch.setattr(startup, "_loaded", {})
+    assert lazy_import("json") is sys.modules["json"]
+    assert lazy_import("no_such_module_xyz") is None
+    assert startup.IMPORT_TIMES == {"no_such_module_xyz": None}
+    assert startup.has_module("json") and not startup.has_module("no_such_module_xyz")
+
+
+def test_warmup_runs_steps_once_and_reports_failures():
+    calls = []
+    warmup = Warmup()
+    warmup.step("ok", lambda: calls.append("ok"))
+    warmup.step("boom", lambda: 1 / 0)
+    assert not warmup.ready and warmup.report()["seconds"] is None
+    warmup.run()
+    warmup.run()
+    report = warmup.report()
+    assert calls == ["ok"] and report["ready"]
+    assert "error" in report["steps"]["boom"] and "error" not in report["steps"]["ok"]
+    assert warmup.stats()["step_ok_seconds"] >= 0
+
+
+def test_db_schema_is_created_on_first_use(tmp_path, monkeypatch):
+    monkeypatch.setattr(db, "DB_PATH", tmp_path / "lazy.db")
+    assert db.add_vote("item", 1) == 1
+
+
+def test_ready_reports_warmup_progress():
+    from app.main import app
+
+    client = TestClient(app)
+    if not startup.WARMUP.ready:
+        assert client.get("/ready").status_code == 503
+    with TestClient(app) as client:
+        deadline = time.time() + 60
+        while client.get("/ready").status_code != 200 and time.time() < deadline:
+            time.sleep(0.05)
+        body = client.get("/ready").json()
+        assert body["status"] == "ready"
+        assert {"db", "model", "sentiment", "credibility"} <= set(body["steps"])
+        assert client.get("/health").json() == {"status": "ok"}
@@ -0,0 +1,23 @@
+from app.summarizer import sentence_similarity, sentence_tokens, summarize_text, textrank, _similarity_matrix
+
+
+def test_similarity_matrix_matches_pairwise_overlap():
+    sents = ["The cat sat.", "The cat ran far.", "Dogs bark.", ""]
+    toks = [sentence_tokens(s) for s in sents]
+    w = _similarity_matrix(toks)
+    for i in range(len(sents)):
+        for j in range(len(sents)):
+            expected = 0.0 if i == j else sentence_similarity(toks[i], toks[j])
+            assert abs(w[i, j] - expected) < 1e-12
+
+
+def test_textrank_keeps_original_order_and_size():
+    sents = [f"Sentence {i} mentions the report and claim {i % 4}." for i in range(300)]
+    top = textrank(sents, top_k=3)
+    assert len(top) == 3
+    assert top == sorted(top, key=sents.index)
+
+
+def test_summarize_text_contract():
+    assert summarize_text("") == ""
+    assert summarize_text("One. Two!") == "One. Two!"
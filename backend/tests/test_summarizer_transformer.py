@@ -0,0 +1,47 @@
+import threading
+import time
+
+from app.summarizer_transformer import SummarizerRegistry
+
+
+class _FakePipeline:
+    def __init__(self, name):
+        self.name = name
+
+
+def _slow_loader(calls):
+    def load(name):
+        calls.append(name)
+        time.sleep(0.05)
+        return _FakePipeline(name)
+    return load
+
+
+def test_concurrent_requests_share_one_load():
+    calls = []
+    reg = SummarizerRegistry(loader=_slow_loader(calls), measure=lambda p: 1)
+    got = []
+    threads = [threading.Thread(target=lambda: got.append(reg.get("m"))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert calls == ["m"]
+    assert len({id(p) for p in got}) == 1
+
+
+def test_lru_eviction_by_count_and_memory():
+    calls = []
+    reg = SummarizerRegistry(loader=_slow_loader(calls), max_models=2, measure=lambda p: 10)
+    reg.get("a")
+    reg.get("b")
+    reg.get("a")
+    reg.get("c")  # evicts b, the least recently used
+    assert [m["model"] for m in reg.stats()["models"]] == ["a", "c"]
+
+    reg = SummarizerRegistry(loader=_slow_loader([]), max_models=5, max_memory_bytes=25, measure=lambda p: 10)
+    for name in "abc":
+        reg.get(name)
+    stats = reg.stats()
+    assert [m["model"] for m in stats["models"]] == ["b", "c"]
+    assert stats["evictions"] == 1 and stats["models"][0]["load_seconds"] >= 0
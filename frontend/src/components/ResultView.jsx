@@ -1,14 +1,22 @@
 // src/components/ResultView.jsx
-import React, { useState } from 'react'
+import React, { useEffect, useState } from 'react'
 import { CircularProgressbar } from 'react-circular-progressbar'
 import 'react-circular-progressbar/dist/styles.css'
 import axios from 'axios'
 
-export default function ResultView({ result }){
+export default function ResultView({ result, report }){
   const score = Math.round(result.confidence * 100)
-  const [summary, setSummary] = useState(null)
-  const [factChecks, setFactChecks] = useState([])
-  const [bias, setBias] = useState(null)
+  // sections already in the /report response are shown right away; the
+  // buttons below fetch any that are missing
+  const [summary, setSummary] = useState(report?.summary?.summary || null)
+  const [factChecks, setFactChecks] = useState(report?.fact_check?.results || [])
+  const [bias, setBias] = useState(report?.bias || null)
+
+  useEffect(() => {
+    setSummary(report?.summary?.summary || null)
+    setFactChecks(report?.fact_check?.results || [])
+    setBias(report?.bias || null)
+  }, [report])
   const [voteScore, setVoteScore] = useState(0)
 
   async function loadSummary(){
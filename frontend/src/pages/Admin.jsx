@@ -4,6 +4,9 @@ import axios from 'axios'
 export default function Admin() {
   const [votes, setVotes] = useState({})
   const [subs, setSubs] = useState([])
+  const [subsTotal, setSubsTotal] = useState(0)
+  const [votesCursor, setVotesCursor] = useState(null)
+  const [subsCursor, setSubsCursor] = useState(null)
   const [loading, setLoading] = useState(false)
 
   async function load() {
@@ -14,7 +17,10 @@ export default function Admin() {
         axios.get('http://127.0.0.1:8000/admin/subscriptions'),
       ])
       setVotes(v.data.votes || {})
+      setVotesCursor(v.data.next_cursor || null)
       setSubs(s.data.subscriptions || [])
+      setSubsTotal(s.data.count || 0)
+      setSubsCursor(s.data.next_cursor || null)
     } catch (e) {
       console.error(e)
     } finally {
@@ -22,6 +28,27 @@ export default function Admin() {
     }
   }
 
+  // both lists are paged server-side; these append the next page
+  async function moreVotes() {
+    try {
+      const v = await axios.get('http://127.0.0.1:8000/admin/votes', { params: { cursor: votesCursor } })
+      setVotes((prev) => ({ ...prev, ...(v.data.votes || {}) }))
+      setVotesCursor(v.data.next_cursor || null)
+    } catch (e) {
+      console.error(e)
+    }
+  }
+
+  async function moreSubs() {
+    try {
+      const s = await axios.get('http://127.0.0.1:8000/admin/subscriptions', { params: { cursor: subsCursor } })
+      setSubs((prev) => prev.concat(s.data.subscriptions || []))
+      setSubsCursor(s.data.next_cursor || null)
+    } catch (e) {
+      console.error(e)
+    }
+  }
+
   useEffect(() => { load() }, [])
 
   return (
@@ -41,18 +68,22 @@ export default function Admin() {
             ))}
           </ul>
         )}
+        {votesCursor && <button onClick={moreVotes} className="mt-2 text-sm underline">Load more</button>}
+        <a href="http://127.0.0.1:8000/admin/votes/export" className="ml-4 text-sm underline">Export CSV</a>
       </section>
 
       <section className="glassmorphism p-4">
         <h2 className="text-xl font-semibold">Subscriptions</h2>
         {loading ? <div>Loading...</div> : (
           <div>
-            <div className="text-sm text-gray-400">Total: {subs.length}</div>
+            <div className="text-sm text-gray-400">Total: {subsTotal}</div>
             <ul className="mt-2">
               {subs.map((s) => (
                 <li key={s.id} className="py-1">{s.channel} — {s.address} <span className="text-xs text-gray-500">{s.created_at}</span></li>
               ))}
             </ul>
+            {subsCursor && <button onClick={moreSubs} className="mt-2 text-sm underline">Load more</button>}
+            <a href="http://127.0.0.1:8000/admin/subscriptions/export" className="ml-4 text-sm underline">Export CSV</a>
           </div>
         )}
       </section>
@@ -8,14 +8,19 @@ import { FiUpload, FiAlertCircle, FiInfo } from 'react-icons/fi';
 export default function Home() {
   const [text, setText] = useState('');
   const [result, setResult] = useState(null);
+  const [report, setReport] = useState(null);
   const [loading, setLoading] = useState(false);
   const [showGuide, setShowGuide] = useState(true);
 
   async function analyze() {
     setLoading(true);
     try {
-      const res = await axios.post('http://127.0.0.1:8000/analyze', { text });
-      setResult(res.data);
+      // one call for verdict, summary, bias and fact-checks (URL fetched once)
+      const input = text.trim();
+      const body = /^https?:\/\/\S+$/.test(input) ? { url: input } : { text };
+      const res = await axios.post('http://127.0.0.1:8000/report', body);
+      setReport(res.data);
+      setResult(res.data.analysis);
     } catch (e) {
       alert('API error: ' + (e?.message || e));
     } finally {
@@ -72,13 +77,23 @@ export default function Home() {
           </motion.div>
 
           {/* Result Card */}
-          {result && (
+          {report && (
             <motion.div
               initial={{ opacity: 0, x: 20 }}
               animate={{ opacity: 1, x: 0 }}
               transition={{ delay: 0.4 }}
             >
-              <ResultView result={result} />
+              {/* a stage that timed out or failed leaves its section null */}
+              {report.partial && (
+                <div className="flex items-start gap-2 p-4 mb-4 rounded-lg border border-yellow-500/40 text-yellow-200">
+                  <FiAlertCircle className="w-5 h-5 mt-0.5 shrink-0" />
+                  <span>
+                    Some checks did not finish: {[...(report.timed_out || []), ...(report.failed || [])].join(', ')}.
+                    {result ? ' Their results are missing below.' : ' No verdict is available yet, please try again.'}
+                  </span>
+                </div>
+              )}
+              {result && <ResultView result={result} report={report} />}
             </motion.div>
           )}
         </div>